@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from ..services.container_lifecycle import get_container_lifecycle
+
+router = APIRouter()
+
+@router.get("/containers")
+async def list_containers():
+    """Exported containers with their project, port and usage times, most recently used first"""
+    lifecycle = get_container_lifecycle()
+    return {"status": "success", "containers": lifecycle.inventory(), "stats": lifecycle.stats()}
+
+@router.post("/containers/{name}/touch")
+async def touch_container(name: str):
+    """Record use of a container so it is not collected as idle"""
+    if not get_container_lifecycle().touch(name):
+        return JSONResponse(status_code=404, content={"status": "error", "message": f"Container {name} not found"})
+    return {"status": "success", "name": name}
+
+@router.delete("/containers/{name}")
+async def remove_container(name: str):
+    """Stop and remove an exported container and its route"""
+    if not await get_container_lifecycle().remove(name):
+        return JSONResponse(status_code=404, content={"status": "error", "message": f"Container {name} not found"})
+    return {"status": "success", "name": name}
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+import json
 from ..services.project_service import ProjectService
 from ..schemas.project_schema import ProjectExport
+from ..models.project_cache import etag_matches
+from ..models.project_listing import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, parse_fields
 
 router = APIRouter()
 service = ProjectService()
@@ -25,6 +28,56 @@ async def export_project(project_data: ProjectExport):
         raise HTTPException(status_code=400, detail=msg)
     return {"message": "Project exported successfully","url":result["ngrok_url"]}
 
+@router.post("/export/jobs", status_code=202)
+async def submit_export_job(project_data: ProjectExport, priority: int = 0):
+    """
+    Queue an export and return at once. Poll the status URL, or follow the
+    events URL (Server-Sent Events) for stage-by-stage progress.
+    """
+    job, _ = service.submit_export(project_data, priority)
+    return {
+        "job_id": job.id,
+        "state": job.state,
+        "status_url": f"/api/export/{job.id}",
+        "events_url": f"/api/export/{job.id}/events",
+    }
+
+def _job_not_found(job_id):
+    return JSONResponse(status_code=404, content={"status": "error", "message": f"Export job {job_id} not found"})
+
+@router.get("/export/{job_id}")
+async def get_export_job(job_id: str):
+    job = service.get_export_job(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    return job.to_dict()
+
+@router.delete("/export/{job_id}")
+async def cancel_export_job(job_id: str):
+    job = service.get_export_job(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    if not service.cancel_export(job_id):
+        return JSONResponse(status_code=409, content={"status": "error", "message": f"Export job {job_id} already {job.state}"})
+    return {"status": "success", "job_id": job_id}
+
+@router.get("/export/{job_id}/events")
+async def stream_export_job(job_id: str):
+    """Server-Sent Events: one event per stage, then a final succeeded/failed/cancelled event"""
+    job = service.get_export_job(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+
+    async def events():
+        async for event in job.stream():
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @router.post("/save")
 async def save_project(project_data: ProjectSave):
     try:
@@ -42,10 +95,16 @@ async def save_project(project_data: ProjectSave):
                 content={"status": "error", "message": "Project name is required"}
             )
         
-        result = service.save_project(project_data.dict())
+        result = await service.save_project_async(project_data.dict())
         
         print(f"Save result: {result}")
         
+        if result.get("conflict"):
+            print(f"⚠️ Save conflict: {result['message']}")
+            return JSONResponse(
+                status_code=409,
+                content={"status": "error", "message": result["message"], "revision": result.get("revision")}
+            )
         if result.get("status") == "error":
             print(f"❌ ERROR in save_project: {result['message']}")
             return JSONResponse(
@@ -53,7 +112,10 @@ async def save_project(project_data: ProjectSave):
                 content={"status": "error", "message": result["message"]}
             )
             
-        return {"status": "success", "project_id": result.get("project_id")}
+        response = {"status": "success", "project_id": result.get("project_id"), "revision": result.get("revision")}
+        if "changes" in result:
+            response["changes"] = result["changes"]
+        return response
     except Exception as e:
         print(f"❌ EXCEPTION in save_project: {str(e)}")
         return JSONResponse(
@@ -62,12 +124,29 @@ async def save_project(project_data: ProjectSave):
         )
 
 @router.get("/projects")
-async def get_all_projects():
+async def get_all_projects(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    name: Optional[str] = None,
+    version: Optional[str] = None,
+    fields: Optional[str] = None,
+    count: str = Query("none", regex="^(none|estimate|exact)$"),
+):
     """
-    Retrieve all saved projects from the database
+    Retrieve saved projects from the database, newest first. Pass the
+    returned next_cursor back as `cursor` to fetch the following page.
     """
     try:
-        result = service.get_all_projects()
+        after = decode_cursor(cursor) if cursor else None
+        selected_fields = parse_fields(fields)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+
+    try:
+        result = await service.get_all_projects_async(
+            limit=limit, after=after, name=name, version=version,
+            fields=selected_fields, count=count
+        )
         
         # Debug logs
         print(f"Retrieved {len(result.get('projects', []))} projects")
@@ -76,18 +155,19 @@ async def get_all_projects():
             print(f"❌ ERROR in get_all_projects: {result['message']}")
             return {"status": "error", "message": result["message"]}
             
-        return {"status": "success", "projects": result["projects"]}
+        return result
     except Exception as e:
         print(f"❌ EXCEPTION in get_all_projects: {str(e)}")
         return {"status": "error", "message": str(e)}
 
 @router.get("/projects/{project_id}")
-async def get_project_by_id(project_id: int):
+async def get_project_by_id(project_id: int, request: Request):
     """
-    Get details for a specific project by ID
+    Get details for a specific project by ID. Responses carry an ETag;
+    send it back in If-None-Match to get a 304 when nothing changed.
     """
     try:
-        result = service.get_project_by_id(project_id)
+        result = await service.get_project_response_async(project_id)
         
         if result["status"] == "error":
             print(f"❌ ERROR in get_project_by_id: {result['message']}")
@@ -95,11 +175,14 @@ async def get_project_by_id(project_id: int):
                 status_code=404,
                 content={"status": "error", "message": result["message"]}
             )
-            
-        return {"status": "success", "project": result["project"]}
+        
+        headers = {"ETag": result["etag"], "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), result["etag"]):
+            return Response(status_code=304, headers=headers)
+        return Response(content=result["body"], media_type="application/json", headers=headers)
     except Exception as e:
         print(f"❌ EXCEPTION in get_project_by_id: {str(e)}")
         return JSONResponse(
             status_code=500,
             content={"status": "error", "message": str(e)}
-        )
\ No newline at end of file
+        )
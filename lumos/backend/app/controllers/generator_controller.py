@@ -1,6 +1,8 @@
+import json
 from fastapi import APIRouter, Depends, HTTPException
-from app.services.generator_service import GeneratorService
-from app.models.generator_model import UserRequest
+from fastapi.responses import StreamingResponse
+from app.services.generator_service import GeneratorService, GENERATION_BATCH_MAX_ITEMS
+from app.models.generator_model import UserRequest, BatchRequest
 
 class GeneratorController:
     def __init__(self):
@@ -18,13 +20,71 @@ class GeneratorController:
             self.generate_agent, 
             methods=["POST"]
         )
+        self.router.add_api_route(
+            "/generate_tool/stream", 
+            self.stream_tool, 
+            methods=["POST"]
+        )
+        self.router.add_api_route(
+            "/generate_agent/stream", 
+            self.stream_agent, 
+            methods=["POST"]
+        )
+        self.router.add_api_route(
+            "/generate_batch", 
+            self.generate_batch, 
+            methods=["POST"]
+        )
+        self.router.add_api_route(
+            "/generate_batch/stream", 
+            self.stream_batch, 
+            methods=["POST"]
+        )
     
     async def generate_tool(self, request: UserRequest):
         """Controller method for tool generation endpoint"""
-        tool = self.service.generate_tool(request.user_prompt)
+        tool = await self.service.generate_tool(request.user_prompt)
         return {"tool": tool}
     
     async def generate_agent(self, request: UserRequest):
         """Controller method for agent generation endpoint"""
-        agent = self.service.generate_agent(request.user_prompt)
+        agent = await self.service.generate_agent(request.user_prompt)
         return {"agent": agent}
+    
+    @staticmethod
+    def _sse(events):
+        async def body():
+            async for event in events:
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+        return StreamingResponse(body(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    
+    async def stream_tool(self, request: UserRequest):
+        """Server-Sent Events: token and partial events as the tool is generated, then done or error"""
+        return self._sse(self.service.stream_tool(request.user_prompt))
+    
+    async def stream_agent(self, request: UserRequest):
+        """Server-Sent Events: token and partial events as the agent is generated, then done or error"""
+        return self._sse(self.service.stream_agent(request.user_prompt))
+    
+    def _batch_items(self, request: BatchRequest):
+        if not 0 < len(request.items) <= GENERATION_BATCH_MAX_ITEMS:
+            raise HTTPException(status_code=422,
+                                detail=f"A batch takes 1 to {GENERATION_BATCH_MAX_ITEMS} items")
+        return [item.dict() for item in request.items]
+    
+    async def generate_batch(self, request: BatchRequest):
+        """Generate every item; results come back in input order once all are done"""
+        results, summary = [], None
+        async for event in self.service.generate_batch(self._batch_items(request)):
+            fields = {key: value for key, value in event.items() if key != "event"}
+            if event["event"] == "item":
+                results.append(fields)
+            else:
+                summary = fields
+        results.sort(key=lambda item: item["index"])
+        return {"results": results, "summary": summary}
+    
+    async def stream_batch(self, request: BatchRequest):
+        """Server-Sent Events: one item event per result as it completes, then done"""
+        return self._sse(self.service.generate_batch(self._batch_items(request)))
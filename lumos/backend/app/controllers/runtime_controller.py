@@ -0,0 +1,48 @@
+from pathlib import Path
+from urllib.parse import parse_qs
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse, JSONResponse
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from ..services.llm_client import get_llm_client
+from ..services.runtime_registry import get_runtime_registry
+from ui_app.simulation import simulate_async
+
+router = APIRouter()
+
+# The same page the ui_app container renders
+templates = Environment(
+    loader=FileSystemLoader(str(Path(__file__).resolve().parents[2] / "ui_app" / "templates")),
+    autoescape=select_autoescape(["html"]),
+)
+
+class FormRequest:
+    """What index.html reads from Flask's request object"""
+    def __init__(self, form):
+        self.form = form
+
+def _not_found(route):
+    return JSONResponse(status_code=404, content={"error": f"Unknown project {route}"})
+
+@router.get("/run/{route}/healthz")
+async def runtime_health(route: str):
+    if await get_runtime_registry().get_async(route) is None:
+        return _not_found(route)
+    return {"status": "ok", "configured": True}
+
+@router.api_route("/run/{route}", methods=["GET", "POST"])
+@router.api_route("/run/{route}/", methods=["GET", "POST"])
+async def runtime_page(route: str, request: Request):
+    """Serve an exported project from the shared runtime instead of its own container"""
+    config = await get_runtime_registry().get_async(route)
+    if config is None:
+        return _not_found(route)
+
+    output = ""
+    form = {}
+    if request.method == "POST":
+        form = {key: values[-1] for key, values in parse_qs((await request.body()).decode()).items()}
+        # Shares the generators' connection pool, concurrency limit and retries
+        output, _ = await simulate_async(get_llm_client(), form.get("user_input"), config)
+
+    html = templates.get_template("index.html").render(output=output, request=FormRequest(form))
+    return HTMLResponse(html)
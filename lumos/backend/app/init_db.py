@@ -114,17 +114,202 @@ def execute_sql_file(file_path):
             cursor.close()
             conn.close()
 
+# ---------------------------------------------------------------------------
+# Versioned migrations
+#
+# Each migration is (version, description, steps). Every step checks the live
+# schema before changing it, so a migration that failed halfway can simply be
+# re-run. DDL uses ALGORITHM=INPLACE, LOCK=NONE so reads and writes continue
+# while indexes build. Applied versions are recorded in schema_migrations.
+# ---------------------------------------------------------------------------
+
+MIGRATION_LOCK = 'lumos_schema_migrations'
+
+def _table_exists(cursor, table):
+    cursor.execute(
+        "SELECT 1 FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,)
+    )
+    return cursor.fetchone() is not None
+
+def _index_covering(cursor, table, columns):
+    """Name of an existing index whose leading columns are exactly `columns`, if any"""
+    cursor.execute(
+        "SELECT INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY INDEX_NAME, SEQ_IN_INDEX",
+        (table,)
+    )
+    indexes = {}
+    for index_name, column_name in cursor.fetchall():
+        indexes.setdefault(index_name, []).append(column_name)
+    for index_name, index_columns in indexes.items():
+        if index_columns[:len(columns)] == list(columns):
+            return index_name
+    return None
+
+def add_index(table, index_name, columns, unique=False):
+    """Migration step: add an index online unless an equivalent one already exists"""
+    def step(cursor):
+        if not _table_exists(cursor, table):
+            print(f"Note: Table {table} does not exist, skipping {index_name}")
+            return
+        existing = _index_covering(cursor, table, columns)
+        if existing and (not unique or existing == index_name):
+            print(f"Note: {table}({', '.join(columns)}) already indexed by {existing}")
+            return
+        if unique:
+            column_list = ', '.join(columns)
+            cursor.execute(
+                f"SELECT {column_list} FROM {table} GROUP BY {column_list} HAVING COUNT(*) > 1 LIMIT 1"
+            )
+            duplicate = cursor.fetchone()
+            if duplicate:
+                raise Error(msg=f"Cannot add unique index {index_name}: duplicate {column_list} {duplicate}")
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+        cursor.execute(
+            f"ALTER TABLE {table} ADD {kind} {index_name} ({', '.join(columns)}), "
+            f"ALGORITHM=INPLACE, LOCK=NONE"
+        )
+        print(f"✅ Created index {index_name} on {table}")
+    return step
+
+def _column_exists(cursor, table, column):
+    cursor.execute(
+        "SELECT 1 FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+        (table, column)
+    )
+    return cursor.fetchone() is not None
+
+def add_column(table, column, definition):
+    """Migration step: add a column online unless it already exists"""
+    def step(cursor):
+        if _column_exists(cursor, table, column):
+            print(f"Note: {table}.{column} already exists")
+            return
+        cursor.execute(
+            f"ALTER TABLE {table} ADD COLUMN {column} {definition}, ALGORITHM=INPLACE, LOCK=NONE"
+        )
+        print(f"✅ Added column {table}.{column}")
+    return step
+
+def run_sql(statement):
+    """Migration step: execute a statement that is idempotent by itself"""
+    def step(cursor):
+        cursor.execute(statement)
+    return step
+
+MIGRATIONS = [
+    (1, "Create tools and connections tables used by canvas saves", [
+        run_sql("""
+            CREATE TABLE IF NOT EXISTS tools (
+                id BIGINT NOT NULL,
+                project_id INT NOT NULL,
+                name VARCHAR(255) NOT NULL,
+                description TEXT,
+                type VARCHAR(50),
+                PRIMARY KEY (project_id, id),
+                FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
+            )
+        """),
+        run_sql("""
+            CREATE TABLE IF NOT EXISTS connections (
+                id INT NOT NULL,
+                project_id INT NOT NULL,
+                source VARCHAR(255) NOT NULL,
+                target VARCHAR(255) NOT NULL,
+                label VARCHAR(255),
+                PRIMARY KEY (project_id, id),
+                FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
+            )
+        """),
+    ]),
+    (2, "Index hot lookup columns", [
+        add_index('projects', 'idx_projects_created_at_id', ('created_at', 'id')),
+        add_index('projects', 'idx_projects_version_created_at_id', ('version', 'created_at', 'id')),
+        add_index('projects', 'idx_projects_name', ('name',)),
+        add_index('agents', 'idx_agents_project_id', ('project_id',)),
+        add_index('tools', 'idx_tools_project_id', ('project_id',)),
+        add_index('connections', 'idx_connections_project_id', ('project_id',)),
+        add_index('interactions', 'idx_interactions_project_id', ('project_id',)),
+        add_index('interaction_participants', 'idx_interaction_participants_agent_id', ('agent_id',)),
+    ]),
+    (3, "Enforce unique agent ids within a project", [
+        add_index('agents', 'uq_agents_project_agent', ('project_id', 'agent_id'), unique=True),
+    ]),
+    (4, "Track project revisions for in-place saves", [
+        add_column('projects', 'revision', 'INT NOT NULL DEFAULT 1'),
+    ]),
+]
+
+def run_migrations(migrations=MIGRATIONS):
+    """Apply pending migrations in version order. Safe to run repeatedly."""
+    conn = None
+    try:
+        conn = get_db_connection()
+        conn.autocommit = True
+        cursor = conn.cursor()
+
+        # Serialize concurrent runners (e.g. several app instances starting at once)
+        cursor.execute("SELECT GET_LOCK(%s, 60)", (MIGRATION_LOCK,))
+        if cursor.fetchone()[0] != 1:
+            print("❌ Could not acquire the migration lock")
+            return False
+
+        try:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INT PRIMARY KEY,
+                    description VARCHAR(255) NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute("SELECT version FROM schema_migrations")
+            applied = {row[0] for row in cursor.fetchall()}
+
+            for version, description, steps in sorted(migrations, key=lambda m: m[0]):
+                if version in applied:
+                    continue
+                print(f"Applying migration {version}: {description}")
+                for step in steps:
+                    step(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                    (version, description)
+                )
+                print(f"✅ Migration {version} applied")
+            return True
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+            cursor.fetchall()
+    except Error as e:
+        print(f"❌ Error running migrations: {str(e)}")
+        return False
+    finally:
+        if conn is not None and conn.is_connected():
+            cursor.close()
+            conn.close()
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Initialize Lumos database')
     parser.add_argument('--schema', help='Path to SQL schema file', default='schema.sql')
+    parser.add_argument('--migrate-only', action='store_true',
+                        help='Only apply pending migrations to an existing database')
     args = parser.parse_args()
     
-    print("🚀 Starting database initialization...")
-    
-    if create_database_and_user():
-        if execute_sql_file(args.schema):
-            print("🎉 Database setup completed successfully!")
+    if args.migrate_only:
+        print("🚀 Applying pending migrations...")
+        if run_migrations():
+            print("🎉 Migrations completed successfully!")
         else:
-            print("💥 Failed to initialize schema")
+            print("💥 Failed to apply migrations")
     else:
-        print("💥 Failed to create database/user")
\ No newline at end of file
+        print("🚀 Starting database initialization...")
+        
+        if create_database_and_user():
+            if execute_sql_file(args.schema) and run_migrations():
+                print("🎉 Database setup completed successfully!")
+            else:
+                print("💥 Failed to initialize schema")
+        else:
+            print("💥 Failed to create database/user")
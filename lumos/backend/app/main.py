@@ -1,5 +1,13 @@
 from fastapi import FastAPI, Request
 from app.controllers.export_controller import router as export_router
+from app.controllers.container_controller import router as container_router
+from app.controllers.runtime_controller import router as runtime_router
+from app.services.container_lifecycle import get_container_lifecycle
+from app.services.container_pool import get_container_pool
+from app.services.project_service import EXPORT_TARGET
+from app.models.project_model import STORAGE_BACKEND
+from app.utils.probe import close_session
+from app.services.llm_client import close_http_client
 from app.controllers.generator_controller import GeneratorController
 # from app.controllers.save_controller import router as save_router
 from fastapi.middleware.cors import CORSMiddleware
@@ -34,6 +42,36 @@ async def add_metrics_middleware(request: Request, call_next):
     return response
 
 app.include_router(export_router, prefix="/api")
+app.include_router(container_router, prefix="/api")
+app.include_router(runtime_router, tags=["Runtime"])
+
+@app.on_event("startup")
+async def start_container_sweeper():
+    # Collect containers left over from a previous run as well as new ones
+    get_container_lifecycle().start()
+
+@app.on_event("startup")
+async def warm_container_pool():
+    # Otherwise the first export after a restart always pays for a cold docker run
+    if EXPORT_TARGET == "container":
+        get_container_pool().schedule_refill()
+
+@app.on_event("shutdown")
+async def stop_container_pool():
+    # Idle warm containers are not in the lifecycle inventory, so nothing else removes them
+    await get_container_pool().close()
+
+@app.on_event("shutdown")
+async def close_db_pool():
+    # Imported here so SQLite and document deployments don't need mysql-connector
+    if STORAGE_BACKEND == "mysql":
+        from app.models.database import get_pool
+        get_pool().close_all()
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await close_session()
+    await close_http_client()
 
 @app.get("/")
 async def root():
@@ -0,0 +1,111 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .project_storage_strategy import AsyncProjectStorageStrategy
+from ..utils.metrics_utils import register_metrics_provider
+
+# "async" offloads blocking storage calls to a bounded thread pool,
+# "sync" runs them inline on the event loop (the old behaviour)
+STORAGE_MODE = os.getenv("STORAGE_MODE", "async")
+
+
+class StorageExecutor:
+    """
+    Bounded thread pool for blocking storage calls. At most `max_workers`
+    calls run at once; the rest wait in the executor's queue without
+    holding up the event loop. Sized to the DB pool by default so workers
+    never sit waiting for a connection.
+    """
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="storage")
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._running = 0
+        self._completed = 0
+
+    def _call(self, fn):
+        with self._lock:
+            self._running += 1
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    async def run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._submitted += 1
+        return await loop.run_in_executor(self._executor, self._call, functools.partial(fn, *args, **kwargs))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "mode": STORAGE_MODE,
+                "workers": self.max_workers,
+                "running": self._running,
+                "queued": self._submitted - self._completed - self._running,
+                "completed": self._completed,
+            }
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_storage_executor():
+    """Process-wide storage executor, created on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = int(os.getenv("STORAGE_WORKERS", os.getenv("DB_POOL_SIZE", "5")))
+                _executor = StorageExecutor(workers)
+    return _executor
+
+
+register_metrics_provider("storage_executor", lambda: get_storage_executor().stats())
+
+
+class AsyncProjectStorage(AsyncProjectStorageStrategy):
+    """
+    Awaitable facade over a blocking storage backend (a ProjectModel or any
+    ProjectStorageStrategy with the same read methods). With an executor the
+    calls run on its threads; with executor=None they run inline.
+    """
+
+    def __init__(self, backend, executor=None):
+        self.backend = backend
+        self.executor = executor
+
+    async def _run(self, fn, *args, **kwargs):
+        if self.executor is None:
+            return fn(*args, **kwargs)
+        return await self.executor.run(fn, *args, **kwargs)
+
+    async def save_project(self, project_data):
+        return await self._run(self.backend.save_project, project_data)
+
+    async def create_project(self, project_data):
+        return await self._run(self.backend.create_project, project_data)
+
+    async def get_all_projects(self, **filters):
+        return await self._run(self.backend.get_all_projects, **filters)
+
+    async def get_project_by_id(self, project_id):
+        return await self._run(self.backend.get_project_by_id, project_id)
+
+
+def make_async_storage(backend, mode=None):
+    """Wrap `backend` according to STORAGE_MODE (or an explicit mode)."""
+    mode = mode or STORAGE_MODE
+    if mode == "sync":
+        return AsyncProjectStorage(backend)
+    if mode == "async":
+        return AsyncProjectStorage(backend, get_storage_executor())
+    raise ValueError(f"Unknown STORAGE_MODE {mode!r}; expected 'async' or 'sync'")
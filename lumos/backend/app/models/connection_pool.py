@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out before the timeout."""
+
+
+class PoolClosed(Exception):
+    """Raised when a connection is requested from a pool that has been closed."""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a raw DB-API connection. Everything is delegated to the
+    underlying connection except close(), which hands it back to the pool.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool.release(self._raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe connection pool.
+
+    Connections are opened lazily up to `size`. When every connection is
+    checked out, callers wait up to `timeout` seconds for one to be released
+    and get a PoolTimeout otherwise. Idle connections are health-checked on
+    checkout once they have been idle longer than `health_check_interval`.
+    """
+
+    def __init__(self, factory, size=5, timeout=10.0, health_check_interval=30.0):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self._factory = factory
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (raw connection, released_at)
+        self._opened = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+
+        # Stats
+        self._checkouts = 0
+        self._waited_checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._recent_waits = deque(maxlen=100)
+
+    def acquire(self, timeout=None):
+        """Check out a connection, waiting up to `timeout` seconds if the pool is exhausted."""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+        raw = None
+        released_at = None
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolClosed("The database connection pool has been closed")
+                if self._idle:
+                    # LIFO keeps the hottest connections in use and lets the rest go stale
+                    raw, released_at = self._idle.pop()
+                    break
+                if self._opened < self.size:
+                    self._opened += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(
+                        f"Timed out after {timeout:.1f}s waiting for a database connection "
+                        f"(pool size {self.size})"
+                    )
+                waited = True
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._in_use += 1
+
+        try:
+            if raw is None:
+                raw = self._open()
+            elif time.monotonic() - released_at > self.health_check_interval and not self._is_healthy(raw):
+                self._close_quietly(raw)
+                with self._cond:
+                    self._discarded += 1
+                raw = self._open()
+        except Exception:
+            with self._cond:
+                self._opened -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        wait = time.monotonic() - start
+        with self._cond:
+            self._checkouts += 1
+            if waited:
+                self._waited_checkouts += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            self._recent_waits.append(wait)
+        return PooledConnection(self, raw)
+
+    def release(self, raw):
+        """Return a connection to the pool, discarding it if it is no longer usable."""
+        healthy = True
+        try:
+            # Never hand out a connection with an open transaction (or a stale snapshot)
+            if getattr(raw, "in_transaction", False):
+                raw.rollback()
+        except Exception:
+            healthy = False
+
+        with self._cond:
+            self._in_use -= 1
+            keep = healthy and not self._closed
+            if keep:
+                self._idle.append((raw, time.monotonic()))
+            else:
+                self._opened -= 1
+                if not healthy:
+                    self._discarded += 1
+            self._cond.notify()
+
+        if not keep:
+            self._close_quietly(raw)
+
+    def close_all(self):
+        """
+        Close the pool: idle connections are closed now, checked-out ones when
+        they are released, and later acquire() calls raise PoolClosed.
+        """
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._opened -= len(idle)
+            self._cond.notify_all()
+        for raw, _ in idle:
+            self._close_quietly(raw)
+
+    def stats(self):
+        with self._cond:
+            recent = list(self._recent_waits)
+            return {
+                "size": self.size,
+                "open": self._opened,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "occupancy": self._in_use / self.size,
+                "checkouts": self._checkouts,
+                "waited_checkouts": self._waited_checkouts,
+                "timeouts": self._timeouts,
+                "connections_created": self._created,
+                "connections_discarded": self._discarded,
+                "average_wait": self._total_wait / self._checkouts if self._checkouts else 0,
+                "max_wait": self._max_wait,
+                "recent_average_wait": sum(recent) / len(recent) if recent else 0,
+            }
+
+    def _open(self):
+        raw = self._factory()
+        with self._cond:
+            self._created += 1
+        return raw
+
+    @staticmethod
+    def _is_healthy(raw):
+        try:
+            return raw.is_connected()
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
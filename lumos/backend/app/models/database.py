@@ -1,10 +1,50 @@
 import mysql.connector
 from mysql.connector import Error
 import os
+import threading
 from dotenv import load_dotenv
+from .connection_pool import ConnectionPool
+from ..utils.metrics_utils import register_metrics_provider
 
 load_dotenv()
 
+# One pool per process, shared by every Database instance
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _connect_mysql():
+    return mysql.connector.connect(
+        host=os.getenv("DB_HOST"),
+        database=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        auth_plugin='mysql_native_password'
+    )
+
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    _connect_mysql,
+                    size=int(os.getenv("DB_POOL_SIZE", "5")),
+                    timeout=float(os.getenv("DB_POOL_TIMEOUT", "10")),
+                    health_check_interval=float(os.getenv("DB_POOL_HEALTHCHECK_INTERVAL", "30")),
+                )
+    return _pool
+
+
+def get_pool_stats():
+    return get_pool().stats()
+
+
+register_metrics_provider("db_pool", get_pool_stats)
+
+
 class Database:
     def __init__(self):
         self.host = os.getenv("DB_HOST")
@@ -15,24 +55,18 @@ class Database:
 
     def connect(self):
         try:
-            self.connection = mysql.connector.connect(
-                host=self.host,
-                database=self.database,
-                user=self.user,
-                password=self.password,
-                auth_plugin='mysql_native_password'
-            )
-            if self.connection.is_connected():
-                print("Connected to MySQL database")
+            self.connection = get_pool().acquire()
         except Error as e:
             print(f"Error while connecting to MySQL: {e}")
 
     def disconnect(self):
-        if self.connection and self.connection.is_connected():
+        if self.connection:
             self.connection.close()
-            print("MySQL connection closed")
+            self.connection = None
 
     def get_connection(self):
-        if not self.connection or not self.connection.is_connected():
-            self.connect()
-        return self.connection
\ No newline at end of file
+        """
+        Check out a pooled connection. Callers must close() it, which returns
+        it to the pool instead of tearing down the socket.
+        """
+        return get_pool().acquire()
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import zlib
+from .sqlite_storage_strategy import SQLiteDatabase, SQLiteProjectStorage
+from .project_hydrator import connection_to_interaction
+
+# Optional speedups; the zlib/json fallbacks produce the same documents
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DOCSTORE_PATH = os.getenv("DOCSTORE_PATH", "lumos_documents.db")
+
+# `projects` is a thin index over the blobs with the same listing columns as
+# the relational schema, so keyset listing and counts work unchanged
+DOCUMENT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS project_blobs (
+    hash TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    description TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    blob_hash TEXT NOT NULL REFERENCES project_blobs(hash)
+);
+CREATE INDEX IF NOT EXISTS idx_projects_created_at_id ON projects (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_projects_version_created_at_id ON projects (version, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_projects_name ON projects (name);
+CREATE INDEX IF NOT EXISTS idx_projects_blob_hash ON projects (blob_hash);
+"""
+
+
+def canonical_bytes(document):
+    """Stable serialization (sorted keys, compact) so equal documents hash equally."""
+    if orjson is not None:
+        return orjson.dumps(document, option=orjson.OPT_SORT_KEYS, default=str)
+    return json.dumps(document, sort_keys=True, separators=(",", ":"),
+                      ensure_ascii=False, default=str).encode()
+
+
+def compress(raw):
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=6).compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+
+def decompress(codec, data):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Document was stored with zstd but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown document codec {codec!r}")
+
+
+def _loads(raw):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+class DocumentProjectStorage(SQLiteProjectStorage):
+    """
+    Stores every saved project version as a single compressed document,
+    addressed by the SHA-256 of its canonical JSON. Identical documents share
+    one blob, and re-saving an unchanged canvas returns the existing project
+    id without writing anything. Saves and loads touch one row each.
+
+    Listing and counting come from SQLiteProjectStorage, via the `projects`
+    index table. Path comes from DOCSTORE_PATH.
+    """
+
+    def __init__(self, path=None):
+        self.db = SQLiteDatabase(path or DOCSTORE_PATH, schema=DOCUMENT_SCHEMA)
+
+    def _store(self, document):
+        # Every save appends a version, so the id/revision used for in-place
+        # SQL updates are not part of the content
+        project = {k: v for k, v in document.get('project', {}).items() if k not in ('id', 'revision')}
+        document = {**document, 'project': project}
+        raw = canonical_bytes(document)
+        digest = hashlib.sha256(raw).hexdigest()
+
+        conn = self.db.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            # Under the write lock, so concurrent saves of one canvas can't both miss
+            conn.start_transaction()
+            # Unchanged since the last save of this project: nothing to write
+            cursor.execute(
+                "SELECT id, blob_hash FROM projects WHERE name = %s ORDER BY id DESC LIMIT 1",
+                (project.get('name', 'Untitled Project'),)
+            )
+            latest = cursor.fetchone()
+            if latest and latest['blob_hash'] == digest:
+                conn.rollback()
+                return {"status": "success", "project_id": latest['id'], "deduplicated": True}
+
+            cursor.execute("SELECT 1 FROM project_blobs WHERE hash = %s", (digest,))
+            if cursor.fetchone() is None:
+                codec, data = compress(raw)
+                cursor.execute(
+                    "INSERT INTO project_blobs (hash, codec, size, data) VALUES (%s, %s, %s, %s)",
+                    (digest, codec, len(raw), data)
+                )
+            cursor.execute(
+                "INSERT INTO projects (name, version, description, blob_hash) VALUES (%s, %s, %s, %s)",
+                (project.get('name', 'Untitled Project'), project.get('version', '1.0'),
+                 project.get('description', ''), digest)
+            )
+            project_id = cursor.lastrowid
+            conn.commit()
+            return {"status": "success", "project_id": project_id, "deduplicated": False}
+        except Exception as e:
+            conn.rollback()
+            return {"status": "error", "message": str(e)}
+        finally:
+            cursor.close()
+            conn.close()
+
+    def create_project(self, project_data):
+        return self._store(project_data)
+
+    def save_project(self, project_data):
+        return self._store(project_data)
+
+    def get_project_by_id(self, project_id):
+        conn = self.db.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT p.id, p.name, p.version, p.description, p.created_at, b.codec, b.data
+                FROM projects p JOIN project_blobs b ON b.hash = p.blob_hash
+                WHERE p.id = %s
+            """, (project_id,))
+            row = cursor.fetchone()
+            if not row:
+                return {"status": "error", "message": f"Project with ID {project_id} not found"}
+            document = _loads(decompress(row['codec'], row['data']))
+        except Exception as e:
+            print(f"Error fetching project by ID: {str(e)}")
+            return {"status": "error", "message": str(e)}
+        finally:
+            cursor.close()
+            conn.close()
+
+        agents = [
+            {
+                **agent,
+                "agent_id": agent.get("id"),
+                "position": agent.get("position") or {"x": 200 + i * 150, "y": 200 + (i % 3) * 100}
+            } for i, agent in enumerate(document.get('agents', []))
+        ]
+        tools = [
+            {
+                **tool,
+                "position": tool.get("position") or {"x": 200 + i * 100, "y": 500}
+            } for i, tool in enumerate(document.get('tools', []))
+        ]
+        connections = document.get('connections', [])
+        interactions = list(document.get('interactions', []))
+        interaction_ids = {interaction.get("id") for interaction in interactions}
+        for conn_data in connections:
+            interaction = connection_to_interaction(conn_data)
+            if interaction["id"] not in interaction_ids:
+                interactions.append(interaction)
+
+        return {
+            "project": {
+                "id": row["id"],
+                "name": row["name"],
+                "version": row["version"],
+                "description": row["description"],
+                "created_at": row["created_at"]
+            },
+            "agents": agents,
+            "tools": tools,
+            "interactions": interactions,
+            "connections": connections
+        }
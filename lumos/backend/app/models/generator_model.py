@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Literal, Optional
 
 class UserRequest(BaseModel):
     user_prompt: str
@@ -17,4 +17,12 @@ class Agent(BaseModel):
     type: str
     subtype: str
     capabilities: List[str]
-    suggested_tools: Dict[str, str]
\ No newline at end of file
+    suggested_tools: Dict[str, str]
+
+class BatchItem(BaseModel):
+    kind: Literal["tool", "agent"]
+    user_prompt: str
+    id: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from ..utils.metrics_utils import register_metrics_provider
+
+# Optional shared backend; without it the local cache stands in
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# "local" (per process), "redis" (shared between workers) or "none"
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local")
+CACHE_TTL = float(os.getenv("CACHE_TTL", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class LocalCache:
+    """
+    In-process LRU of bytes values with a TTL, bounded both by entry count
+    and by total value size. Counters live outside the LRU so they are never
+    evicted (a counter that went back to 0 would resurrect stale entries).
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._counters = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self._bytes += len(value)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def _remove(self, key):
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    def counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "local", "entries": len(self._entries), "bytes": self._bytes,
+                    "evictions": self.evictions}
+
+
+class RedisCache:
+    """Same interface as LocalCache on a Redis server shared by all workers."""
+
+    def __init__(self, url=REDIS_URL, ttl=CACHE_TTL, prefix="lumos:"):
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl or self.ttl)))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def counter(self, key):
+        return int(self.client.get(self.prefix + key) or 0)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+    def stats(self):
+        return {"backend": "redis"}
+
+
+class NullCache:
+    """Backend for CACHE_BACKEND=none: never stores anything."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def counter(self, key):
+        return 0
+
+    def incr(self, key):
+        return 0
+
+    def stats(self):
+        return {"backend": "none"}
+
+
+def _json_default(value):
+    # created_at comes back from the driver as a datetime
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def dumps(value):
+    return json.dumps(value, default=_json_default, separators=(",", ":")).encode()
+
+
+def etag_matches(if_none_match, etag):
+    """True if an If-None-Match header value matches `etag` (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in tags or f"W/{etag}" in tags
+
+
+class ProjectCache:
+    """
+    Read-through cache for project reads, storing serialized response bodies
+    so a hit costs no database round trip and no JSON encoding.
+
+    Single projects are keyed by id and carry an ETag built from the project
+    id, revision and a digest of the body. Listing pages are keyed by a
+    generation number plus their filters; every write bumps the generation,
+    which invalidates all pages at once without having to enumerate them.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self):
+        return self.backend.counter("generation")
+
+    def _lookup(self, key):
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def get_project(self, project_id):
+        """{"etag", "body"} of a cached project response, or None"""
+        value = self._lookup(f"project:{project_id}")
+        if value is None:
+            return None
+        etag, body = value.split(b"\n", 1)
+        return {"etag": etag.decode(), "body": body}
+
+    def put_project(self, project_id, response, generation):
+        """
+        Serialize and cache a project response. `generation` is the value
+        read before loading; if a write happened since, the body may already
+        be stale, so it is returned but not cached.
+        """
+        body = dumps(response)
+        revision = response.get("project", {}).get("project", {}).get("revision") or 0
+        etag = f'"p{project_id}.r{revision}.{hashlib.sha1(body).hexdigest()[:16]}"'
+        if generation == self.generation():
+            self.backend.set(f"project:{project_id}", etag.encode() + b"\n" + body)
+        return {"etag": etag, "body": body}
+
+    def _page_key(self, generation, filters):
+        digest = hashlib.sha1(dumps(sorted(filters.items()))).hexdigest()
+        return f"projects:{generation}:{digest}"
+
+    def get_page(self, filters):
+        value = self._lookup(self._page_key(self.generation(), filters))
+        return json.loads(value) if value is not None else None
+
+    def put_page(self, filters, page, generation):
+        self.backend.set(self._page_key(generation, filters), dumps(page))
+
+    def invalidate(self, project_id=None):
+        """Drop the cached project (if given) and every cached listing page"""
+        self.backend.incr("generation")
+        if project_id is not None:
+            self.backend.delete(f"project:{project_id}")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {**self.backend.stats(), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0}
+
+
+def create_project_cache(backend=None):
+    """Build the cache selected by CACHE_BACKEND (or `backend`)."""
+    backend = backend or CACHE_BACKEND
+    if backend == "none":
+        return ProjectCache(NullCache())
+    if backend == "redis":
+        if redis is not None:
+            return ProjectCache(RedisCache())
+        print("⚠️ CACHE_BACKEND=redis but the redis package is not installed; using the local cache")
+    elif backend != "local":
+        raise ValueError(f"Unknown CACHE_BACKEND {backend!r}")
+    return ProjectCache(LocalCache())
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_project_cache():
+    """Process-wide project cache, created on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_project_cache()
+    return _cache
+
+
+register_metrics_provider("project_cache", lambda: get_project_cache().stats())
@@ -0,0 +1,93 @@
+import zlib
+from collections import namedtuple
+
+# Keys present only in the incoming graph, present in both with different
+# values, and present only in the stored graph
+RowDiff = namedtuple("RowDiff", ["added", "changed", "removed"])
+
+
+def stable_id(value, span=1000000):
+    """
+    Deterministic numeric id for a string id. Unlike hash(), crc32 is not
+    salted per process, so the same canvas element maps to the same row id
+    on every save and the diff can match it against the stored row.
+    """
+    return zlib.crc32(str(value).encode()) % span
+
+
+def tool_numeric_id(tool_id):
+    """`tool-7` -> 7; any other id lands in the 20000-29999 range"""
+    try:
+        if tool_id.startswith('tool-') and tool_id[5:].isdigit():
+            return int(tool_id[5:])
+        return 20000 + stable_id(tool_id, 10000)
+    except AttributeError:
+        return 20000  # Default if parsing fails
+
+
+def tool_numeric_ids(tools):
+    """
+    Numeric ids for tools in order. `tool-N` ids are placed first so they
+    keep N; others bump past collisions. The same string id twice maps to
+    the same number, so the caller can still reject duplicates.
+    """
+    string_ids = [tool.get('id', '') for tool in tools]
+    explicit = [tool_id for tool_id in string_ids
+                if isinstance(tool_id, str) and tool_id.startswith('tool-') and tool_id[5:].isdigit()]
+    assigned = {}
+    used = set()
+    for tool_id in explicit + string_ids:
+        key = str(tool_id)
+        if key in assigned:
+            continue
+        numeric_id = tool_numeric_id(tool_id)
+        while numeric_id in used:
+            numeric_id += 1
+        used.add(numeric_id)
+        assigned[key] = numeric_id
+    return [assigned[str(tool_id)] for tool_id in string_ids]
+
+
+def connection_numeric_ids(connections):
+    """Numeric ids for connections in order, bumping past collisions"""
+    used = set()
+    ids = []
+    for connection in connections:
+        base = stable_id(connection.get('id', ''))
+        numeric_id = base
+        counter = 1
+        while numeric_id in used:
+            numeric_id = base + counter
+            counter += 1
+        used.add(numeric_id)
+        ids.append(numeric_id)
+    return ids
+
+
+def _normalize(row):
+    # NULL and '' are the same thing to the canvas
+    return tuple('' if value is None else value for value in row)
+
+
+def diff_rows(stored, incoming):
+    """
+    Compare two {key: row tuple} maps. Returns a RowDiff where `added` and
+    `changed` are [(key, row)] in incoming order and `removed` is [key].
+    """
+    added = []
+    changed = []
+    for key, row in incoming.items():
+        if key not in stored:
+            added.append((key, row))
+        elif _normalize(stored[key]) != _normalize(row):
+            changed.append((key, row))
+    removed = [key for key in stored if key not in incoming]
+    return RowDiff(added, changed, removed)
+
+
+def diff_summary(diffs):
+    """{"agents": {"added": 1, "changed": 0, "removed": 2}, ...} for the save response"""
+    return {
+        table: {"added": len(d.added), "changed": len(d.changed), "removed": len(d.removed)}
+        for table, d in diffs.items()
+    }
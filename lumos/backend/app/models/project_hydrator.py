@@ -0,0 +1,192 @@
+import ast
+from collections import defaultdict
+
+
+def _parse_literal(value, default):
+    """Child tables store dicts/lists as their Python repr; turn them back into objects."""
+    if value is None or value == "":
+        return default
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+
+def _is_missing_table(error):
+    """True for MySQL ER_NO_SUCH_TABLE (1146) or SQLite's "no such table"."""
+    return getattr(error, "errno", None) == 1146 or "no such table" in str(error)
+
+
+def connection_to_interaction(conn_data):
+    """Present a canvas connection in the LDL interaction format."""
+    return {
+        "id": f"interaction-{conn_data['source']}-{conn_data['target']}",
+        "name": conn_data["label"] if conn_data.get("label") else f"Connection {conn_data['source']}-{conn_data['target']}",
+        "description": f"Connection between {conn_data['source']} and {conn_data['target']}",
+        "type": "AgentAgent",
+        "participants": [conn_data["source"], conn_data["target"]],
+        "protocol": {
+            "type": "DirectedMessaging",
+            "messageTypes": ["task"]
+        }
+    }
+
+
+class ProjectHydrator:
+    """
+    Loads a complete project graph with a fixed number of set-based queries
+    (one per table, each filtered by project id) regardless of how many
+    agents or interactions the project has, then stitches the rows together
+    in memory using dicts keyed by primary key.
+    """
+
+    PROJECT_QUERY = "SELECT id, name, version, description, created_at, revision FROM projects WHERE id = %s"
+    AGENTS_QUERY = "SELECT * FROM agents WHERE project_id = %s ORDER BY id"
+    AGENT_MODELS_QUERY = """
+        SELECT m.agent_id, m.name, m.version, m.provider, m.parameters
+        FROM agent_models m JOIN agents a ON a.id = m.agent_id
+        WHERE a.project_id = %s ORDER BY m.id
+    """
+    AGENT_CAPABILITIES_QUERY = """
+        SELECT c.agent_id, c.capability
+        FROM agent_capabilities c JOIN agents a ON a.id = c.agent_id
+        WHERE a.project_id = %s ORDER BY c.id
+    """
+    AGENT_TOOLS_QUERY = """
+        SELECT t.agent_id, t.name, t.description, t.type, t.subtype, t.parameters
+        FROM agent_tools t JOIN agents a ON a.id = t.agent_id
+        WHERE a.project_id = %s ORDER BY t.id
+    """
+    TOOLS_QUERY = "SELECT * FROM tools WHERE project_id = %s"
+    CONNECTIONS_QUERY = "SELECT * FROM connections WHERE project_id = %s"
+    INTERACTIONS_QUERY = """
+        SELECT i.id, i.interaction_id, i.type, i.subtype, i.pattern,
+               p.type AS protocol_type, p.message_types AS protocol_message_types
+        FROM interactions i LEFT JOIN interaction_protocols p ON p.interaction_id = i.id
+        WHERE i.project_id = %s ORDER BY i.id
+    """
+    PARTICIPANTS_QUERY = """
+        SELECT ip.interaction_id, ip.agent_id
+        FROM interaction_participants ip JOIN interactions i ON i.id = ip.interaction_id
+        WHERE i.project_id = %s ORDER BY ip.id
+    """
+
+    def __init__(self, cursor, placeholder="%s"):
+        self.cursor = cursor
+        self.placeholder = placeholder
+
+    def _fetch(self, query, project_id):
+        if self.placeholder != "%s":
+            query = query.replace("%s", self.placeholder)
+        self.cursor.execute(query, (project_id,))
+        return self.cursor.fetchall()
+
+    def _fetch_optional(self, query, project_id):
+        # tools/connections are missing from schemas that predate migration 1;
+        # any other error must reach the caller rather than yield an empty list
+        try:
+            return self._fetch(query, project_id)
+        except Exception as e:
+            if _is_missing_table(e):
+                return []
+            raise
+
+    def load(self, project_id):
+        """Return the project graph, or None if the project does not exist."""
+        project_rows = self._fetch(self.PROJECT_QUERY, project_id)
+        if not project_rows:
+            return None
+        project = project_rows[0]
+
+        agents = self._fetch(self.AGENTS_QUERY, project_id)
+        models = self._fetch(self.AGENT_MODELS_QUERY, project_id)
+        capabilities = self._fetch(self.AGENT_CAPABILITIES_QUERY, project_id)
+        agent_tools = self._fetch(self.AGENT_TOOLS_QUERY, project_id)
+        tools = self._fetch_optional(self.TOOLS_QUERY, project_id)
+        connections = self._fetch_optional(self.CONNECTIONS_QUERY, project_id)
+        interaction_rows = self._fetch(self.INTERACTIONS_QUERY, project_id)
+        participants = self._fetch(self.PARTICIPANTS_QUERY, project_id)
+
+        # Index child rows by their parent's primary key
+        models_by_agent = {}
+        for row in models:
+            models_by_agent.setdefault(row["agent_id"], {
+                "name": row["name"],
+                "version": row["version"],
+                "provider": row["provider"],
+                "parameters": _parse_literal(row["parameters"], {}),
+            })
+        capabilities_by_agent = defaultdict(list)
+        for row in capabilities:
+            capabilities_by_agent[row["agent_id"]].append(row["capability"])
+        tools_by_agent = defaultdict(list)
+        for row in agent_tools:
+            tools_by_agent[row["agent_id"]].append({
+                "name": row["name"],
+                "description": row["description"],
+                "type": row["type"],
+                "subtype": row["subtype"],
+                "parameters": _parse_literal(row["parameters"], {}),
+            })
+        participants_by_interaction = defaultdict(list)
+        for row in participants:
+            participants_by_interaction[row["interaction_id"]].append(row["agent_id"])
+
+        # Add position data for frontend visualization
+        agents = [
+            {
+                **agent,
+                "model": models_by_agent.get(agent["id"]),
+                "capabilities": capabilities_by_agent.get(agent["id"], []),
+                "tools": tools_by_agent.get(agent["id"], []),
+                "position": {"x": 200 + i * 150, "y": 200 + (i % 3) * 100}
+            } for i, agent in enumerate(agents)
+        ]
+        tools = [
+            {
+                **tool,
+                "position": {"x": 200 + i * 100, "y": 500}
+            } for i, tool in enumerate(tools)
+        ]
+
+        interactions = []
+        seen = set()
+        for row in interaction_rows:
+            if row["id"] in seen:
+                continue
+            seen.add(row["id"])
+            interaction = {
+                "id": row["interaction_id"],
+                "type": row["type"],
+                "subtype": row["subtype"],
+                "pattern": row["pattern"],
+                "participants": participants_by_interaction.get(row["id"], []),
+            }
+            if row.get("protocol_type"):
+                interaction["protocol"] = {
+                    "type": row["protocol_type"],
+                    "messageTypes": _parse_literal(row["protocol_message_types"], []),
+                }
+            interactions.append(interaction)
+
+        # Canvas saves only store connections; present them as interactions too
+        interaction_ids = {interaction["id"] for interaction in interactions}
+        for conn_data in connections:
+            interaction = connection_to_interaction(conn_data)
+            if interaction["id"] not in interaction_ids:
+                interactions.append(interaction)
+
+        return {
+            "project": {
+                "id": project["id"],
+                "name": project["name"],
+                "version": project["version"],
+                "description": project["description"],
+                "created_at": project["created_at"],
+                "revision": project["revision"]
+            },
+            "agents": agents,
+            "tools": tools,
+            "interactions": interactions,
+            "connections": connections
+        }
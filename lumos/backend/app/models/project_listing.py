@@ -0,0 +1,83 @@
+import base64
+import json
+
+LIST_FIELDS = ("id", "name", "version", "description", "created_at")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+COUNT_MODES = ("none", "estimate", "exact")
+
+
+def encode_cursor(row):
+    """Opaque keyset cursor pointing just past `row` in (created_at, id) DESC order."""
+    payload = json.dumps([str(row["created_at"]), row["id"]])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor. Raises ValueError on anything malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, project_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(created_at, str) or not isinstance(project_id, int):
+        raise ValueError("Invalid cursor")
+    return created_at, project_id
+
+
+def parse_fields(fields):
+    """Turn a comma-separated field list into a validated tuple (all fields if empty)."""
+    if not fields:
+        return LIST_FIELDS
+    selected = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in selected if f not in LIST_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(LIST_FIELDS)}")
+    return selected or LIST_FIELDS
+
+
+def _escape_like(value):
+    # '!' rather than backslash so the same ESCAPE clause works in MySQL and SQLite
+    return value.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+
+def build_filters(name=None, version=None, placeholder="%s"):
+    """WHERE clauses and params for the name-prefix and exact-version filters."""
+    clauses, params = [], []
+    if name:
+        clauses.append(f"name LIKE {placeholder} ESCAPE '!'")
+        params.append(_escape_like(name) + "%")
+    if version:
+        clauses.append(f"version = {placeholder}")
+        params.append(version)
+    return clauses, params
+
+
+def build_list_query(limit, after=None, name=None, version=None, fields=LIST_FIELDS, placeholder="%s"):
+    """
+    Keyset-paginated project listing, newest first. Fetches one extra row so
+    the caller can tell whether another page exists. id and created_at are
+    always selected because the cursor is built from them.
+    """
+    columns = list(dict.fromkeys(("id", "created_at") + tuple(fields)))
+    clauses, params = build_filters(name, version, placeholder)
+    if after:
+        # Expanded form of (created_at, id) < (?, ?) so the composite index is usable
+        clauses.append(f"(created_at < {placeholder} OR (created_at = {placeholder} AND id < {placeholder}))")
+        params.extend([after[0], after[0], after[1]])
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    query = (
+        f"SELECT {', '.join(columns)} FROM projects{where} "
+        f"ORDER BY created_at DESC, id DESC LIMIT {placeholder}"
+    )
+    params.append(limit + 1)
+    return query, tuple(params)
+
+
+def build_page(rows, limit, fields=LIST_FIELDS):
+    """Trim the look-ahead row, project the requested fields and compute next_cursor."""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1]) if has_more and rows else None
+    projects = [{field: row[field] for field in fields} for row in rows]
+    return projects, next_cursor
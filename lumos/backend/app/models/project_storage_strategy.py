@@ -1,4 +1,3 @@
-
 from abc import ABC, abstractmethod
 
 class ProjectStorageStrategy(ABC):
@@ -9,3 +8,38 @@ class ProjectStorageStrategy(ABC):
     @abstractmethod
     def create_project(self, project_data):
         pass
+
+    @abstractmethod
+    def get_all_projects(self, limit, after=None, name=None, version=None, fields=None, count="none"):
+        """
+        Return {"projects": [...], "next_cursor": ...} (plus total/total_is_estimate
+        when counting). Raise on storage errors rather than returning an empty page.
+        """
+        pass
+
+    @abstractmethod
+    def get_project_by_id(self, project_id):
+        """Return the hydrated project graph, or an error dict if it does not exist"""
+        pass
+
+
+class AsyncProjectStorageStrategy(ABC):
+    """The same operations as ProjectStorageStrategy, as coroutines"""
+
+    @abstractmethod
+    async def save_project(self, project_data):
+        pass
+
+    @abstractmethod
+    async def create_project(self, project_data):
+        pass
+
+    @abstractmethod
+    async def get_all_projects(self, **filters):
+        """See ProjectStorageStrategy.get_all_projects"""
+        pass
+
+    @abstractmethod
+    async def get_project_by_id(self, project_id):
+        """See ProjectStorageStrategy.get_project_by_id"""
+        pass
@@ -6,11 +6,40 @@ from mysql.connector import Error
 ##typeof import
 
 import json
+from .project_hydrator import ProjectHydrator
+from .project_listing import DEFAULT_PAGE_SIZE, LIST_FIELDS, build_filters, build_list_query, build_page
+from .project_diff import connection_numeric_ids, diff_rows, diff_summary, tool_numeric_ids
+
+# Rows per multi-row INSERT; keeps each statement well under max_allowed_packet
+INSERT_BATCH_SIZE = 500
+
+# Canvas tables written by save_project: (key column, value columns in _canvas_rows order)
+CANVAS_TABLES = {
+    "agents": ("agent_id", ("name", "description", "type", "subtype")),
+    "tools": ("id", ("name", "description", "type")),
+    "connections": ("id", ("source", "target", "label")),
+}
 
 class SQLProjectStorage(ProjectStorageStrategy):
     def __init__(self):
         self.db = Database()
 
+    @staticmethod
+    def _insert_many(cursor, query, rows):
+        """Insert rows in chunks; the driver rewrites each chunk into one multi-row INSERT."""
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            cursor.executemany(query, rows[start:start + INSERT_BATCH_SIZE])
+
+    @staticmethod
+    def _inserted_ids(cursor, table, project_id):
+        """
+        Auto-increment ids of the rows just inserted for a new project, in insert
+        order. A multi-row INSERT assigns ascending ids, so ordering by id lines
+        them up with the input list without needing lastrowid per row.
+        """
+        cursor.execute(f"SELECT id FROM {table} WHERE project_id = %s ORDER BY id", (project_id,))
+        return [row['id'] if isinstance(row, dict) else row[0] for row in cursor.fetchall()]
+
     def create_project(self, project_data):
         conn = self.db.get_connection()
         cursor = conn.cursor(dictionary=True)
@@ -26,71 +55,76 @@ class SQLProjectStorage(ProjectStorageStrategy):
             project_id = cursor.lastrowid
             
             # Insert authors
-            for author in project_data['project'].get('authors', []):
-                cursor.execute("""
-                    INSERT INTO authors (project_id, name)
-                    VALUES (%s, %s)
-                """, (project_id, author))
+            self._insert_many(cursor, """
+                INSERT INTO authors (project_id, name)
+                VALUES (%s, %s)
+            """, [(project_id, author) for author in project_data['project'].get('authors', [])])
             
-            # Insert agents
-            for agent in project_data.get('agents', []):
-                cursor.execute("""
-                    INSERT INTO agents (project_id, agent_id, name, description, type, subtype)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                """, (project_id, agent['id'], agent['name'], agent['description'], 
-                      agent['type'], agent.get('subtype', '')))
-                agent_id = cursor.lastrowid
-                
-                # Insert agent model if exists
+            # Insert agents, then resolve their auto-increment ids in one query
+            agents = project_data.get('agents', [])
+            self._insert_many(cursor, """
+                INSERT INTO agents (project_id, agent_id, name, description, type, subtype)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, [(project_id, agent['id'], agent['name'], agent['description'],
+                   agent['type'], agent.get('subtype', '')) for agent in agents])
+            agent_ids = self._inserted_ids(cursor, "agents", project_id) if agents else []
+            
+            model_rows = []
+            capability_rows = []
+            tool_rows = []
+            for agent_id, agent in zip(agent_ids, agents):
                 if agent.get('model'):
-                    cursor.execute("""
-                        INSERT INTO agent_models (agent_id, name, version, provider, parameters)
-                        VALUES (%s, %s, %s, %s, %s)
-                    """, (agent_id, agent['model'].get('name', ''), 
-                          agent['model'].get('version', 'latest'),
-                          agent['model'].get('provider', ''),
-                          str(agent['model'].get('parameters', {}))))
-                
-                # Insert agent capabilities
+                    model_rows.append((agent_id, agent['model'].get('name', ''), 
+                                       agent['model'].get('version', 'latest'),
+                                       agent['model'].get('provider', ''),
+                                       str(agent['model'].get('parameters', {}))))
                 for capability in agent.get('capabilities', []):
-                    cursor.execute("""
-                        INSERT INTO agent_capabilities (agent_id, capability)
-                        VALUES (%s, %s)
-                    """, (agent_id, capability))
-                
-                # Insert agent tools
+                    capability_rows.append((agent_id, capability))
                 for tool in agent.get('tools', []):
-                    cursor.execute("""
-                        INSERT INTO agent_tools (agent_id, name, description, type, subtype, parameters)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                    """, (agent_id, tool['name'], tool['description'], 
-                          tool['type'], tool.get('subtype', ''),
-                          str(tool.get('parameters', {}))))
+                    tool_rows.append((agent_id, tool['name'], tool['description'], 
+                                      tool['type'], tool.get('subtype', ''),
+                                      str(tool.get('parameters', {}))))
             
-            # Insert interactions
-            for interaction in project_data.get('interactions', []):
-                cursor.execute("""
-                    INSERT INTO interactions (project_id, interaction_id, type, subtype, pattern)
-                    VALUES (%s, %s, %s, %s, %s)
-                """, (project_id, interaction['id'], interaction['type'], 
-                      interaction.get('subtype', ''), interaction.get('pattern', '')))
-                
-                interaction_id = cursor.lastrowid
-                
-                # Insert participants
+            self._insert_many(cursor, """
+                INSERT INTO agent_models (agent_id, name, version, provider, parameters)
+                VALUES (%s, %s, %s, %s, %s)
+            """, model_rows)
+            self._insert_many(cursor, """
+                INSERT INTO agent_capabilities (agent_id, capability)
+                VALUES (%s, %s)
+            """, capability_rows)
+            self._insert_many(cursor, """
+                INSERT INTO agent_tools (agent_id, name, description, type, subtype, parameters)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, tool_rows)
+            
+            # Insert interactions, then their participants and protocols
+            interactions = project_data.get('interactions', [])
+            self._insert_many(cursor, """
+                INSERT INTO interactions (project_id, interaction_id, type, subtype, pattern)
+                VALUES (%s, %s, %s, %s, %s)
+            """, [(project_id, interaction['id'], interaction['type'], 
+                   interaction.get('subtype', ''), interaction.get('pattern', ''))
+                  for interaction in interactions])
+            interaction_ids = self._inserted_ids(cursor, "interactions", project_id) if interactions else []
+            
+            participant_rows = []
+            protocol_rows = []
+            for interaction_id, interaction in zip(interaction_ids, interactions):
                 for participant in interaction.get('participants', []):
-                    cursor.execute("""
-                        INSERT INTO interaction_participants (interaction_id, agent_id)
-                        VALUES (%s, %s)
-                    """, (interaction_id, participant))
-                
-                # Insert protocol
+                    participant_rows.append((interaction_id, participant))
                 if interaction.get('protocol'):
-                    cursor.execute("""
-                        INSERT INTO interaction_protocols (interaction_id, type, message_types)
-                        VALUES (%s, %s, %s)
-                    """, (interaction_id, interaction['protocol']['type'],
-                          str(interaction['protocol'].get('messageTypes', []))))
+                    protocol_rows.append((interaction_id, interaction['protocol']['type'],
+                                          str(interaction['protocol'].get('messageTypes', []))))
+            
+            self._insert_many(cursor, """
+                INSERT INTO interaction_participants (interaction_id, agent_id)
+                VALUES (%s, %s)
+            """, participant_rows)
+            self._insert_many(cursor, """
+                INSERT INTO interaction_protocols (interaction_id, type, message_types)
+                VALUES (%s, %s, %s)
+            """, protocol_rows)
             
             conn.commit()
             return {"status": "success", "project_id": project_id}
@@ -100,10 +134,95 @@ class SQLProjectStorage(ProjectStorageStrategy):
             return {"status": "error", "message": str(e)}
         finally:
             cursor.close()
+            conn.close()
             
             
+    @staticmethod
+    def _canvas_rows(project_data):
+        """
+        Rows for a canvas save, keyed the way the diff matches them against
+        stored rows: agents by their string id, tools and connections by the
+        stable numeric id derived from theirs.
+        """
+        agents = {}
+        for agent in project_data.get('agents', []):
+            # Positions are not persisted
+            agent.pop('position', None)
+            if agent.get('id', '') in agents:
+                raise ValueError(f"Duplicate agent id {agent.get('id', '')!r}")
+            agents[agent.get('id', '')] = (
+                agent.get('name', ''),
+                agent.get('description', ''),
+                agent.get('type', ''),
+                agent.get('subtype', '')
+            )
+        tools = {}
+        tool_list = project_data.get('tools', [])
+        for tool_id, tool in zip(tool_numeric_ids(tool_list), tool_list):
+            tool.pop('position', None)
+            if tool_id in tools:
+                raise ValueError(f"Duplicate tool id {tool.get('id', '')!r}")
+            tools[tool_id] = (
+                tool.get('name', ''),
+                tool.get('description', ''),
+                tool.get('type', '')
+            )
+        connection_list = project_data.get('connections', [])
+        connections = {
+            numeric_id: (
+                connection.get('source', ''),  # Use string IDs
+                connection.get('target', ''),
+                connection.get('label', '')
+            ) for numeric_id, connection in zip(connection_numeric_ids(connection_list), connection_list)
+        }
+        return {"agents": agents, "tools": tools, "connections": connections}
+
+    def _stored_rows(self, cursor, project_id):
+        """The stored counterpart of _canvas_rows, for diffing"""
+        cursor.execute(
+            "SELECT agent_id, name, description, type, subtype FROM agents WHERE project_id = %s",
+            (project_id,)
+        )
+        agents = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+        cursor.execute("SELECT id, name, description, type FROM tools WHERE project_id = %s", (project_id,))
+        tools = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+        cursor.execute("SELECT id, source, target, label FROM connections WHERE project_id = %s", (project_id,))
+        connections = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+        return {"agents": agents, "tools": tools, "connections": connections}
+
+    def _apply_diff(self, cursor, project_id, table, diff):
+        key_column, columns = CANVAS_TABLES[table]
+        if diff.removed:
+            cursor.executemany(
+                f"DELETE FROM {table} WHERE project_id = %s AND {key_column} = %s",
+                [(project_id, key) for key in diff.removed]
+            )
+        if diff.changed:
+            assignments = ', '.join(f"{column} = %s" for column in columns)
+            cursor.executemany(
+                f"UPDATE {table} SET {assignments} WHERE project_id = %s AND {key_column} = %s",
+                [(*row, project_id, key) for key, row in diff.changed]
+            )
+        if diff.added:
+            placeholders = ', '.join(['%s'] * (len(columns) + 2))
+            self._insert_many(
+                cursor,
+                f"INSERT INTO {table} ({key_column}, project_id, {', '.join(columns)}) VALUES ({placeholders})",
+                [(key, project_id, *row) for key, row in diff.added]
+            )
+
     def save_project(self, project_data):
-        """Save a project to the database"""
+        """
+        Save a canvas. Without `project.id` this creates a new project. With
+        it, the stored graph is updated in place: only the agents, tools and
+        connections that differ are written, all in one transaction. If
+        `project.revision` is given it must match the stored revision, so a
+        stale client gets a conflict instead of overwriting newer work.
+        """
+        project = project_data.get('project', {})
+        if project.get('id') is not None:
+            return self._update_project(project['id'], project.get('revision'), project_data)
+
         try:
             conn = self.db.get_connection()
             cursor = conn.cursor()
@@ -112,113 +231,23 @@ class SQLProjectStorage(ProjectStorageStrategy):
                 # Start transaction
                 conn.start_transaction()
                 
-                # Save project
-                project = project_data.get('project', {})
-                project_name = project.get('name', 'Untitled Project')
-                project_version = project.get('version', '1.0')
-                project_description = project.get('description', '')
-                
                 # Insert project
                 cursor.execute(
                     "INSERT INTO projects (name, version, description) VALUES (%s, %s, %s)",
-                    (project_name, project_version, project_description)
+                    (project.get('name', 'Untitled Project'), project.get('version', '1.0'),
+                     project.get('description', ''))
                 )
                 project_id = cursor.lastrowid
                 
-                # ID mapping for special agents
-                id_mapping = {
-                    'user-input': 0,
-                    'user-output': 1
-                }
-                
-                # Save agents WITHOUT position data
-                for agent in project_data.get('agents', []):
-                    # Remove position data if it exists
-                    if 'position' in agent:
-                        del agent['position']
-                    
-                    # Get the original agent ID
-                    agent_id = agent.get('id', '')
-                    
-                    cursor.execute(
-                        "INSERT INTO agents (agent_id, project_id, name, description, type, subtype) VALUES (%s, %s, %s, %s, %s, %s)",
-                        (
-                            agent_id,  # Use original string ID
-                            project_id,
-                            agent.get('name', ''),
-                            agent.get('description', ''),
-                            agent.get('type', ''),
-                            agent.get('subtype', '')
-                        )
-                    )
-                
-                # Save tools WITHOUT position data
-                for tool in project_data.get('tools', []):
-                    # Remove position data if it exists
-                    if 'position' in tool:
-                        del tool['position']
-                    
-                    # Similar ID handling for tools if needed
-                    tool_id = tool.get('id', '')
-                    try:
-                        if tool_id.startswith('tool-'):
-                            numeric_id = int(tool_id.split('-')[1])
-                        else:
-                            numeric_id = 20000 + hash(tool_id) % 10000
-                    except:
-                        numeric_id = 20000  # Default if parsing fails
-                    
-                    cursor.execute(
-                        "INSERT INTO tools (id, project_id, name, description, type) VALUES (%s, %s, %s, %s, %s)",
-                        (
-                            numeric_id,
-                            project_id,
-                            tool.get('name', ''),
-                            tool.get('description', ''),
-                            tool.get('type', '')
-                        )
-                    )
-                
-                # Save connections with unique IDs
-                used_connection_ids = set()  # Track used IDs to prevent duplicates
-                for connection in project_data.get('connections', []):
-                    conn_id = connection.get('id', '')
-                    
-                    # Generate a numeric ID based on the string ID
-                    base_numeric_id = abs(hash(conn_id)) % 1000000
-                    numeric_conn_id = base_numeric_id
-                    
-                    # If ID collision, keep incrementing until we find an unused ID
-                    counter = 1
-                    while numeric_conn_id in used_connection_ids:
-                        numeric_conn_id = base_numeric_id + counter
-                        counter += 1
-                    
-                    # Add to used IDs set
-                    used_connection_ids.add(numeric_conn_id)
-                    
-                    # Map source and target IDs (keep existing code)
-                    source = connection.get('source', '')
-                    target = connection.get('target', '')
-                    
-                    # Keep the existing source/target ID mapping logic
-                    source_id = source  # Use string IDs directly
-                    target_id = target  # Use string IDs directly
-                    
-                    cursor.execute(
-                        "INSERT INTO connections (id, project_id, source, target, label) VALUES (%s, %s, %s, %s, %s)",
-                        (
-                            numeric_conn_id,
-                            project_id,
-                            source_id,  # Use string IDs
-                            target_id,  # Use string IDs
-                            connection.get('label', '')
-                        )
-                    )
+                # A new project is one big "added" diff
+                empty = {"agents": {}, "tools": {}, "connections": {}}
+                incoming = self._canvas_rows(project_data)
+                for table in CANVAS_TABLES:
+                    self._apply_diff(cursor, project_id, table, diff_rows(empty[table], incoming[table]))
                 
                 # Commit transaction
                 conn.commit()
-                return {"status": "success", "project_id": project_id}
+                return {"status": "success", "project_id": project_id, "revision": 1}
                 
             except Exception as e:
                 conn.rollback()
@@ -227,6 +256,127 @@ class SQLProjectStorage(ProjectStorageStrategy):
         except Exception as e:
             return {"status": "error", "message": str(e)}
         finally:
-            if 'conn' in locals() and conn.is_connected():
+            # Always release the pooled connection, even if the socket died mid-save
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+
+    def _update_project(self, project_id, expected_revision, project_data):
+        project = project_data.get('project', {})
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        try:
+            conn.start_transaction()
+
+            # Bumping the revision first also row-locks the project, so
+            # concurrent saves of the same project apply one after another
+            query = ("UPDATE projects SET name = %s, version = %s, description = %s, "
+                     "revision = revision + 1 WHERE id = %s")
+            params = [project.get('name', 'Untitled Project'), project.get('version', '1.0'),
+                      project.get('description', ''), project_id]
+            if expected_revision is not None:
+                query += " AND revision = %s"
+                params.append(expected_revision)
+            cursor.execute(query, tuple(params))
+
+            if cursor.rowcount == 0:
+                cursor.execute("SELECT revision FROM projects WHERE id = %s", (project_id,))
+                row = cursor.fetchone()
+                conn.rollback()
+                if row is None:
+                    return {"status": "error", "message": f"Project with ID {project_id} not found"}
+                return {
+                    "status": "error",
+                    "conflict": True,
+                    "revision": row[0],
+                    "message": f"Project {project_id} was saved elsewhere (revision {row[0]}, "
+                               f"expected {expected_revision}); reload before saving"
+                }
+
+            stored = self._stored_rows(cursor, project_id)
+            incoming = self._canvas_rows(project_data)
+            diffs = {table: diff_rows(stored[table], incoming[table]) for table in CANVAS_TABLES}
+            for table, diff in diffs.items():
+                self._apply_diff(cursor, project_id, table, diff)
+
+            cursor.execute("SELECT revision FROM projects WHERE id = %s", (project_id,))
+            revision = cursor.fetchone()[0]
+            conn.commit()
+            return {"status": "success", "project_id": project_id, "revision": revision,
+                    "changes": diff_summary(diffs)}
+        except Exception as e:
+            conn.rollback()
+            return {"status": "error", "message": str(e)}
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_all_projects(self, limit=DEFAULT_PAGE_SIZE, after=None, name=None, version=None,
+                         fields=LIST_FIELDS, count="none"):
+        """
+        Fetch one page of projects, newest first, using keyset pagination on
+        (created_at, id). `after` is a decoded cursor; `count` is "none",
+        "estimate" (planner/table statistics, O(1)) or "exact" (COUNT(*)).
+        Database errors propagate, so an outage is never mistaken for (and
+        cached as) an empty list.
+        """
+        query, params = build_list_query(limit, after, name, version, fields)
+        conn = self.db.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute(query, params)
+            projects, next_cursor = build_page(cursor.fetchall(), limit, fields)
+            page = {"projects": projects, "next_cursor": next_cursor}
+            if count != "none":
+                page["total"] = self._count_projects(cursor, count, name, version)
+                page["total_is_estimate"] = count == "estimate"
+            return page
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _count_projects(self, cursor, mode, name=None, version=None):
+        clauses, params = build_filters(name, version)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        if mode == "exact":
+            cursor.execute(f"SELECT COUNT(*) AS total FROM projects{where}", params)
+            return cursor.fetchone()["total"]
+        if not clauses:
+            # InnoDB's cached row estimate; avoids scanning the table
+            cursor.execute(
+                "SELECT TABLE_ROWS AS total FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'projects'"
+            )
+            row = cursor.fetchone()
+            return int(row["total"] or 0) if row else 0
+        # Filtered estimate straight from the optimizer's row estimate
+        cursor.execute(f"EXPLAIN SELECT 1 FROM projects{where}", params)
+        rows = cursor.fetchall()
+        return int(rows[0].get("rows") or 0) if rows else 0
+
+    def get_project_by_id(self, project_id):
+        """
+        Fetch a complete project by ID including agents, tools, and interactions
+        """
+        conn = None
+        cursor = None
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor(dictionary=True)
+            
+            project = ProjectHydrator(cursor).load(project_id)
+            if not project:
+                return {"status": "error", "message": f"Project with ID {project_id} not found"}
+            return project
+        
+        except Exception as e:
+            print(f"Error fetching project by ID: {str(e)}")
+            return {"status": "error", "message": str(e)}
+        
+        finally:
+            # Only close cursor and connection if they exist
+            if cursor:
                 cursor.close()
-                conn.close()
\ No newline at end of file
+            if conn and hasattr(conn, 'close'):
+                conn.close()
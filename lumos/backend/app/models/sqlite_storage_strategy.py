@@ -0,0 +1,256 @@
+import os
+import sqlite3
+import threading
+from functools import lru_cache
+from .sql_storage_strategy import SQLProjectStorage
+from .project_listing import build_filters
+
+SQLITE_PATH = os.getenv("SQLITE_PATH", "lumos.db")
+
+# schema.sql plus the tables and indexes added by init_db migrations, in SQLite dialect
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    description TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    revision INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_projects_created_at_id ON projects (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_projects_version_created_at_id ON projects (version, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_projects_name ON projects (name);
+
+CREATE TABLE IF NOT EXISTS authors (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_authors_project_id ON authors (project_id);
+
+CREATE TABLE IF NOT EXISTS agents (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    agent_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT,
+    type TEXT NOT NULL,
+    subtype TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_agents_project_agent ON agents (project_id, agent_id);
+
+CREATE TABLE IF NOT EXISTS agent_models (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    agent_id INTEGER NOT NULL REFERENCES agents(id) ON DELETE CASCADE,
+    name TEXT,
+    version TEXT,
+    provider TEXT,
+    parameters TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_agent_models_agent_id ON agent_models (agent_id);
+
+CREATE TABLE IF NOT EXISTS agent_capabilities (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    agent_id INTEGER NOT NULL REFERENCES agents(id) ON DELETE CASCADE,
+    capability TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_agent_capabilities_agent_id ON agent_capabilities (agent_id);
+
+CREATE TABLE IF NOT EXISTS agent_tools (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    agent_id INTEGER NOT NULL REFERENCES agents(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    description TEXT,
+    type TEXT NOT NULL,
+    subtype TEXT,
+    parameters TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_agent_tools_agent_id ON agent_tools (agent_id);
+
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    interaction_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    subtype TEXT,
+    pattern TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_interactions_project_id ON interactions (project_id);
+
+CREATE TABLE IF NOT EXISTS interaction_participants (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    interaction_id INTEGER NOT NULL REFERENCES interactions(id) ON DELETE CASCADE,
+    agent_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_interaction_participants_interaction_id ON interaction_participants (interaction_id);
+CREATE INDEX IF NOT EXISTS idx_interaction_participants_agent_id ON interaction_participants (agent_id);
+
+CREATE TABLE IF NOT EXISTS interaction_protocols (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    interaction_id INTEGER NOT NULL REFERENCES interactions(id) ON DELETE CASCADE,
+    type TEXT NOT NULL,
+    message_types TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_interaction_protocols_interaction_id ON interaction_protocols (interaction_id);
+
+CREATE TABLE IF NOT EXISTS tools (
+    id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    description TEXT,
+    type TEXT,
+    PRIMARY KEY (project_id, id)
+);
+
+CREATE TABLE IF NOT EXISTS connections (
+    id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    label TEXT,
+    PRIMARY KEY (project_id, id)
+);
+"""
+
+# Columns added after a database file may already exist: (table, column, definition)
+COLUMN_UPGRADES = (
+    ("projects", "revision", "INTEGER NOT NULL DEFAULT 1"),
+)
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",       # readers never block the writer
+    "PRAGMA synchronous = NORMAL",     # fsync at checkpoints only; safe with WAL
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",      # ~16 MB page cache per connection
+    "PRAGMA mmap_size = 134217728",    # 128 MB memory-mapped reads
+    "PRAGMA busy_timeout = 5000",
+)
+
+
+@lru_cache(maxsize=512)
+def _to_qmark(query):
+    """The SQL strategy writes MySQL-style %s placeholders; SQLite wants ?"""
+    return query.replace("%s", "?")
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class SQLiteCursor:
+    """Cursor with the slice of the mysql-connector API that SQLProjectStorage uses."""
+
+    def __init__(self, raw_conn, dictionary=False):
+        self._cursor = raw_conn.cursor()
+        if dictionary:
+            self._cursor.row_factory = _dict_row
+
+    def execute(self, query, params=()):
+        self._cursor.execute(_to_qmark(query), params)
+
+    def executemany(self, query, rows):
+        self._cursor.executemany(_to_qmark(query), rows)
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """
+    Handle on the calling thread's SQLite connection. close() only ends any
+    open transaction; the underlying connection stays cached for the thread.
+    """
+
+    def __init__(self, raw_conn):
+        self._raw = raw_conn
+
+    def cursor(self, dictionary=False):
+        return SQLiteCursor(self._raw, dictionary)
+
+    @property
+    def in_transaction(self):
+        return self._raw.in_transaction
+
+    def start_transaction(self):
+        if not self._raw.in_transaction:
+            # Take the write lock up front so concurrent saves queue instead of deadlocking
+            self._raw.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        if self._raw.in_transaction:
+            self._raw.rollback()
+
+
+class SQLiteDatabase:
+    """Drop-in for Database backed by one SQLite connection per thread."""
+
+    def __init__(self, path=None, schema=SCHEMA, upgrades=()):
+        self.path = path or SQLITE_PATH
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(schema)
+        for table, column, definition in upgrades:
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        conn.commit()
+        conn.close()
+
+    def _connect(self):
+        # The sqlite3 module keeps compiled statements per connection, so the
+        # fixed set of queries the strategy issues are prepared once per thread
+        conn = sqlite3.connect(self.path, cached_statements=256)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def get_connection(self):
+        raw = getattr(self._local, "conn", None)
+        if raw is None:
+            raw = self._local.conn = self._connect()
+        return SQLiteConnection(raw)
+
+
+class SQLiteProjectStorage(SQLProjectStorage):
+    """
+    Embedded storage for single-node installs and tests. Reuses the SQL
+    strategy's batched inserts and set-based hydration on top of SQLite in
+    WAL mode, so no MySQL server is needed. Path comes from SQLITE_PATH.
+    """
+
+    def __init__(self, path=None):
+        self.db = SQLiteDatabase(path, upgrades=COLUMN_UPGRADES)
+
+    def _count_projects(self, cursor, mode, name=None, version=None):
+        clauses, params = build_filters(name, version)
+        if mode == "estimate" and not clauses:
+            # AUTOINCREMENT ids are never reused, so the max id is an O(log n) upper bound
+            cursor.execute("SELECT MAX(id) AS total FROM projects")
+            return cursor.fetchone()["total"] or 0
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor.execute(f"SELECT COUNT(*) AS total FROM projects{where}", params)
+        return cursor.fetchone()["total"]
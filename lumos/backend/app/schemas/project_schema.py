@@ -84,8 +84,14 @@ class ConnectionSave(BaseModel):
     target: str
     label: Optional[str] = ""
 
+class ProjectSaveInfo(ProjectBase):
+    # Set when saving a project that was loaded from the backend: it is then
+    # updated in place, and rejected if revision no longer matches
+    id: Optional[int] = None
+    revision: Optional[int] = None
+
 class ProjectSave(BaseModel):
-    project: ProjectBase
+    project: ProjectSaveInfo
     agents: List[AgentSave] = []
     tools: List[ToolSave] = []
     tasks: List[TaskSave] = []
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from .image_manager import run_docker
+from .route_map import remove_routes
+from ..utils.metrics_utils import register_metrics_provider
+
+# Exported containers unused for this many seconds are removed
+CONTAINER_TTL = float(os.getenv("CONTAINER_TTL", str(24 * 3600)))
+# At most this many exported containers; the least recently used go first
+MAX_EXPORTED_CONTAINERS = int(os.getenv("MAX_EXPORTED_CONTAINERS", "50"))
+# Survives backend restarts so containers started earlier are still collected
+CONTAINER_INVENTORY_PATH = os.getenv("CONTAINER_INVENTORY_PATH", "container_inventory.json")
+SWEEP_INTERVAL = 60
+
+
+class ContainerRecord:
+    # kind is "container" for a ui_app container, "runtime" for an export
+    # served by the backend's shared runtime (no container, no port)
+    def __init__(self, name, port, project, created_at=None, last_used=None, kind="container"):
+        self.name = name
+        self.port = port
+        self.project = project
+        self.created_at = created_at or time.time()
+        self.last_used = last_used or self.created_at
+        self.kind = kind
+
+    def to_dict(self):
+        return {"name": self.name, "port": self.port, "project": self.project,
+                "created_at": self.created_at, "last_used": self.last_used, "kind": self.kind}
+
+
+async def unregister_runtime_route(name):
+    """Drop a runtime-hosted export's stored config"""
+    # Imported here so container-only installs never open the runtime database
+    from .runtime_registry import get_runtime_registry
+    await get_runtime_registry().unregister_async(name)
+
+
+class ContainerLifecycle:
+    """
+    Inventory of exported ui_app containers. Records are kept in least-
+    recently-used order; a container is stopped, removed and unrouted once it
+    has not been used for `ttl` seconds or when more than `max_containers`
+    exist. A background sweep enforces the TTL; registering enforces the cap
+    straight away. Exports served by the shared runtime are tracked the same
+    way; removing one unregisters its config instead of removing a container.
+    """
+
+    def __init__(self, docker=run_docker, ttl=CONTAINER_TTL, max_containers=MAX_EXPORTED_CONTAINERS,
+                 path=CONTAINER_INVENTORY_PATH, route_map_path=None, unregister=unregister_runtime_route):
+        self.docker = docker
+        self.unregister = unregister
+        self.ttl = ttl
+        self.max_containers = max_containers
+        self.path = path
+        self.route_map_path = route_map_path
+        self.records = OrderedDict()
+        self.removed = {"expired": 0, "evicted": 0, "manual": 0}
+        self._sweeper = None
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                saved = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Ignoring unreadable container inventory {self.path}: {str(e)}")
+            return
+        for item in sorted(saved, key=lambda item: item["last_used"]):
+            self.records[item["name"]] = ContainerRecord(**item)
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump([record.to_dict() for record in self.records.values()], f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def register(self, name, port, project, kind="container"):
+        """Track a newly exported container; evicts the least recently used ones over the cap"""
+        self.records[name] = ContainerRecord(name, port, {
+            "name": project.get("name"), "version": project.get("version")
+        }, kind=kind)
+        self._save()
+        self.start()
+        overflow = list(self.records)[:max(0, len(self.records) - self.max_containers)]
+        if overflow:
+            asyncio.ensure_future(self._remove_all(overflow, "evicted"))
+        return self.records[name]
+
+    def touch(self, name):
+        """Mark a container as used now; False if it is not tracked"""
+        record = self.records.get(name)
+        if record is None:
+            return False
+        record.last_used = time.time()
+        self.records.move_to_end(name)
+        self._save()
+        return True
+
+    async def remove(self, name, reason="manual"):
+        """Stop and remove a container and its route. False if it is not tracked."""
+        record = self.records.pop(name, None)
+        if record is None:
+            return False
+        self._save()
+        remove_routes([name], self.route_map_path)
+        if record.kind == "runtime":
+            await self.unregister(name)
+        else:
+            returncode, output = await self.docker("rm", "-f", name)
+            if returncode != 0 and "No such container" not in output:
+                print(f"⚠️ Could not remove container {name}: {output.strip()}")
+        self.removed[reason] += 1
+        return True
+
+    async def _remove_all(self, names, reason):
+        for name in names:
+            await self.remove(name, reason)
+
+    async def sweep(self):
+        """Remove every container idle for longer than the TTL"""
+        cutoff = time.time() - self.ttl
+        expired = [name for name, record in self.records.items() if record.last_used < cutoff]
+        await self._remove_all(expired, "expired")
+        return expired
+
+    def start(self):
+        """Start the background TTL sweep (needs a running event loop)"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.ensure_future(self._sweep_forever())
+
+    async def _sweep_forever(self):
+        while True:
+            await asyncio.sleep(min(SWEEP_INTERVAL, max(self.ttl, 1)))
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"⚠️ Container sweep failed: {str(e)}")
+
+    def inventory(self):
+        """Tracked containers, most recently used first"""
+        return [record.to_dict() for record in reversed(self.records.values())]
+
+    def stats(self):
+        return {"containers": len(self.records), "max_containers": self.max_containers,
+                "ttl": self.ttl, "removed": dict(self.removed)}
+
+
+_lifecycle = None
+
+
+def get_container_lifecycle():
+    """Process-wide container lifecycle manager, created on first use."""
+    global _lifecycle
+    if _lifecycle is None:
+        _lifecycle = ContainerLifecycle()
+    return _lifecycle
+
+
+register_metrics_provider("exported_containers", lambda: get_container_lifecycle().stats())
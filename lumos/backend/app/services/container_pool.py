@@ -0,0 +1,221 @@
+import asyncio
+import math
+import os
+import secrets
+import time
+from collections import deque
+import aiohttp
+from .image_manager import get_image_manager, run_docker
+from ..utils.network_utils import random_free_port, random_name
+from ..utils.metrics_utils import register_metrics_provider
+from ..utils.probe import get_session, wait_for_http
+
+# Idle containers kept ready: never fewer than MIN, never more than MAX
+WARM_POOL_MIN = int(os.getenv("WARM_POOL_MIN", "1"))
+WARM_POOL_MAX = int(os.getenv("WARM_POOL_MAX", "5"))
+# Idle containers above the current target are removed after this many seconds
+WARM_POOL_IDLE_TTL = float(os.getenv("WARM_POOL_IDLE_TTL", "600"))
+# How long a new container may take to answer /healthz
+CONTAINER_READY_TIMEOUT = float(os.getenv("CONTAINER_READY_TIMEOUT", "30"))
+# Window over which the export rate is measured for sizing the pool
+RATE_WINDOW = 300
+
+
+class PooledContainer:
+    def __init__(self, name, port, token, image=None):
+        self.name = name
+        self.port = port
+        self.token = token
+        self.image = image
+        self.url = f"http://localhost:{port}"
+        self.created_at = time.time()
+        self.idle_since = time.monotonic()
+
+
+async def probe_ready(url, timeout=CONTAINER_READY_TIMEOUT):
+    """Wait until the container's port is open and GET {url}/healthz answers 200"""
+    await wait_for_http(f"{url}/healthz", timeout)
+
+
+async def send_config(url, token, config):
+    """Hand a warm container its LDL config"""
+    async with get_session().post(f"{url}/config", json=config, headers={"X-Config-Token": token},
+                                  timeout=aiohttp.ClientTimeout(total=10)) as resp:
+        if resp.status != 200:
+            raise RuntimeError(f"Config load failed with {resp.status}: {await resp.text()}")
+
+
+class ContainerPool:
+    """
+    Keeps ui_app containers started and healthy before any export needs
+    one. A container starts unconfigured and receives its LDL config over a
+    token-protected POST /config when an export claims it, so an export
+    costs one HTTP call instead of a docker run and a fixed sleep.
+
+    The target number of idle containers follows the recent export rate
+    times the observed start-up time (the exports expected to arrive while a
+    replacement boots), clamped to [min_size, max_size]. Refills happen in the
+    background after each claim; idle containers above the target are
+    removed after idle_ttl seconds. Idle containers started from an older
+    image tag than the current one are never handed out and are removed.
+    """
+
+    def __init__(self, images=None, docker=run_docker, probe=probe_ready, configure=send_config,
+                 min_size=WARM_POOL_MIN, max_size=WARM_POOL_MAX, idle_ttl=WARM_POOL_IDLE_TTL):
+        self.images = images or get_image_manager()
+        self.docker = docker
+        self.probe = probe
+        self.configure = configure
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.idle = deque()
+        self.starting = 0
+        self._claims = deque()
+        self._start_times = deque(maxlen=20)
+        self._refill_task = None
+        self._maintenance_task = None
+        self.image = None
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def target_size(self):
+        now = time.monotonic()
+        while self._claims and self._claims[0] < now - RATE_WINDOW:
+            self._claims.popleft()
+        rate = len(self._claims) / RATE_WINDOW
+        start_time = sum(self._start_times) / len(self._start_times) if self._start_times else 5.0
+        return max(self.min_size, min(self.max_size, math.ceil(rate * start_time)))
+
+    async def start_container(self):
+        """docker run a fresh, unconfigured ui_app container and wait until it is healthy"""
+        started = time.monotonic()
+        image = self.image = await self.images.ensure_image()
+        container = PooledContainer(f"ui_{random_name()}", random_free_port(), secrets.token_urlsafe(24), image)
+        try:
+            returncode, output = await self.docker(
+                "run", "-d", "-p", f"{container.port}:5000", "--name", container.name,
+                "-e", f"CONFIG_TOKEN={container.token}", image
+            )
+        except BaseException:
+            # docker run may have created the container before it was cancelled
+            await self.docker("rm", "-f", container.name)
+            raise
+        if returncode != 0:
+            raise RuntimeError(f"docker run failed:\n{output}")
+        try:
+            await self.probe(container.url)
+        except BaseException:
+            await self.docker("rm", "-f", container.name)
+            raise
+        self._start_times.append(time.monotonic() - started)
+        return container
+
+    async def acquire(self, config):
+        """Claim a warm container (or start one if none is ready) and load `config` into it"""
+        self._claims.append(time.monotonic())
+        self.image = await self.images.ensure_image()
+        while self.idle:
+            container = self.idle.popleft()
+            self.schedule_refill()
+            if container.image != self.image:
+                # Started before ui_app changed; it would serve the old code
+                self.stale += 1
+                await self.docker("rm", "-f", container.name)
+                continue
+            try:
+                await self._configure(container, config)
+                self.hits += 1
+                return container
+            except Exception as e:
+                # Died while idle; try the next one, or fall through to a cold start
+                print(f"⚠️ Warm container {container.name} rejected its config: {str(e)}")
+        container = await self.start_container()
+        self.misses += 1
+        self.schedule_refill()
+        await self._configure(container, config)
+        return container
+
+    async def _configure(self, container, config):
+        try:
+            await self.configure(container.url, container.token, config)
+        except BaseException:
+            await self.docker("rm", "-f", container.name)
+            raise
+
+    def schedule_refill(self):
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.ensure_future(self._refill())
+        if self._maintenance_task is None or self._maintenance_task.done():
+            self._maintenance_task = asyncio.ensure_future(self._maintain())
+
+    async def _maintain(self):
+        # Reap even when no exports arrive to trigger a refill
+        while True:
+            await asyncio.sleep(max(self.idle_ttl / 4, 1))
+            try:
+                await self.reap()
+            except Exception as e:
+                print(f"⚠️ Warm pool reaping failed: {str(e)}")
+
+    async def _refill(self):
+        while len(self.idle) + self.starting < self.target_size():
+            self.starting += 1
+            try:
+                container = await self.start_container()
+            except Exception as e:
+                print(f"⚠️ Could not warm a ui_app container: {str(e)}")
+                return
+            finally:
+                self.starting -= 1
+            self.idle.append(container)
+        await self.reap()
+
+    async def reap(self):
+        """Remove idle containers from an outdated image, then those beyond the target once they have idled past idle_ttl"""
+        for container in [c for c in self.idle if c.image != self.image]:
+            self.idle.remove(container)
+            self.stale += 1
+            await self.docker("rm", "-f", container.name)
+        now = time.monotonic()
+        target = self.target_size()
+        while len(self.idle) > target and now - self.idle[0].idle_since > self.idle_ttl:
+            container = self.idle.popleft()
+            await self.docker("rm", "-f", container.name)
+
+    async def close(self):
+        tasks = [task for task in (self._refill_task, self._maintenance_task) if task is not None]
+        for task in tasks:
+            task.cancel()
+        # Let a container that was still starting remove itself
+        await asyncio.gather(*tasks, return_exceptions=True)
+        while self.idle:
+            await self.docker("rm", "-f", self.idle.popleft().name)
+
+    def stats(self):
+        claims = self.hits + self.misses
+        return {
+            "idle": len(self.idle),
+            "starting": self.starting,
+            "target": self.target_size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": self.hits / claims if claims else 0,
+            "average_start": sum(self._start_times) / len(self._start_times) if self._start_times else None,
+        }
+
+
+_pool = None
+
+
+def get_container_pool():
+    """Process-wide warm pool, created on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ContainerPool()
+    return _pool
+
+
+register_metrics_provider("warm_pool", lambda: get_container_pool().stats())
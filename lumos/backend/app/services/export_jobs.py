@@ -0,0 +1,155 @@
+import asyncio
+import os
+import random
+import string
+import time
+from collections import OrderedDict
+from .export_scheduler import ExportCancelled
+
+# Finished jobs kept for status polling: at most this many, for at most this long
+EXPORT_JOB_RETENTION = int(os.getenv("EXPORT_JOB_RETENTION", "200"))
+EXPORT_JOB_TTL = float(os.getenv("EXPORT_JOB_TTL", "3600"))
+
+FINAL_STATES = ("succeeded", "failed", "cancelled")
+
+
+class ExportJob:
+    """
+    State and progress of one export. Stages are reported as they start
+    (build, run, route, tunnel); each stage's duration is recorded when the
+    next one starts or the job finishes. Every change is appended to
+    `events`, which subscribers follow with stream().
+    """
+
+    def __init__(self, job_id=None):
+        self.id = job_id or ''.join(random.choices(string.ascii_lowercase + string.digits, k=12))
+        self.state = "queued"
+        self.created_at = time.time()
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.stages = []
+        self.events = []
+        self._started = time.monotonic()
+        self._stage_started = self._started
+        self._changed = asyncio.Event()
+        self._emit("queued")
+
+    @property
+    def finished(self):
+        return self.state in FINAL_STATES
+
+    @property
+    def stage(self):
+        return self.stages[-1]["name"] if self.stages else None
+
+    def _elapsed(self):
+        return round(time.monotonic() - self._started, 3)
+
+    def _emit(self, event, **data):
+        self.events.append({"event": event, "job_id": self.id, "state": self.state,
+                            "elapsed": self._elapsed(), **data})
+        # Wake everyone waiting on the current event, then arm a fresh one
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _close_stage(self):
+        now = time.monotonic()
+        if self.stages and self.stages[-1]["duration"] is None:
+            self.stages[-1]["duration"] = round(now - self._stage_started, 3)
+        self._stage_started = now
+
+    def start_stage(self, name):
+        """Progress callback handed to the export: `name` has just started."""
+        self._close_stage()
+        self.state = "running"
+        self.stages.append({"name": name, "duration": None})
+        self._emit("stage", stage=name, stages=[dict(s) for s in self.stages[:-1]])
+
+    def attach(self, future):
+        """Finish the job when the scheduler settles `future`."""
+        future.add_done_callback(self._settle)
+
+    def _settle(self, future):
+        self._close_stage()
+        self.finished_at = time.time()
+        if future.cancelled() or isinstance(future.exception(), ExportCancelled):
+            self.state = "cancelled"
+            self.error = "Export cancelled"
+        elif future.exception() is not None:
+            self.state = "failed"
+            self.error = str(future.exception())
+        else:
+            self.state = "succeeded"
+            self.result = future.result()
+        self._emit(self.state, stages=self.stages, result=self.result, error=self.error)
+
+    async def stream(self, keepalive=15):
+        """
+        Yield events from the start of the job until it finishes. Yields None
+        every `keepalive` seconds without news so callers can send a heartbeat.
+        """
+        index = 0
+        while True:
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.finished:
+                return
+            try:
+                await asyncio.wait_for(self._changed.wait(), keepalive)
+            except asyncio.TimeoutError:
+                yield None
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "state": self.state,
+            "stage": self.stage,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "elapsed": self._elapsed() if not self.finished else round(self.finished_at - self.created_at, 3),
+            "stages": self.stages,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class ExportJobRegistry:
+    """
+    In-memory job index. Unfinished jobs are always kept; finished ones are
+    dropped once there are more than `max_jobs` of them or they are older
+    than `ttl` seconds, oldest first.
+    """
+
+    def __init__(self, max_jobs=EXPORT_JOB_RETENTION, ttl=EXPORT_JOB_TTL):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs = OrderedDict()
+
+    def add(self, job):
+        self._jobs[job.id] = job
+        self._prune()
+        return job
+
+    def get(self, job_id):
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.finished]
+        cutoff = time.time() - self.ttl
+        excess = len(finished) - self.max_jobs
+        for job in finished:
+            if excess > 0 or job.finished_at < cutoff:
+                del self._jobs[job.id]
+                excess -= 1
+
+    def stats(self):
+        states = {}
+        for job in self._jobs.values():
+            states[job.state] = states.get(job.state, 0) + 1
+        return {"jobs": len(self._jobs), **states}
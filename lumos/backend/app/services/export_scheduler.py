@@ -0,0 +1,159 @@
+import asyncio
+import itertools
+import random
+import string
+import time
+from collections import deque
+
+
+class ExportCancelled(Exception):
+    """Raised to whoever awaits an export that was cancelled."""
+
+
+class ExportTicket:
+    """One queued export: its payload, priority and the future for its result."""
+
+    def __init__(self, task_id, payload, priority, future):
+        self.id = task_id
+        self.payload = payload
+        self.priority = priority
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.task = None  # the running handler, once a worker picks the ticket up
+        self.cancel_requested = False
+
+    @property
+    def state(self):
+        if self.future.done():
+            if self.future.cancelled() or isinstance(self.future.exception(), ExportCancelled):
+                return "cancelled"
+            return "failed" if self.future.exception() else "succeeded"
+        return "running" if self.started_at is not None else "queued"
+
+
+class ExportScheduler:
+    """
+    Runs exports on a fixed pool of `max_concurrent` worker tasks fed by an
+    asyncio.PriorityQueue. Workers block on the queue, so a submitted export
+    starts as soon as a worker is free. Lower `priority` values run first;
+    equal priorities run in submission order. Each export is limited to
+    `timeout` seconds and can be cancelled while queued or running.
+
+    Workers are started lazily on the first submit, inside the running loop.
+    """
+
+    def __init__(self, handler, max_concurrent, timeout):
+        self.handler = handler
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self.tickets = {}
+        self._loop = None
+        self._queue = None
+        self._workers = []
+        self._sequence = itertools.count()
+        self._waits = deque(maxlen=100)
+        self._counts = {"completed": 0, "failed": 0, "timed_out": 0, "cancelled": 0}
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # First use, or the previous loop is gone (e.g. between test runs)
+        self._loop = loop
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [loop.create_task(self._worker()) for _ in range(self.max_concurrent)]
+
+    def submit(self, payload, priority=0, task_id=None):
+        """Queue an export and return its ticket; await ticket.future for the result."""
+        self._ensure_started()
+        task_id = task_id or ''.join(random.choices(string.ascii_lowercase + string.digits, k=12))
+        ticket = ExportTicket(task_id, payload, priority, self._loop.create_future())
+        # If whoever awaits the future goes away (e.g. client disconnect), stop the export too
+        ticket.future.add_done_callback(lambda future: self._on_done(ticket))
+        self.tickets[task_id] = ticket
+        self._queue.put_nowait((priority, next(self._sequence), ticket))
+        return ticket
+
+    def cancel(self, task_id):
+        """Cancel a queued or running export. Returns False if it already finished."""
+        ticket = self.tickets.get(task_id)
+        if ticket is None or ticket.future.done():
+            return False
+        ticket.future.set_exception(ExportCancelled("Export cancelled"))
+        # Retrieved here so an unawaited cancellation is not logged as an error
+        ticket.future.exception()
+        return True
+
+    def _on_done(self, ticket):
+        self.tickets.pop(ticket.id, None)
+        if ticket.task is not None and not ticket.task.done():
+            ticket.cancel_requested = True
+            ticket.task.cancel()
+        if ticket.started_at is None and (ticket.future.cancelled()
+                                          or isinstance(ticket.future.exception(), ExportCancelled)):
+            self._counts["cancelled"] += 1
+
+    async def _worker(self):
+        while True:
+            _, _, ticket = await self._queue.get()
+            try:
+                if ticket.future.done():
+                    continue  # cancelled while queued
+                await self._run(ticket)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, ticket):
+        ticket.started_at = time.monotonic()
+        self._waits.append(ticket.started_at - ticket.enqueued_at)
+        ticket.task = asyncio.ensure_future(asyncio.wait_for(self.handler(ticket.payload), self.timeout))
+        try:
+            result = await ticket.task
+        except asyncio.TimeoutError as e:
+            # Since 3.11 this also catches a TimeoutError raised by the export
+            # itself (e.g. a container that never became healthy); keep that one
+            if time.monotonic() - ticket.started_at < self.timeout:
+                self._counts["failed"] += 1
+                self._settle(ticket, exception=e)
+            else:
+                self._counts["timed_out"] += 1
+                self._settle(ticket, exception=TimeoutError(f"Export timed out after {self.timeout}s"))
+        except asyncio.CancelledError:
+            if not ticket.cancel_requested:
+                raise  # the worker itself is being shut down
+            self._counts["cancelled"] += 1
+        except Exception as e:
+            self._counts["failed"] += 1
+            self._settle(ticket, exception=e)
+        else:
+            self._counts["completed"] += 1
+            self._settle(ticket, result=result)
+
+    @staticmethod
+    def _settle(ticket, result=None, exception=None):
+        if ticket.future.done():
+            return
+        if exception is not None:
+            ticket.future.set_exception(exception)
+        else:
+            ticket.future.set_result(result)
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._loop = None
+
+    def stats(self):
+        running = sum(1 for ticket in self.tickets.values() if ticket.started_at is not None)
+        waits = list(self._waits)
+        return {
+            "workers": self.max_concurrent,
+            "queued": len(self.tickets) - running,
+            "running": running,
+            **self._counts,
+            "average_wait": sum(waits) / len(waits) if waits else 0,
+            "max_wait": max(waits) if waits else 0,
+        }
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from ..models.project_cache import LocalCache, dumps
+from ..utils.metrics_utils import register_metrics_provider
+
+# Completions run at temperature 0, so answers can be kept for a long time
+GENERATION_CACHE_TTL = float(os.getenv("GENERATION_CACHE_TTL", str(24 * 3600)))
+GENERATION_CACHE_MAX_ENTRIES = int(os.getenv("GENERATION_CACHE_MAX_ENTRIES", "2000"))
+# Cosine similarity above which a differently worded prompt reuses an answer; 0 (the default) disables
+# that tier. Opt-in: a hashed bag of words can't tell "files tickets in jira" from "... in linear"
+GENERATION_CACHE_SIMILARITY = float(os.getenv("GENERATION_CACHE_SIMILARITY", "0"))
+
+EMBEDDING_DIMS = 1024
+# Words that don't change what is being asked for. Relational words ("to", "and",
+# "with", ...) stay: "convert csv to pdf" and "convert csv and pdf" ask for different things
+STOPWORDS = {"a", "an", "the", "please", "create", "generate", "make", "build", "me", "i", "want",
+             "need", "that", "which", "can", "some", "new", "tool", "tools", "agent", "agents"}
+
+
+def normalize_prompt(prompt):
+    """Case, whitespace and trailing punctuation don't count as a different prompt"""
+    return re.sub(r"\s+", " ", prompt.casefold()).strip().rstrip(".!?").strip()
+
+
+def content_words(text):
+    """The words of a prompt that change what is being asked for, in order"""
+    return [word for word in re.findall(r"[a-z0-9]+", normalize_prompt(text)) if word not in STOPWORDS]
+
+
+def embed(text):
+    """
+    Local, deterministic embedding: content words, their character
+    trigrams and adjacent word pairs (so "pdf to csv" differs from "csv to
+    pdf") hashed into EMBEDDING_DIMS buckets, L2-normalized. Returned sparse
+    as {bucket: weight}.
+    """
+    words = content_words(text)
+    features = {}
+    for index, word in enumerate(words):
+        padded = f"#{word}#"
+        # Whole words weigh as much as all of their trigrams together
+        grams = [(word, 1.0)] + [(padded[i:i + 3], 1.0 / (len(padded) - 2)) for i in range(len(padded) - 2)]
+        grams += [(f"{previous} {word}", 1.0) for previous in words[index - 1:index] if index]
+        for gram, weight in grams:
+            bucket = zlib.crc32(gram.encode()) % EMBEDDING_DIMS
+            features[bucket] = features.get(bucket, 0.0) + weight
+    norm = math.sqrt(sum(weight * weight for weight in features.values()))
+    return {bucket: weight / norm for bucket, weight in features.items()} if norm else {}
+
+
+def cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(bucket, 0.0) for bucket, weight in a.items())
+
+
+class GenerationCache:
+    """
+    Two-tier cache for generator answers.
+
+    The exact tier is keyed on (kind, model, template version, normalized
+    prompt). The similarity tier keeps an embedding per cached prompt,
+    indexed by (kind, model, template version, sorted content words), and
+    answers a miss with the closest prompt in the same index bucket if its
+    cosine similarity reaches `threshold`. Only prompts with the same content
+    words are compared, so one deciding word, like "not" or a product name,
+    always makes a different prompt, while word order still counts through
+    the embedding. Both tiers share the exact tier's size and TTL bounds: a
+    vector whose answer has been evicted or has expired is dropped when next
+    seen.
+    """
+
+    def __init__(self, max_entries=GENERATION_CACHE_MAX_ENTRIES, ttl=GENERATION_CACHE_TTL,
+                 threshold=GENERATION_CACHE_SIMILARITY):
+        self.answers = LocalCache(max_entries=max_entries, max_bytes=64 * 1024 * 1024, ttl=ttl)
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._vectors = OrderedDict()  # key -> (group, vector)
+        self._groups = {}  # (namespace, sorted content words) -> keys
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _namespace(kind, model, template_version):
+        return f"{kind}:{model}:{template_version}"
+
+    @staticmethod
+    def _key(namespace, prompt):
+        return f"{namespace}:{hashlib.sha256(normalize_prompt(prompt).encode()).hexdigest()}"
+
+    def get(self, kind, prompt, model, template_version):
+        """The cached answer for this prompt, or for a close enough one; None on a miss"""
+        namespace = self._namespace(kind, model, template_version)
+        value = self.answers.get(self._key(namespace, prompt))
+        if value is not None:
+            self.exact_hits += 1
+            return json.loads(value)
+        if self.threshold > 0:
+            value = self._similar(namespace, embed(prompt), content_words(prompt))
+            if value is not None:
+                self.similar_hits += 1
+                return json.loads(value)
+        self.misses += 1
+        return None
+
+    @staticmethod
+    def _group(namespace, words):
+        return namespace, tuple(sorted(words))
+
+    def _forget(self, key):
+        # Caller holds self._lock
+        entry = self._vectors.pop(key, None)
+        if entry is not None:
+            keys = self._groups[entry[0]]
+            keys.discard(key)
+            if not keys:
+                del self._groups[entry[0]]
+
+    def _similar(self, namespace, vector, words):
+        if not vector:
+            return None
+        with self._lock:
+            keys = self._groups.get(self._group(namespace, words), ())
+            candidates = [(cosine(vector, self._vectors[key][1]), key) for key in keys]
+        for score, key in sorted(candidates, reverse=True):
+            if score < self.threshold:
+                return None
+            value = self.answers.get(key)
+            if value is not None:
+                return value
+            with self._lock:
+                self._forget(key)
+        return None
+
+    def put(self, kind, prompt, model, template_version, answer):
+        namespace = self._namespace(kind, model, template_version)
+        key = self._key(namespace, prompt)
+        self.answers.set(key, dumps(answer))
+        if self.threshold > 0:
+            group = self._group(namespace, content_words(prompt))
+            with self._lock:
+                self._forget(key)
+                self._vectors[key] = (group, embed(prompt))
+                self._groups.setdefault(group, set()).add(key)
+                while len(self._vectors) > self.max_entries:
+                    self._forget(next(iter(self._vectors)))
+
+    def stats(self):
+        lookups = self.exact_hits + self.similar_hits + self.misses
+        return {**self.answers.stats(), "vectors": len(self._vectors), "threshold": self.threshold,
+                "exact_hits": self.exact_hits, "similar_hits": self.similar_hits, "misses": self.misses,
+                "hit_rate": (self.exact_hits + self.similar_hits) / lookups if lookups else 0}
+
+
+def template_version(template):
+    """Changing a prompt template starts a fresh set of cache keys"""
+    return format(zlib.crc32(template.encode()), "08x")
+
+
+_cache = None
+
+
+def get_generation_cache():
+    """Process-wide generation cache, created on first use."""
+    global _cache
+    if _cache is None:
+        _cache = GenerationCache()
+    return _cache
+
+
+register_metrics_provider("generation_cache", lambda: get_generation_cache().stats())
@@ -1,32 +1,24 @@
-import openai
-import re
-import json
+import asyncio
+import os
+import time
 from fastapi import HTTPException
+from pydantic import ValidationError
+from .llm_client import get_llm_client
+from .generation_cache import get_generation_cache, normalize_prompt, template_version
+from ..models.generator_model import Tool, Agent
+from ..utils.metrics_utils import register_metrics_provider
+from ..utils.partial_json import parse_partial
+from ui_app.json_extract import extract
 
-class GeneratorService:
-    def __init__(self):
-        self.api_key = ""
-        self.client = openai.OpenAI(api_key=self.api_key)
-    
-    def _generate_completion(self, prompt, model="gpt-4o", temperature=0.0):
-        """Generate a completion using the OpenAI API"""
-        try:
-            response = self.client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=temperature
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
-    
-    def _clean_json_response(self, response):
-        """Clean JSON responses that might be wrapped in markdown code blocks"""
-        return re.sub(r"^```json\n|```$", "", response.strip())
-    
-    def generate_tool(self, user_prompt):
-        """Generate a tool based on user prompt"""
-        prompt = f'''
+MODEL = "gpt-4o"
+# Generations of one batch running at once (the provider limit still applies on top)
+GENERATION_BATCH_CONCURRENCY = int(os.getenv("GENERATION_BATCH_CONCURRENCY", "8"))
+GENERATION_BATCH_MAX_ITEMS = int(os.getenv("GENERATION_BATCH_MAX_ITEMS", "50"))
+# Follow-up completions asking the model to fix an answer that can't be parsed or validated
+GENERATION_REPAIR_ATTEMPTS = int(os.getenv("GENERATION_REPAIR_ATTEMPTS", "1"))
+
+# str.format templates; {user_prompt} is filled in per request
+TOOL_PROMPT = '''
         You are a tool generator for Agentic systems and are asked to generate a tool for the user strictly in the given example format. Wrap the tool name in double quotes and provide the description, input, and output in the specified format. Provide it in a json parsable format. The keys of the parameter object depend on the type of Tool.
         Example Tool:
             {{
@@ -43,18 +35,8 @@ class GeneratorService:
         
         User: {user_prompt}
         '''
-        
-        try:
-            response = self._generate_completion(prompt)
-            print("Generated Tool:", response)
-            clean_response = self._clean_json_response(response)
-            return json.loads(clean_response)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
-    
-    def generate_agent(self, user_prompt):
-        """Generate an agent based on user prompt"""
-        prompt = f'''
+
+AGENT_PROMPT = '''
         You are a an agent generator and are asked to generate an agent for the user strictly in the given example format. The description should be detailed and must list down an exhaustive list of capabilities. Wrap the Agent name in double quotes and provide the description, capabilities and suggested tools in the specified format. Provide it in a json parsable format. The suggested tools depend on the task of the agent.  
         Example Agent:
             {{
@@ -78,11 +60,182 @@ class GeneratorService:
         
         User: {user_prompt}
         '''
-        
+
+REPAIR_PROMPT = '''
+        Your previous answer could not be used: {error}
+        Reply with only the corrected {kind} as one JSON object with the fields {fields}, without prose or code fences.
+
+        Previous answer:
+        {response}
+        '''
+
+TEMPLATES = {"tool": TOOL_PROMPT, "agent": AGENT_PROMPT}
+MODELS = {"tool": Tool, "agent": Agent}
+
+# How answers were turned into results: parsed as is, fixed locally, fixed by re-asking, or not at all
+_parse_stats = {"clean": 0, "repaired": 0, "reasked": 0, "failed": 0}
+
+class GeneratorService:
+    def __init__(self, llm=None, cache=None):
+        # Shared, connection-pooled and concurrency-limited; see llm_client.py
+        self.llm = llm or get_llm_client()
+        # Answers are deterministic (temperature 0), so repeat prompts are served from here
+        self.cache = cache or get_generation_cache()
+    
+    async def _generate_completion(self, prompt, model=MODEL, temperature=0.0):
+        """Generate a completion using the OpenAI API"""
+        try:
+            response = await self.llm.chat(
+                [{"role": "user", "content": prompt}],
+                model=model,
+                temperature=temperature
+            )
+            return response.strip()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    
+    @staticmethod
+    def _parse(kind, response):
+        """
+        The answer's JSON object, validated against the Tool/Agent model.
+        Raises ValueError (or pydantic's ValidationError) if there is none.
+        """
+        result, repaired = extract(response, expect=dict)
+        MODELS[kind].parse_obj(result)
+        return result, repaired
+    
+    async def _parse_or_repair(self, kind, response):
+        """
+        Parse the answer; if that fails, show the model its answer and the
+        error and ask for a corrected one, up to GENERATION_REPAIR_ATTEMPTS
+        times, instead of regenerating from scratch.
+        """
+        for attempt in range(GENERATION_REPAIR_ATTEMPTS + 1):
+            try:
+                result, repaired = self._parse(kind, response)
+            except (ValueError, ValidationError) as e:
+                error = e
+            else:
+                _parse_stats["reasked" if attempt else "repaired" if repaired else "clean"] += 1
+                return result
+            if attempt == GENERATION_REPAIR_ATTEMPTS:
+                break
+            print(f"⚠️ Unusable {kind} answer, asking for a fix: {error}")
+            response = await self._generate_completion(REPAIR_PROMPT.format(
+                error=error, kind=kind, fields=", ".join(MODELS[kind].__fields__), response=response
+            ))
+        _parse_stats["failed"] += 1
+        raise error
+    
+    async def _generate(self, kind, template, user_prompt):
+        version = template_version(template)
+        cached = self.cache.get(kind, user_prompt, MODEL, version)
+        if cached is not None:
+            return cached
         try:
-            response = self._generate_completion(prompt)
-            print("Generated Agent:", response)
-            clean_response = self._clean_json_response(response)
-            return json.loads(clean_response)
+            response = await self._generate_completion(template.format(user_prompt=user_prompt))
+            print(f"Generated {kind.capitalize()}:", response)
+            result = await self._parse_or_repair(kind, response)
         except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=str(e))
+        self.cache.put(kind, user_prompt, MODEL, version, result)
+        return result
+    
+    async def generate_tool(self, user_prompt):
+        """Generate a tool based on user prompt"""
+        return await self._generate("tool", TOOL_PROMPT, user_prompt)
+    
+    async def generate_agent(self, user_prompt):
+        """Generate an agent based on user prompt"""
+        return await self._generate("agent", AGENT_PROMPT, user_prompt)
+    
+    async def _stream(self, kind, template, user_prompt):
+        """
+        Yield events while generating: "token" for each piece of text from
+        the provider, "partial" whenever the fields parsed so far change,
+        then "done" with the result and timings, or "error".
+        """
+        started = time.monotonic()
+        elapsed_ms = lambda: round((time.monotonic() - started) * 1000, 1)
+        version = template_version(template)
+        cached = self.cache.get(kind, user_prompt, MODEL, version)
+        if cached is not None:
+            yield {"event": "done", kind: cached, "cached": True,
+                   "first_content_ms": elapsed_ms(), "total_ms": elapsed_ms()}
+            return
+
+        text, shown, first_content_ms = "", None, None
+        try:
+            async for delta in self.llm.stream_chat(
+                [{"role": "user", "content": template.format(user_prompt=user_prompt)}],
+                model=MODEL, temperature=0.0
+            ):
+                text += delta
+                yield {"event": "token", "text": delta}
+                partial = parse_partial(text)
+                if isinstance(partial, dict) and partial and partial != shown:
+                    shown = partial
+                    first_content_ms = first_content_ms or elapsed_ms()
+                    yield {"event": "partial", kind: partial}
+            print(f"Generated {kind.capitalize()}:", text)
+            result = await self._parse_or_repair(kind, text)
+        except Exception as e:
+            yield {"event": "error", "message": str(e)}
+            return
+        self.cache.put(kind, user_prompt, MODEL, version, result)
+        yield {"event": "done", kind: result, "cached": False,
+               "first_content_ms": first_content_ms or elapsed_ms(), "total_ms": elapsed_ms()}
+    
+    def stream_tool(self, user_prompt):
+        """Generate a tool, yielding progress events (see _stream)"""
+        return self._stream("tool", TOOL_PROMPT, user_prompt)
+    
+    def stream_agent(self, user_prompt):
+        """Generate an agent, yielding progress events (see _stream)"""
+        return self._stream("agent", AGENT_PROMPT, user_prompt)
+    
+    async def generate_batch(self, items, concurrency=GENERATION_BATCH_CONCURRENCY):
+        """
+        Generate many tools/agents at once. `items` are dicts with "kind"
+        ("tool" or "agent") and "user_prompt". Prompts that normalize to the
+        same text are generated once. Yields an "item" event per input item
+        as soon as its result is ready (in completion order, with its input
+        index), then a "done" event with totals.
+        """
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(concurrency)
+        groups = {}
+        for index, item in enumerate(items):
+            groups.setdefault((item["kind"], normalize_prompt(item["user_prompt"])), []).append(index)
+
+        async def run(kind, indices):
+            async with semaphore:
+                item_started = time.monotonic()
+                try:
+                    result = {"status": "success",
+                              kind: await self._generate(kind, TEMPLATES[kind], items[indices[0]]["user_prompt"])}
+                except HTTPException as e:
+                    result = {"status": "error", "message": e.detail}
+                except Exception as e:
+                    result = {"status": "error", "message": str(e)}
+                return indices, result, round((time.monotonic() - item_started) * 1000, 1)
+
+        tasks = [asyncio.ensure_future(run(kind, indices)) for (kind, _), indices in groups.items()]
+        failed = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                indices, result, latency_ms = await next_done
+                elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+                for index in indices:
+                    failed += result["status"] == "error"
+                    yield {"event": "item", "index": index, "id": items[index].get("id"),
+                           "kind": items[index]["kind"], **result, "latency_ms": latency_ms,
+                           "elapsed_ms": elapsed_ms, "deduplicated": index != indices[0]}
+        finally:
+            # The client went away: stop generating for it
+            for task in tasks:
+                task.cancel()
+        yield {"event": "done", "items": len(items), "unique": len(groups), "failed": failed,
+               "total_ms": round((time.monotonic() - started) * 1000, 1)}
+
+register_metrics_provider("generation_parsing", lambda: dict(_parse_stats))
@@ -0,0 +1,123 @@
+import asyncio
+import hashlib
+import os
+from ..utils.metrics_utils import register_metrics_provider
+
+UI_APP_DIR = os.getenv("UI_APP_DIR", "./ui_app")
+UI_IMAGE_NAME = os.getenv("UI_IMAGE_NAME", "simple-ui-app")
+
+# Never part of the image's identity
+IGNORED_NAMES = {"__pycache__", ".git", ".DS_Store"}
+
+
+def _context_files(context_dir):
+    for root, dirs, files in os.walk(context_dir):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_NAMES)
+        for name in sorted(files):
+            if name not in IGNORED_NAMES and not name.endswith(".pyc"):
+                yield os.path.join(root, name)
+
+
+def content_hash(context_dir):
+    """SHA-256 over the relative path and bytes of every file in the build context"""
+    digest = hashlib.sha256()
+    for path in _context_files(context_dir):
+        digest.update(os.path.relpath(path, context_dir).replace(os.sep, "/").encode() + b"\0")
+        with open(path, "rb") as f:
+            digest.update(f.read())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+async def run_docker(*args):
+    """Run `docker <args>` and return (returncode, combined output)"""
+    process = await asyncio.create_subprocess_exec(
+        "docker", *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+    )
+    try:
+        output, _ = await process.communicate()
+    except BaseException:
+        # Export timed out or was cancelled; don't leave docker running
+        process.kill()
+        await process.wait()
+        raise
+    return process.returncode, output.decode(errors="replace")
+
+
+class ImageManager:
+    """
+    Builds the ui_app image once per content hash of its build context and
+    tags it `<name>:<hash>`. Exports ask for the tag; while the context is
+    unchanged they get the cached tag without touching docker, and callers
+    that arrive during a build all await the same build.
+
+    The hash is only recomputed when a file's size or mtime changes.
+    """
+
+    def __init__(self, context_dir=UI_APP_DIR, name=UI_IMAGE_NAME, docker=run_docker):
+        self.context_dir = context_dir
+        self.name = name
+        self.docker = docker
+        self._ready = set()
+        self._inflight = {}
+        self._signature = None
+        self._digest = None
+        self.builds = 0
+        self.hits = 0
+
+    def _current_digest(self):
+        signature = tuple(
+            (path, stat.st_size, stat.st_mtime_ns)
+            for path in _context_files(self.context_dir)
+            for stat in (os.stat(path),)
+        )
+        if signature != self._signature:
+            self._digest = content_hash(self.context_dir)[:16]
+            self._signature = signature
+        return self._digest
+
+    async def ensure_image(self):
+        """Return a tag for an image built from the current ui_app contents"""
+        tag = f"{self.name}:{self._current_digest()}"
+        if tag in self._ready:
+            self.hits += 1
+            return tag
+        build = self._inflight.get(tag)
+        if build is None:
+            build = asyncio.ensure_future(self._build(tag))
+            self._inflight[tag] = build
+            build.add_done_callback(lambda _: self._inflight.pop(tag, None))
+        # Shielded so one waiter timing out or being cancelled doesn't abort the shared build
+        await asyncio.shield(build)
+        self._ready.add(tag)
+        return tag
+
+    async def _build(self, tag):
+        # Already built, e.g. by an earlier run of the backend
+        returncode, _ = await self.docker("image", "inspect", tag)
+        if returncode == 0:
+            return
+        self.builds += 1
+        print(f"Building {tag} from {self.context_dir}")
+        returncode, output = await self.docker("build", "-t", tag, "-t", f"{self.name}:latest", self.context_dir)
+        if returncode != 0:
+            raise RuntimeError(f"docker build of {tag} failed:\n{output}")
+        print(f"✅ Built {tag}")
+
+    def stats(self):
+        return {"images": sorted(self._ready), "building": sorted(self._inflight),
+                "builds": self.builds, "hits": self.hits}
+
+
+_manager = None
+
+
+def get_image_manager():
+    """Process-wide ui_app image manager, created on first use."""
+    global _manager
+    if _manager is None:
+        _manager = ImageManager()
+    return _manager
+
+
+register_metrics_provider("ui_image", lambda: get_image_manager().stats())
@@ -0,0 +1,227 @@
+import asyncio
+import contextlib
+import json
+import os
+import time
+import httpx
+from ..utils.probe import backoff_delays
+from ..utils.metrics_utils import register_metrics_provider
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+# Completions in flight at once per provider; further calls wait their turn
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+# Extra attempts after a 429, a 5xx or a connection error
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+_http = None
+_http_loop = None
+
+
+def get_http_client():
+    """
+    One httpx.AsyncClient (and connection pool) shared by every provider.
+    Its connections belong to an event loop, so a new one is made if the
+    loop changes.
+    """
+    global _http, _http_loop
+    loop = asyncio.get_running_loop()
+    if _http is None or _http.is_closed or _http_loop is not loop:
+        _http = httpx.AsyncClient(limits=httpx.Limits(max_connections=100, max_keepalive_connections=20))
+        _http_loop = loop
+    return _http
+
+
+async def close_http_client():
+    global _http
+    if _http is not None and not _http.is_closed:
+        await _http.aclose()
+    _http = None
+
+
+def _retry_after(response):
+    try:
+        return max(float(response.headers.get("Retry-After", "")), 0)
+    except ValueError:
+        return None
+
+
+class ProviderClient:
+    """
+    Chat completions against one OpenAI-compatible provider. At most
+    `max_concurrency` requests are in flight; 429s, 5xx answers, timeouts
+    and connection errors are retried up to `max_retries` times with
+    jittered exponential backoff (or the provider's Retry-After, capped at
+    the backoff maximum). A request only holds its slot while it is talking
+    to the provider, not while it waits to retry.
+    """
+
+    def __init__(self, name, base_url, api_key, max_concurrency=LLM_MAX_CONCURRENCY, timeout=LLM_TIMEOUT,
+                 max_retries=LLM_MAX_RETRIES, backoff=None):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff or {"initial": 0.5, "maximum": 8.0}
+        self._semaphore = None
+        self._semaphore_loop = None
+        self.in_flight = 0
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.total_latency = 0.0
+
+    def _slots(self):
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    @contextlib.asynccontextmanager
+    async def _slot(self):
+        """One of the max_concurrency request slots, for the length of one attempt"""
+        async with self._slots():
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+    def _retry_wait(self, response, wait):
+        retry_after = _retry_after(response)
+        # A throttled provider may ask for minutes; retry sooner rather than stall the caller
+        return wait if retry_after is None else min(retry_after, self.backoff["maximum"])
+
+    async def _post(self, path, payload):
+        delays = backoff_delays(**self.backoff)
+        for attempt in range(self.max_retries + 1):
+            self.requests += 1
+            wait = next(delays)
+            try:
+                async with self._slot():
+                    response = await get_http_client().post(
+                        f"{self.base_url}{path}", json=payload, timeout=self.timeout,
+                        headers={"Authorization": f"Bearer {self.api_key}"},
+                    )
+            except httpx.TransportError as e:
+                error = LLMError(f"{self.name} request failed: {e!r}")
+            else:
+                if response.status_code == 200:
+                    return response.json()
+                error = LLMError(f"{self.name} returned {response.status_code}: {response.text[:500]}",
+                                 response.status_code)
+                if response.status_code not in RETRY_STATUSES:
+                    raise error
+                wait = self._retry_wait(response, wait)
+            if attempt == self.max_retries:
+                raise error
+            self.retries += 1
+            await asyncio.sleep(wait)
+
+    async def chat(self, messages, model="gpt-4o", temperature=0.0, **options):
+        """Run a chat completion and return the first choice's message content"""
+        started = time.monotonic()
+        try:
+            body = await self._post("/chat/completions", {
+                "model": model, "messages": messages, "temperature": temperature, **options
+            })
+        except LLMError:
+            self.failures += 1
+            raise
+        finally:
+            self.total_latency += time.monotonic() - started
+        try:
+            return body["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            self.failures += 1
+            raise LLMError(f"{self.name} returned no completion")
+
+    async def stream_chat(self, messages, model="gpt-4o", temperature=0.0, **options):
+        """
+        Run a chat completion with stream=True and yield its content as it
+        arrives. Failures before the first token are retried like chat();
+        once tokens have been yielded an error is raised as is.
+        """
+        payload = {"model": model, "messages": messages, "temperature": temperature, "stream": True, **options}
+        started = time.monotonic()
+        try:
+            async for delta in self._stream("/chat/completions", payload):
+                yield delta
+        except LLMError:
+            self.failures += 1
+            raise
+        finally:
+            self.total_latency += time.monotonic() - started
+
+    async def _stream(self, path, payload):
+        delays = backoff_delays(**self.backoff)
+        for attempt in range(self.max_retries + 1):
+            self.requests += 1
+            wait = next(delays)
+            streamed = False
+            try:
+                async with self._slot(), get_http_client().stream(
+                    "POST", f"{self.base_url}{path}", json=payload, timeout=self.timeout,
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                ) as response:
+                    if response.status_code == 200:
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[5:].strip()
+                            if data == "[DONE]":
+                                return
+                            choices = json.loads(data).get("choices") or [{}]
+                            delta = (choices[0].get("delta") or {}).get("content")
+                            if delta:
+                                streamed = True
+                                yield delta
+                        return
+                    text = (await response.aread()).decode(errors="replace")
+                    error = LLMError(f"{self.name} returned {response.status_code}: {text[:500]}",
+                                     response.status_code)
+                    if response.status_code not in RETRY_STATUSES:
+                        raise error
+                    wait = self._retry_wait(response, wait)
+            except httpx.TransportError as e:
+                error = LLMError(f"{self.name} request failed: {e!r}")
+                if streamed:
+                    raise error
+            if attempt == self.max_retries:
+                raise error
+            self.retries += 1
+            await asyncio.sleep(wait)
+
+    def stats(self):
+        completed = self.requests - self.retries
+        return {"in_flight": self.in_flight, "max_concurrency": self.max_concurrency,
+                "requests": self.requests, "retries": self.retries, "failures": self.failures,
+                "average_latency": self.total_latency / completed if completed else 0}
+
+
+_providers = {}
+
+
+def get_llm_client(provider="openai"):
+    """Process-wide client for `provider`, created on first use."""
+    if provider not in _providers:
+        if provider != "openai":
+            raise ValueError(f"Unknown LLM provider {provider}")
+        _providers[provider] = ProviderClient("openai", OPENAI_BASE_URL, OPENAI_API_KEY)
+    return _providers[provider]
+
+
+register_metrics_provider("llm", lambda: {name: client.stats() for name, client in _providers.items()})
@@ -1,72 +1,62 @@
 from ..models.project_model import ProjectModel
+from ..models.async_storage_strategy import make_async_storage
+from ..models.project_cache import get_project_cache
+from .export_scheduler import ExportScheduler
+from .export_jobs import ExportJob, ExportJobRegistry
+from .image_manager import get_image_manager
+from .container_pool import get_container_pool
+from .container_lifecycle import get_container_lifecycle
+from .route_map import add_route
+from .runtime_registry import get_runtime_registry
 from ..schemas.project_schema import ProjectExport
-import asyncio
-import aiofiles
-import aiohttp
-import socket 
-import random 
-import subprocess
-import time 
-import string 
 import os
-import json 
-import requests
-import subprocess
-from ..utils.network_utils import random_free_port, random_name, random_port
-from collections import deque
-from datetime import datetime
+from ..utils.metrics_utils import register_metrics_provider
+from ..utils.probe import get_tunnel_cache
 
 
 # Constants
-MAX_CONCURRENT_EXPORTS = 3
-EXPORT_TIMEOUT = 300  # 5 minutes
+MAX_CONCURRENT_EXPORTS = int(os.getenv("MAX_CONCURRENT_EXPORTS", 3))
+EXPORT_TIMEOUT = float(os.getenv("EXPORT_TIMEOUT", 300))  # 5 minutes
+# "container": one ui_app container per export; "runtime": served by this backend under /run
+EXPORT_TARGET = os.getenv("EXPORT_TARGET", "container")
+RUNTIME_BASE_URL = os.getenv("RUNTIME_BASE_URL", "http://localhost:8000/run")
 
 class ProjectService:
     def __init__(self):
         self.model = ProjectModel()
-        self.queue = deque()
-        self.active_tasks = set()
-        self.lock = asyncio.Lock()
-        # Start the scheduler if an event loop is already running
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(self._process_queue())
-        except RuntimeError:
-            # No running loop (e.g., during testing import), defer scheduling
-            pass
-
-    async def _process_queue(self):
-        """Background task to process the export queue"""
-        while True:
-            async with self.lock:
-                if len(self.active_tasks) >= MAX_CONCURRENT_EXPORTS or not self.queue:
-                    await asyncio.sleep(1)
-                    continue
-                
-                task_id, project_data, future = self.queue.popleft()
-                self.active_tasks.add(task_id)
-            
-            try:
-                result = await self._execute_export(project_data)
-                future.set_result(result)
-            except Exception as e:
-                future.set_exception(e)
-            finally:
-                async with self.lock:
-                    self.active_tasks.discard(task_id)
-
-    async def export_project(self, project_data: ProjectExport):
+        # Awaitable view of the model; offloads blocking DB calls when STORAGE_MODE=async
+        self.storage = make_async_storage(self.model)
+        # Serialized read responses; every write through the model invalidates them
+        self.cache = get_project_cache()
+        self.model.add_write_listener(self.cache.invalidate)
+        # Runs up to MAX_CONCURRENT_EXPORTS exports at once; started on first use
+        self.scheduler = ExportScheduler(self._run_export_job, MAX_CONCURRENT_EXPORTS, EXPORT_TIMEOUT)
+        self.jobs = ExportJobRegistry()
+        register_metrics_provider("export_queue", self.scheduler.stats)
+        register_metrics_provider("export_jobs", self.jobs.stats)
+        self.images = get_image_manager()
+        self.pool = get_container_pool()
+        self.lifecycle = get_container_lifecycle()
+        self.tunnel = get_tunnel_cache()
+
+    def submit_export(self, project_data: ProjectExport, priority=0):
+        """Queue an export and return its ExportJob straight away"""
+        job = self.jobs.add(ExportJob())
+        ticket = self.scheduler.submit((project_data, job), priority, task_id=job.id)
+        job.attach(ticket.future)
+        return job, ticket
+
+    async def _run_export_job(self, payload):
+        project_data, job = payload
+        return await self._execute_export(project_data, progress=job.start_stage)
+
+    async def export_project(self, project_data: ProjectExport, priority=0):
         """Export project with same return structure but with queuing"""
-        # Create a future to await the result
-        future = asyncio.Future()
-        task_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=12))
-        
-        async with self.lock:
-            self.queue.append((task_id, project_data, future))
+        _, ticket = self.submit_export(project_data, priority)
         
         # Wait for the result (this will block until the task is processed)
         try:
-            result = await future
+            result = await ticket.future
             return {
                 "container": result["container"],
                 "ngrok_url": result["ngrok_url"],
@@ -79,8 +69,16 @@ class ProjectService:
                 "status": f"error: {str(e)}"
             }
 
-    async def _execute_export(self, project_data: ProjectExport):
-        """Your original export logic"""
+    def get_export_job(self, job_id):
+        return self.jobs.get(job_id)
+
+    def cancel_export(self, task_id):
+        """Cancel a queued or running export; False if it is unknown or already finished"""
+        return self.scheduler.cancel(task_id)
+
+    async def _execute_export(self, project_data: ProjectExport, progress=None):
+        """Your original export logic. `progress(stage)` is called as each stage starts."""
+        progress = progress or (lambda stage: None)
         project_data = project_data.dict()
         data = {
             'project': project_data['project'],
@@ -89,59 +87,33 @@ class ProjectService:
             'interactions': project_data.get('interactions', [])
         }
 
-        port = random_free_port()
-        container_name = f"ui_{random_name()}"
-        json_str = json.dumps(data)
-
-        # Build Docker image
-        await self._run_async_command(
-            "docker", "build", "--no-cache", "-t", "simple-ui-app", "./ui_app"
-        )
-
-        # Run Docker container
-        await self._run_async_command(
-            "docker", "run", "-d",
-            "-p", f"{port}:5000",
-            "--name", container_name,
-            "-e", f"CONFIG={json_str}",
-            "simple-ui-app",
-            log_path=f"docker_run_{container_name}.log"
-        )
-
-        await asyncio.sleep(2)
-
-        # Update route_map.json
-        route_name = f"/{container_name}"
-        route_map_path = "route_map.json"
-        if os.path.exists(route_map_path):
-            try:
-                async with aiofiles.open(route_map_path, "r") as f:
-                    content = await f.read()
-                    route_map = json.loads(content.strip()) if content.strip() else {}
-            except json.JSONDecodeError:
-                route_map = {}
+        if EXPORT_TARGET == "runtime":
+            # No container: the shared runtime serves the config from the registry
+            progress("route")
+            container_name = await get_runtime_registry().register_async(data)
+            # Expires and is evicted like a container; removal unregisters the config
+            self.lifecycle.register(container_name, None, data['project'], kind="runtime")
+            add_route(container_name, f"{RUNTIME_BASE_URL}/{container_name}")
         else:
-            route_map = {}
-
-        route_map[container_name] = f"http://localhost:{port}"
-
-        async with aiofiles.open(route_map_path, "w") as f:
-            await f.write(json.dumps(route_map, indent=4))
-
-        # Get public ngrok URL
-        public_url = None
-        async with aiohttp.ClientSession() as session:
-            for _ in range(6):
-                try:
-                    async with session.get("http://localhost:4040/api/tunnels") as resp:
-                        tunnel_info = await resp.json()
-                        public_url = tunnel_info["tunnels"][0]["public_url"]
-                        break
-                except Exception:
-                    await asyncio.sleep(1)
+            # Build the ui_app image, or reuse the one built from the same sources
+            progress("build")
+            await self.images.ensure_image()
+
+            # Claim a pre-started container and hand it the config; it is already healthy
+            progress("run")
+            container = await self.pool.acquire(data)
+            container_name, port = container.name, container.port
+            # Tracked from here on, so it is garbage collected even if a later stage fails
+            self.lifecycle.register(container_name, port, data['project'])
+
+            # Update route_map.json
+            progress("route")
+            add_route(container_name, f"http://localhost:{port}")
+        route_name = f"/{container_name}"
 
-        if not public_url:
-            raise RuntimeError("Ngrok tunnel not found")
+        # Get public ngrok URL (cached for TUNNEL_URL_TTL seconds)
+        progress("tunnel")
+        public_url = await self.tunnel.get()
 
         return {
             "container": container_name,
@@ -149,82 +121,73 @@ class ProjectService:
             "status": "success"
         }
 
-    async def _run_async_command(self, *cmd, log_path=None):
-        """Existing async command runner"""
-        stdout = asyncio.subprocess.PIPE
-        stderr = asyncio.subprocess.PIPE
-        if log_path:
-            log_file = await aiofiles.open(log_path, "a")
-        else:
-            log_file = None
-
-        process = await asyncio.create_subprocess_exec(*cmd, stdout=stdout, stderr=stderr)
-        stdout_data, stderr_data = await process.communicate()
+    def _prepare_save_data(self, project_data: dict):
+        # Convert Pydantic model to dict
+        project_dict = {
+            'project': project_data['project'],
+            'agents': project_data['agents'],
+            'tools': project_data.get('tools', []),
+            'interactions': project_data.get('interactions', [])
+        }
+        # Convert interactions to connections format for database
+        connections = []
+        for interaction in project_dict.get('interactions', []):
+            if len(interaction.get('participants', [])) >= 2:
+                connections.append({
+                    'id': interaction['id'],
+                    'source': interaction['participants'][0],
+                    'target': interaction['participants'][1],
+                    'label': interaction.get('name', '')
+                })
+        
+        # Final structure for database
+        return {
+            'project': project_dict['project'],
+            'agents': project_dict['agents'],
+            'tools': project_dict['tools'],
+            'tasks': [],  # Not used in current frontend
+            'connections': connections
+        }
 
-        if log_file:
-            await log_file.write(stdout_data.decode())
-            await log_file.write(stderr_data.decode())
-            await log_file.close()
+    @staticmethod
+    def _project_result(project_id, project):
+        if not project or project.get("status") == "error":
+            message = project.get("message") if project else None
+            return {"status": "error", "message": message or f"Project with ID {project_id} not found"}
+        return {"status": "success", "project": project}
 
-        if process.returncode != 0:
-            raise RuntimeError(f"Command {' '.join(cmd)} failed:\n{stderr_data.decode()}")
-    
-    def save_project(self, project_data: dict):
+    async def save_project_async(self, project_data: dict):
+        """Save the canvas, without blocking the event loop"""
         try:
-            # Convert Pydantic model to dict
-            project_dict = {
-                'project': project_data['project'],
-                'agents': project_data['agents'],
-                'tools': project_data.get('tools', []),
-                'interactions': project_data.get('interactions', [])
-            }
-            # print(project_data)
-            # Convert interactions to connections format for database
-            connections = []
-            for interaction in project_dict.get('interactions', []):
-                if len(interaction.get('participants', [])) >= 2:
-                    connections.append({
-                        'id': interaction['id'],
-                        'source': interaction['participants'][0],
-                        'target': interaction['participants'][1],
-                        'label': interaction.get('name', '')
-                    })
-            
-            # Final structure for database
-            save_data = {
-                'project': project_dict['project'],
-                'agents': project_dict['agents'],
-                'tools': project_dict['tools'],
-                'tasks': [],  # Not used in current frontend
-                'connections': connections
-            }
-            
-            return self.model.save_project(save_data)
+            return await self.storage.save_project(self._prepare_save_data(project_data))
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
-    def get_all_projects(self):
-        """
-        Retrieve all saved projects from the database.
-        """
+    async def get_all_projects_async(self, **filters):
+        """One page of saved projects, without blocking the event loop. Pages are cached."""
         try:
-            # Fetch all projects from the model
-            projects = self.model.get_all_projects()
-            return {"status": "success", "projects": projects}
+            page = self.cache.get_page(filters)
+            if page is None:
+                generation = self.cache.generation()
+                page = await self.storage.get_all_projects(**filters)
+                self.cache.put_page(filters, page, generation)
+            return {"status": "success", **page}
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
-    def get_project_by_id(self, project_id):
+    async def get_project_response_async(self, project_id):
         """
-        Retrieve a specific project by ID including all its data
+        Serialized success response for a project, read through the cache:
+        {"status": "success", "etag": ..., "body": bytes}, or an error dict.
         """
         try:
-            # Fetch project data from the model
-            project = self.model.get_project_by_id(project_id)
-            if not project:
-                return {"status": "error", "message": f"Project with ID {project_id} not found"}
-            
-            return {"status": "success", "project": project}
+            cached = self.cache.get_project(project_id)
+            if cached is not None:
+                return {"status": "success", **cached}
+            generation = self.cache.generation()
+            result = self._project_result(project_id, await self.storage.get_project_by_id(project_id))
+            if result["status"] == "error":
+                return result
+            return {"status": "success", **self.cache.put_project(project_id, result, generation)}
         except Exception as e:
             return {"status": "error", "message": str(e)}
-
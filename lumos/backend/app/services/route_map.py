@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+from ..utils.metrics_utils import register_metrics_provider
+
+# Shared with proxy.py, which maps /<name>/... to the URL stored under <name>
+ROUTE_MAP_PATH = os.getenv("ROUTE_MAP_PATH", "route_map.json")
+
+
+def _load(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            content = f.read().strip()
+        return json.loads(content) if content else {}
+    except json.JSONDecodeError:
+        return {}
+
+
+class RouteRegistry:
+    """
+    The route map held in memory. The file is read once; each change is
+    written to a temp file and renamed over it, so readers in other
+    processes see either the old map or the new one and never a partial
+    write. Listeners are called with (name, url) after each change, url
+    being None for a removed route.
+    """
+
+    def __init__(self, path=ROUTE_MAP_PATH):
+        self.path = path
+        self.routes = _load(path)
+        self.listeners = []
+        self.writes = 0
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def get(self, name):
+        return self.routes.get(name)
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(json.dumps(self.routes, indent=4))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.writes += 1
+
+    def _apply(self, changes):
+        with self._lock:
+            changed = []
+            for name, url in changes:
+                if self.routes.get(name) == url:
+                    continue
+                if url is None:
+                    del self.routes[name]
+                else:
+                    self.routes[name] = url
+                changed.append((name, url))
+            if changed:
+                self._save()
+        for name, url in changed:
+            for listener in self.listeners:
+                listener(name, url)
+        return dict(self.routes)
+
+    def add(self, name, url):
+        return self._apply([(name, url)])
+
+    def remove(self, names):
+        return self._apply([(name, None) for name in names])
+
+    def stats(self):
+        return {"routes": len(self.routes), "writes": self.writes}
+
+
+class RouteTable:
+    """
+    Read-only view of a route map written by another process (the proxy's
+    side). Lookups hit a dict; the file is parsed again only after its
+    inode, modification time or size changes. RouteRegistry replaces the
+    file on every write, so the inode changes even when coarse timestamps
+    and the byte length do not.
+    """
+
+    def __init__(self, path=ROUTE_MAP_PATH):
+        self.path = path
+        self.routes = {}
+        self.reloads = 0
+        self._signature = None
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature = None
+        if signature != self._signature:
+            self.routes = _load(self.path)
+            self._signature = signature
+            self.reloads += 1
+
+    def get(self, name):
+        self._refresh()
+        return self.routes.get(name)
+
+
+_registries = {}
+
+
+def get_route_registry(path=None):
+    """Process-wide registry for `path` (ROUTE_MAP_PATH by default), created on first use."""
+    path = path or ROUTE_MAP_PATH
+    if path not in _registries:
+        _registries[path] = RouteRegistry(path)
+    return _registries[path]
+
+
+def add_route(name, url, path=None):
+    return get_route_registry(path).add(name, url)
+
+
+def remove_routes(names, path=None):
+    return get_route_registry(path).remove(names)
+
+
+register_metrics_provider("routes", lambda: get_route_registry().stats())
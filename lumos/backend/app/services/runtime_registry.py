@@ -0,0 +1,160 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from ..models.sqlite_storage_strategy import SQLiteDatabase
+from ..models.async_storage_strategy import get_storage_executor
+from ..utils.network_utils import random_name
+from ..utils.metrics_utils import register_metrics_provider
+
+RUNTIME_DB_PATH = os.getenv("RUNTIME_DB_PATH", "lumos_runtime.db")
+# Parsed configs kept in memory; the rest are reloaded from RUNTIME_DB_PATH on demand
+RUNTIME_MAX_LOADED = int(os.getenv("RUNTIME_MAX_LOADED", "1000"))
+RUNTIME_IDLE_TTL = float(os.getenv("RUNTIME_IDLE_TTL", "900"))
+
+RUNTIME_SCHEMA = """
+CREATE TABLE IF NOT EXISTS exported_configs (
+    route TEXT PRIMARY KEY,
+    project_name TEXT,
+    config TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+class RuntimeRegistry:
+    """
+    Exported project configs for the multi-project runtime, keyed by route.
+    Registering writes one row; serving loads the config on first request
+    and keeps it in an LRU, from which the least recently used configs are
+    dropped past `max_loaded` and idle ones after `idle_ttl` seconds. Idle
+    configs are checked on every lookup, so they leave memory even when
+    no new config is being loaded.
+    """
+
+    def __init__(self, path=None, max_loaded=RUNTIME_MAX_LOADED, idle_ttl=RUNTIME_IDLE_TTL):
+        self.db = SQLiteDatabase(path or RUNTIME_DB_PATH, schema=RUNTIME_SCHEMA)
+        self.max_loaded = max_loaded
+        self.idle_ttl = idle_ttl
+        self._loaded = OrderedDict()  # route -> (last_used, config)
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def register(self, config):
+        """Store `config` under a new route and return the route"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        try:
+            conn.start_transaction()
+            while True:
+                route = f"rt_{random_name()}"
+                cursor.execute("SELECT 1 FROM exported_configs WHERE route = %s", (route,))
+                if cursor.fetchone() is None:
+                    break
+            cursor.execute(
+                "INSERT INTO exported_configs (route, project_name, config) VALUES (%s, %s, %s)",
+                (route, config.get('project', {}).get('name'), json.dumps(config))
+            )
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+        return route
+
+    async def register_async(self, config):
+        """Same as register, on the storage executor"""
+        return await get_storage_executor().run(self.register, config)
+
+    def unregister(self, route):
+        """Forget the config at `route`; False if nothing was registered there"""
+        self._loaded.pop(route, None)
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        try:
+            conn.start_transaction()
+            cursor.execute("DELETE FROM exported_configs WHERE route = %s", (route,))
+            deleted = cursor.rowcount > 0
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+        return deleted
+
+    async def unregister_async(self, route):
+        """Same as unregister, on the storage executor"""
+        return await get_storage_executor().run(self.unregister, route)
+
+    def _cached(self, route):
+        self.evict()
+        entry = self._loaded.get(route)
+        if entry is None:
+            return None
+        self._loaded[route] = (time.monotonic(), entry[1])
+        self._loaded.move_to_end(route)
+        self.hits += 1
+        return entry[1]
+
+    def _load(self, route):
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT config FROM exported_configs WHERE route = %s", (route,))
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+    def _remember(self, route, config):
+        self.loads += 1
+        self._loaded[route] = (time.monotonic(), config)
+        self._loaded.move_to_end(route)
+        self.evict()
+
+    def evict(self):
+        """Drop configs over the size limit, then any idle past the TTL (LRU first)"""
+        cutoff = time.monotonic() - self.idle_ttl
+        while self._loaded:
+            route, (last_used, _) = next(iter(self._loaded.items()))
+            if len(self._loaded) <= self.max_loaded and last_used >= cutoff:
+                break
+            del self._loaded[route]
+            self.evictions += 1
+
+    def get(self, route):
+        """The config for `route`, or None if nothing is registered there"""
+        config = self._cached(route)
+        if config is None:
+            config = self._load(route)
+            if config is not None:
+                self._remember(route, config)
+        return config
+
+    async def get_async(self, route):
+        """Same as get; a miss reads the database on the storage executor"""
+        config = self._cached(route)
+        if config is None:
+            config = await get_storage_executor().run(self._load, route)
+            if config is not None:
+                self._remember(route, config)
+        return config
+
+    def stats(self):
+        return {"loaded": len(self._loaded), "max_loaded": self.max_loaded,
+                "hits": self.hits, "loads": self.loads, "evictions": self.evictions}
+
+
+_registry = None
+
+
+def get_runtime_registry():
+    """Process-wide runtime registry, created on first use."""
+    global _registry
+    if _registry is None:
+        _registry = RuntimeRegistry()
+    return _registry
+
+
+# Reported only once in use, so the metrics page does not create the database
+register_metrics_provider("runtime", lambda: _registry.stats() if _registry else {})
@@ -7,10 +7,16 @@ latencies = deque(maxlen=100)
 latencies_lock = Lock()
 start_time = time.time()
 
+# Extra metric sections (name -> callable returning a dict) contributed by other modules
+metrics_providers = {}
+
 def record_latency(latency: float):
     with latencies_lock:
         latencies.append(latency)
 
+def register_metrics_provider(name: str, provider):
+    metrics_providers[name] = provider
+
 def get_metrics():
     with latencies_lock:
         avg_latency = sum(latencies) / len(latencies) if latencies else 0
@@ -18,10 +24,16 @@ def get_metrics():
     cpu_percent = psutil.cpu_percent(interval=0.1)
     memory_percent = psutil.virtual_memory().percent
     uptime = time.time() - start_time
-    return {
+    metrics = {
         "average_latency": avg_latency,
         "cpu_percent": cpu_percent,
         "memory_percent": memory_percent,
         "uptime": uptime,
         "latencies": recent_latencies
-    }
\ No newline at end of file
+    }
+    for name, provider in list(metrics_providers.items()):
+        try:
+            metrics[name] = provider()
+        except Exception as e:
+            metrics[name] = {"error": str(e)}
+    return metrics
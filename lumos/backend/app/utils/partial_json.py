@@ -0,0 +1,78 @@
+import json
+import re
+
+# The start of a number or literal that may still be growing: 12, 1.5e, tru, nul
+_TRAILING_SCALAR = re.compile(r"[-+0-9.eE]+$|[a-z]+$")
+# A string cut inside an escape sequence
+_TRAILING_ESCAPE = re.compile(r"\\(u[0-9a-fA-F]{0,3})?$")
+
+
+def _scan(text):
+    """
+    Walk the JSON text. Returns (open containers, start of the string the
+    text ends in or None, start of the last complete string, end of the
+    first complete top-level value or None).
+    """
+    stack, string_start, last_string, escaped = [], None, None, False
+    for index, ch in enumerate(text):
+        if string_start is not None:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                last_string, string_start = string_start, None
+        elif ch == '"':
+            string_start = index
+        elif ch in "{[":
+            stack.append(ch)
+        elif ch in "}]" and stack:
+            stack.pop()
+            if not stack:
+                return stack, None, last_string, index + 1
+    return stack, string_start, last_string, None
+
+
+def _complete(text):
+    """Close an open string and every open container"""
+    stack, string_start, _, _ = _scan(text)
+    if string_start is not None:
+        text = _TRAILING_ESCAPE.sub("", text) + '"'
+    return text + "".join("}" if ch == "{" else "]" for ch in reversed(stack))
+
+
+def _trim(text):
+    """Drop the last, incomplete token so that the rest can be closed"""
+    text = text.rstrip()
+    _, string_start, last_string, _ = _scan(text)
+    if string_start is not None:
+        return text[:string_start]
+    if text.endswith((",", ":")):
+        return text[:-1]
+    if text.endswith('"') and last_string is not None:
+        return text[:last_string]
+    match = _TRAILING_SCALAR.search(text)
+    return text[:match.start()] if match else text[:-1]
+
+
+def parse_partial(text):
+    """
+    Best-effort parse of the JSON object or array in a completion that is
+    still arriving, e.g. '```json\\n{"name": "Web Se' gives
+    {"name": "Web Se"}. An open string value is closed where it stops, a
+    key without a value yet is left out, and open containers are closed.
+    Returns None while there is nothing to show.
+    """
+    starts = [index for index in (text.find("{"), text.find("[")) if index >= 0]
+    if not starts:
+        return None
+    text = text[min(starts):]
+    end = _scan(text)[3]
+    if end is not None:
+        text = text[:end]
+    while text:
+        try:
+            return json.loads(_complete(text))
+        except json.JSONDecodeError:
+            text = _trim(text)
+    return None
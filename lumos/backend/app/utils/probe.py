@@ -0,0 +1,170 @@
+import asyncio
+import os
+import random
+import time
+from urllib.parse import urlsplit
+import aiohttp
+from .metrics_utils import register_metrics_provider
+
+NGROK_API_URL = os.getenv("NGROK_API_URL", "http://localhost:4040/api/tunnels")
+# How long an export waits for the ngrok API before giving up on a tunnel URL
+TUNNEL_TIMEOUT = float(os.getenv("TUNNEL_TIMEOUT", "6"))
+# The cached URL is re-read from the (local) ngrok API after this many seconds, so a restarted ngrok is noticed
+TUNNEL_URL_TTL = float(os.getenv("TUNNEL_URL_TTL", "30"))
+
+_session = None
+_session_loop = None
+
+
+def get_session():
+    """
+    One long-lived aiohttp session (and connection pool) for probes and
+    other small internal calls. A session belongs to an event loop, so a new
+    one is made if the loop changes.
+    """
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session = aiohttp.ClientSession()
+        _session_loop = loop
+    return _session
+
+
+async def close_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def backoff_delays(initial=0.05, maximum=1.0, factor=2, jitter=0.5):
+    """
+    Endless exponential backoff: initial, initial*factor, ... capped at
+    `maximum`, each scaled down by a random fraction up to `jitter` so that
+    many waiters don't poll in lockstep.
+    """
+    delay = initial
+    while True:
+        yield delay * random.uniform(1 - jitter, 1)
+        delay = min(delay * factor, maximum)
+
+
+async def wait_until(check, timeout, what="condition", **backoff):
+    """
+    Await `check()` with backoff until it returns something truthy and
+    return that. Raises TimeoutError after `timeout` seconds.
+    """
+    deadline = time.monotonic() + timeout
+    for delay in backoff_delays(**backoff):
+        result = await check()
+        if result:
+            return result
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"{what} not ready after {timeout}s")
+        await asyncio.sleep(min(delay, remaining))
+
+
+async def tcp_check(host, port, timeout=1.0):
+    """True if something accepts TCP connections on host:port"""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+
+async def http_check(url, timeout=2.0):
+    """True if GET `url` answers 200"""
+    try:
+        async with get_session().get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+            return resp.status == 200
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return False
+
+
+async def wait_for_port(host, port, timeout):
+    await wait_until(lambda: tcp_check(host, port), timeout, what=f"{host}:{port}")
+
+
+async def wait_for_http(url, timeout):
+    """
+    Wait until `url` answers 200. Polls the port with cheap TCP connects
+    first and only starts sending HTTP requests once it is open.
+    """
+    started = time.monotonic()
+    parts = urlsplit(url)
+    await wait_for_port(parts.hostname, parts.port or (443 if parts.scheme == "https" else 80), timeout)
+    remaining = max(timeout - (time.monotonic() - started), 0)
+    await wait_until(lambda: http_check(url), remaining, what=url)
+
+
+class TunnelCache:
+    """
+    Public URL of the ngrok tunnel. It only changes when ngrok restarts, so
+    it is read from the ngrok API and reused for `ttl` seconds; after that,
+    or after invalidate(), the next get() asks again.
+    """
+
+    def __init__(self, api_url=NGROK_API_URL, timeout=TUNNEL_TIMEOUT, ttl=TUNNEL_URL_TTL):
+        self.api_url = api_url
+        self.timeout = timeout
+        self.ttl = ttl
+        self.url = None
+        self.fetched_at = None
+        self._inflight = None
+        self.hits = 0
+        self.refreshes = 0
+
+    async def _fetch(self):
+        try:
+            async with get_session().get(self.api_url, timeout=aiohttp.ClientTimeout(total=2)) as resp:
+                tunnels = (await resp.json()).get("tunnels", [])
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return None
+        https = [t["public_url"] for t in tunnels if t.get("public_url", "").startswith("https://")]
+        return (https or [t["public_url"] for t in tunnels if t.get("public_url")] or [None])[0]
+
+    async def _refresh(self):
+        try:
+            self.url = await wait_until(self._fetch, self.timeout, what="ngrok tunnel")
+        except TimeoutError:
+            raise RuntimeError("Ngrok tunnel not found")
+        self.fetched_at = time.monotonic()
+        self.refreshes += 1
+        return self.url
+
+    async def get(self):
+        """The tunnel's public URL; raises RuntimeError if ngrok has none"""
+        if self.url is not None and time.monotonic() - self.fetched_at < self.ttl:
+            self.hits += 1
+            return self.url
+        # Exports finishing together share one lookup
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._refresh())
+        return await asyncio.shield(self._inflight)
+
+    def invalidate(self):
+        self.url = None
+
+    def stats(self):
+        return {"url": self.url, "hits": self.hits, "refreshes": self.refreshes}
+
+
+_tunnel = None
+
+
+def get_tunnel_cache():
+    """Process-wide tunnel URL cache, created on first use."""
+    global _tunnel
+    if _tunnel is None:
+        _tunnel = TunnelCache()
+    return _tunnel
+
+
+register_metrics_provider("tunnel", lambda: get_tunnel_cache().stats())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Concurrent-request throughput of the storage routes, inline vs. offloaded.
+
+Drives GET /api/projects and GET /api/projects/{id} through the real FastAPI
+app in-process. The model underneath is a stand-in that blocks for a fixed
+time per call, like a MySQL round trip. In "sync" mode every call blocks the
+event loop; in "async" mode the calls run on the bounded storage executor.
+
+    python benchmarks/bench_async_storage.py --requests 200 --concurrency 50 --db-ms 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.controllers import export_controller
+from app.models.async_storage_strategy import AsyncProjectStorage, StorageExecutor
+
+
+class BlockingModel:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def get_all_projects(self, **filters):
+        time.sleep(self.delay)
+        return {"projects": [{"id": 1, "name": "bench"}], "next_cursor": None}
+
+    def get_project_by_id(self, project_id):
+        time.sleep(self.delay)
+        return {"project": {"id": project_id}, "agents": [], "tools": [], "interactions": [], "connections": []}
+
+
+async def drive(n_requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(client, i):
+        async with semaphore:
+            start = time.perf_counter()
+            path = "/api/projects" if i % 2 else f"/api/projects/{i}"
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(one(client, i) for i in range(n_requests)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return n_requests / elapsed, latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--db-ms", type=float, default=20, help="Simulated blocking time per storage call")
+    parser.add_argument("--workers", type=int, default=10, help="Storage executor threads in async mode")
+    args = parser.parse_args()
+
+    model = BlockingModel(args.db_ms / 1000)
+    service = export_controller.service
+    modes = {
+        "sync": AsyncProjectStorage(model),
+        "async": AsyncProjectStorage(model, StorageExecutor(args.workers)),
+    }
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {args.db_ms} ms per storage call")
+    print(f"{'mode':<8}{'req/s':>10}{'p99 (ms)':>12}")
+    for mode, storage in modes.items():
+        service.storage = storage
+        throughput, p99 = asyncio.run(drive(args.requests, args.concurrency))
+        print(f"{mode:<8}{throughput:>10.1f}{p99 * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
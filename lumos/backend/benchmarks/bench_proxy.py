@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Throughput and p99 latency of the reverse proxy, old design vs. proxy.py.
+
+"legacy" reproduces the previous Flask proxy's request path on a threaded
+stdlib server (Flask is no longer a dependency): route_map.json is read on
+every request, each call opens a new connection with requests.request, and
+the whole upstream body is buffered before it is returned. Its stdout
+printing of every response is left out. "async" is the aiohttp proxy in
+proxy.py. Both forward to the same local upstream, which returns a fixed
+body; servers run on background threads and the load is generated from the
+main thread.
+
+    python benchmarks/bench_proxy.py --requests 2000 --concurrency 50 --body-kb 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import aiohttp
+import requests
+from aiohttp import web
+import proxy
+from app.services.route_map import RouteRegistry, RouteTable
+from app.utils.network_utils import random_free_port
+
+
+def run_in_thread(start):
+    """Run coroutine function `start` on its own event loop in a daemon thread; wait until it returns"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(start(), loop).result()
+
+
+async def serve(app, port):
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+
+def start_upstream(body):
+    async def page(request):
+        return web.Response(body=body, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", page)
+    port = random_free_port()
+    run_in_thread(lambda: serve(app, port))
+    return f"http://127.0.0.1:{port}"
+
+
+def start_async_proxy(route_map_path):
+    port = random_free_port()
+    app = proxy.create_app(RouteTable(route_map_path), toucher=lambda session, client: None)
+    run_in_thread(lambda: serve(app, port))
+    return f"http://127.0.0.1:{port}"
+
+
+def start_legacy_proxy(route_map_path):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            with open(route_map_path) as f:
+                route_map = json.load(f)
+            _, client, *rest = self.path.split("/", 2)
+            base_url = route_map.get(client)
+            if not base_url:
+                self.send_response(404)
+                self.end_headers()
+                return
+            resp = requests.request("GET", f"{base_url}/{rest[0] if rest else ''}",
+                                    headers={k: v for k, v in self.headers.items() if k.lower() != "host"},
+                                    allow_redirects=False)
+            self.send_response(resp.status_code)
+            excluded = ["content-encoding", "content-length", "transfer-encoding", "connection"]
+            for name, value in resp.raw.headers.items():
+                if name.lower() not in excluded:
+                    self.send_header(name, value)
+            self.send_header("Content-Length", str(len(resp.content)))
+            self.end_headers()
+            self.wfile.write(resp.content)
+
+    server = ThreadingHTTPServer(("127.0.0.1", random_free_port()), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+async def drive(url, n_requests, concurrency):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(session):
+        async with semaphore:
+            start = time.perf_counter()
+            async with session.get(url) as response:
+                await response.read()
+                response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(one(session) for _ in range(n_requests)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return n_requests / elapsed, latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--body-kb", type=int, default=16, help="Size of the upstream response")
+    parser.add_argument("--routes", type=int, default=50, help="Entries in the route map")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        route_map_path = os.path.join(tmp, "route_map.json")
+        registry = RouteRegistry(route_map_path)
+        upstream = start_upstream(b"x" * (args.body_kb * 1024))
+        for i in range(args.routes - 1):
+            registry.add(f"ui_filler{i}", f"http://127.0.0.1:1/{i}")
+        registry.add("ui_bench", upstream)
+
+        proxies = {"legacy": start_legacy_proxy(route_map_path), "async": start_async_proxy(route_map_path)}
+        print(f"{args.requests} requests, concurrency {args.concurrency}, "
+              f"{args.body_kb} KB responses, {args.routes} routes")
+        print(f"{'proxy':<8}{'req/s':>10}{'p99 (ms)':>12}")
+        for name, url in proxies.items():
+            throughput, p99 = asyncio.run(drive(f"{url}/ui_bench/index.html", args.requests, args.concurrency))
+            print(f"{name:<8}{throughput:>10.1f}{p99 * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Save time vs. graph size for SQLProjectStorage.create_project / save_project.
+
+The storage class runs unmodified against an in-memory SQLite database behind a
+small MySQL-style adapter that sleeps for one simulated network round trip per
+statement sent to the server (execute, or one chunk of executemany), so the
+numbers reflect round-trip count rather than SQLite speed.
+
+    python benchmarks/bench_save_project.py --rtt-ms 0.5 --sizes 10 100 500
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.models.sql_storage_strategy import SQLProjectStorage
+
+SCHEMA = """
+CREATE TABLE projects (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, version TEXT, description TEXT,
+                       created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE authors (id INTEGER PRIMARY KEY AUTOINCREMENT, project_id INT, name TEXT);
+CREATE TABLE agents (id INTEGER PRIMARY KEY AUTOINCREMENT, project_id INT, agent_id TEXT, name TEXT,
+                     description TEXT, type TEXT, subtype TEXT);
+CREATE TABLE agent_models (id INTEGER PRIMARY KEY AUTOINCREMENT, agent_id INT, name TEXT, version TEXT,
+                           provider TEXT, parameters TEXT);
+CREATE TABLE agent_capabilities (id INTEGER PRIMARY KEY AUTOINCREMENT, agent_id INT, capability TEXT);
+CREATE TABLE agent_tools (id INTEGER PRIMARY KEY AUTOINCREMENT, agent_id INT, name TEXT, description TEXT,
+                          type TEXT, subtype TEXT, parameters TEXT);
+CREATE TABLE interactions (id INTEGER PRIMARY KEY AUTOINCREMENT, project_id INT, interaction_id TEXT,
+                           type TEXT, subtype TEXT, pattern TEXT);
+CREATE TABLE interaction_participants (id INTEGER PRIMARY KEY AUTOINCREMENT, interaction_id INT, agent_id TEXT);
+CREATE TABLE interaction_protocols (id INTEGER PRIMARY KEY AUTOINCREMENT, interaction_id INT, type TEXT,
+                                    message_types TEXT);
+CREATE TABLE tools (id INTEGER, project_id INT, name TEXT, description TEXT, type TEXT);
+CREATE TABLE connections (id INTEGER, project_id INT, source TEXT, target TEXT, label TEXT);
+"""
+
+
+class SimulatedCursor:
+    def __init__(self, conn, dictionary):
+        self._conn = conn
+        self._cursor = conn.raw.cursor()
+        self._dictionary = dictionary
+
+    def _round_trip(self):
+        self._conn.round_trips += 1
+        if self._conn.rtt:
+            time.sleep(self._conn.rtt)
+
+    def execute(self, query, params=()):
+        self._round_trip()
+        self._cursor.execute(query.replace("%s", "?"), params)
+
+    def executemany(self, query, rows):
+        # mysql-connector sends an INSERT batch as a single multi-row statement
+        self._round_trip()
+        self._cursor.executemany(query.replace("%s", "?"), rows)
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        if not self._dictionary:
+            return rows
+        names = [d[0] for d in self._cursor.description]
+        return [dict(zip(names, row)) for row in rows]
+
+    def close(self):
+        self._cursor.close()
+
+
+class SimulatedConnection:
+    def __init__(self, rtt):
+        self.raw = sqlite3.connect(":memory:")
+        self.raw.executescript(SCHEMA)
+        self.rtt = rtt
+        self.round_trips = 0
+
+    def cursor(self, dictionary=False):
+        return SimulatedCursor(self, dictionary)
+
+    def start_transaction(self):
+        pass
+
+    def commit(self):
+        self.round_trips += 1
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+class SimulatedDatabase:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def get_connection(self):
+        return self.conn
+
+
+def make_graph(n_agents):
+    agents = [{
+        "id": f"agent-{i}",
+        "name": f"Agent {i}",
+        "description": "Benchmark agent",
+        "type": "AI",
+        "subtype": "LLM",
+        "model": {"name": "gpt-4o", "provider": "openai"},
+        "capabilities": ["planning", "search", "summarization"],
+        "tools": [{"name": f"Tool {i}", "description": "Benchmark tool", "type": "Information"}],
+        "position": {"x": 0, "y": 0},
+    } for i in range(n_agents)]
+    interactions = [{
+        "id": f"interaction-{i}",
+        "type": "AgentAgent",
+        "participants": [f"agent-{i}", f"agent-{(i + 1) % n_agents}"],
+        "protocol": {"type": "DirectedMessaging", "messageTypes": ["task"]},
+    } for i in range(n_agents * 2)]
+    tools = [{"id": f"tool-{i}", "name": f"Tool {i}", "description": "", "type": "Information",
+              "position": {"x": 0, "y": 0}} for i in range(n_agents)]
+    connections = [{"id": f"conn-{i}", "source": f"agent-{i % n_agents}", "target": f"tool-{i % n_agents}",
+                    "label": ""} for i in range(n_agents * 4)]
+    project = {"name": "bench", "version": "1.0", "description": "", "authors": ["a", "b"]}
+    return {"project": project, "agents": agents, "interactions": interactions,
+            "tools": tools, "connections": connections}
+
+
+def run(method, n_agents, rtt):
+    conn = SimulatedConnection(rtt)
+    storage = SQLProjectStorage()
+    storage.db = SimulatedDatabase(conn)
+    graph = make_graph(n_agents)
+    start = time.perf_counter()
+    result = getattr(storage, method)(graph)
+    elapsed = time.perf_counter() - start
+    if result.get("status") != "success":
+        raise RuntimeError(result)
+    return elapsed, conn.round_trips
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rtt-ms", type=float, default=0.5, help="Simulated network round trip (ms)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100, 250, 500])
+    args = parser.parse_args()
+    rtt = args.rtt_ms / 1000
+
+    print(f"Simulated RTT: {args.rtt_ms} ms")
+    print(f"{'method':<16}{'agents':>8}{'rows':>8}{'round trips':>14}{'time (ms)':>12}")
+    for method in ("create_project", "save_project"):
+        for n in args.sizes:
+            graph = make_graph(n)
+            if method == "create_project":
+                rows = n * 6 + len(graph["interactions"]) * 4 + 3
+            else:
+                rows = n * 2 + len(graph["connections"]) + 1
+            elapsed, trips = run(method, n, rtt)
+            print(f"{method:<16}{n:>8}{rows:>8}{trips:>14}{elapsed * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,227 @@
-from flask import Flask, Response, request
-import requests
+"""
+Reverse proxy in front of the exported projects: /<client>/<path> is
+forwarded to <route_map[client]>/<path>. Run with `python proxy.py`, which
+also starts the ngrok tunnel.
+
+Each upstream gets its own pool of keep-alive connections, and routes are
+re-read only when route_map.json changes. Request and response bodies
+(including SSE streams) are relayed chunk by chunk through buffers of at
+most PROXY_BUFFER_SIZE bytes: a slow client pauses the read from the
+upstream and a slow upstream pauses the read from the client, so memory
+per request stays flat whatever the payload size. WebSocket upgrades are
+relayed message by message.
+"""
+import asyncio
 import json
-app = Flask(__name__)
+import logging
+import os
 import subprocess
+import time
+import aiohttp
+from aiohttp import web
+from multidict import CIMultiDict
+from yarl import URL
+from app.services.route_map import RouteTable
 
-ROUTE_MAP = {
-    
-    # Add more mappings as needed
-}
-
-
-def load_map(file_path):
-    try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-
-@app.route('/<client>', defaults={'path': ''}, methods=["GET", "POST", "PUT", "DELETE"])
-@app.route('/<client>/<path:path>', methods=["GET", "POST", "PUT", "DELETE"])
-def proxy(client, path):
-    # Load the route map from a JSON file
-    ROUTE_MAP = load_map('route_map.json')
-    base_url = ROUTE_MAP.get(client)
-    print(f"Base URL for {client}: {base_url}")
-    if not base_url:
-        return {"error": "Unknown client"}, 404
-
-    print(f"Client: {client}, Path: {path}")
-    target_url = f"{base_url}/{path}"
-    resp = requests.request(
-        method=request.method,
-        url=target_url,
-        headers={key: value for (key, value) in request.headers if key.lower() != 'host'},
-        data=request.get_data(),
-        cookies=request.cookies,
-        allow_redirects=False
-    )
-    print(f"Proxying {request.method} request to {target_url}")
-    excluded_headers = ['content-encoding', 'content-length', 'transfer-encoding', 'connection']
-    headers = [(name, value) for (name, value) in resp.raw.headers.items() if name.lower() not in excluded_headers]
-    print(resp.content)
-    print(resp.status_code)
-    print(headers)
-    return Response(resp.content, resp.status_code, headers)
+PROXY_PORT = int(os.getenv("PROXY_PORT", "8080"))
+# Connect timeout, and the longest an upstream may go without sending data
+PROXY_CONNECT_TIMEOUT = float(os.getenv("PROXY_CONNECT_TIMEOUT", "5"))
+PROXY_READ_TIMEOUT = float(os.getenv("PROXY_READ_TIMEOUT", "120"))
+# Open connections per upstream, and how long idle ones are kept
+PROXY_POOL_SIZE = int(os.getenv("PROXY_POOL_SIZE", "100"))
+PROXY_KEEPALIVE = float(os.getenv("PROXY_KEEPALIVE", "30"))
+# Proxied traffic is reported to the backend so active containers are not collected
+LUMOS_BACKEND_URL = os.getenv("LUMOS_BACKEND_URL", "http://localhost:8000")
+PROXY_TOUCH_INTERVAL = float(os.getenv("PROXY_TOUCH_INTERVAL", "60"))
 
-if __name__ == '__main__':
-    subprocess.Popen(["ngrok", "http", "8080"])
+# Per-direction read buffer, and the largest chunk relayed at once
+PROXY_BUFFER_SIZE = int(os.getenv("PROXY_BUFFER_SIZE", str(64 * 1024)))
+
+# Meaningful for one connection only, never forwarded (RFC 9110 section 7.6.1)
+HOP_BY_HOP = {"connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+              "te", "trailer", "transfer-encoding", "upgrade", "host"}
+# Negotiated separately on each side of a relayed WebSocket
+WEBSOCKET_HEADERS = {"sec-websocket-key", "sec-websocket-version", "sec-websocket-extensions",
+                     "sec-websocket-protocol", "sec-websocket-accept"}
+
+access_log = logging.getLogger("lumos.proxy.access")
+
+
+def forward_headers(headers):
+    """
+    Drop hop-by-hop headers, including any named in Connection. Repeated
+    headers (several Set-Cookie, say) are all kept.
+    """
+    dropped = HOP_BY_HOP | {name.strip().lower() for name in headers.get("Connection", "").split(",")}
+    return CIMultiDict((name, value) for name, value in headers.items() if name.lower() not in dropped)
+
+
+class Toucher:
+    """Tells the backend a container was used, at most once per `interval` per container"""
+
+    def __init__(self, backend_url=LUMOS_BACKEND_URL, interval=PROXY_TOUCH_INTERVAL):
+        self.backend_url = backend_url
+        self.interval = interval
+        self._last = {}
+
+    def __call__(self, session, client):
+        if not self.backend_url:
+            return
+        now = time.monotonic()
+        if now - self._last.get(client, float("-inf")) < self.interval:
+            return
+        self._last[client] = now
+        asyncio.ensure_future(self._touch(session, client))
+
+    async def _touch(self, session, client):
+        try:
+            async with session.post(f"{self.backend_url}/api/containers/{client}/touch",
+                                    timeout=aiohttp.ClientTimeout(total=5)):
+                pass
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+
+
+class Proxy:
+    """`routes` is anything with get(client) -> base URL; route_map.json by default"""
+
+    def __init__(self, routes=None, pool_size=PROXY_POOL_SIZE, connect_timeout=PROXY_CONNECT_TIMEOUT,
+                 read_timeout=PROXY_READ_TIMEOUT, buffer_size=PROXY_BUFFER_SIZE, toucher=None):
+        self.routes = routes if routes is not None else RouteTable()
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(total=None, sock_connect=connect_timeout, sock_read=read_timeout)
+        self.buffer_size = buffer_size
+        self.toucher = toucher or Toucher()
+        self.session = None
 
-    app.run(port=8080)
+    async def open(self, app):
+        # Pools are per (host, port), i.e. one per upstream container
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=self.pool_size,
+                                         keepalive_timeout=PROXY_KEEPALIVE)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout, auto_decompress=False,
+                                             read_bufsize=self.buffer_size, cookie_jar=aiohttp.DummyCookieJar())
+
+    async def close(self, app):
+        await self.session.close()
+
+    async def handle(self, request):
+        client = request.match_info["client"]
+        started = time.perf_counter()
+        log = {"upstream": None, "status": 502, "bytes": 0}
+        try:
+            base_url = self.routes.get(client)
+            if not base_url:
+                log["status"] = 404
+                return web.json_response({"error": "Unknown client"}, status=404)
+
+            # Forward the path and query as received, still percent-encoded
+            parts = request.rel_url.raw_path.split("/", 2)
+            upstream = f"{base_url}/{parts[2] if len(parts) > 2 else ''}"
+            if request.rel_url.raw_query_string:
+                upstream = f"{upstream}?{request.rel_url.raw_query_string}"
+            log["upstream"] = upstream
+            headers = forward_headers(request.headers)
+            headers["X-Forwarded-For"] = request.remote or ""
+            headers["X-Forwarded-Host"] = request.host
+            headers["X-Forwarded-Proto"] = request.scheme
+            self.toucher(self.session, client)
+
+            if request.headers.get("Upgrade", "").lower() == "websocket":
+                return await self._relay_websocket(request, URL(upstream, encoded=True), headers, log)
+            return await self._relay_http(request, URL(upstream, encoded=True), headers, log)
+        finally:
+            access_log.info(json.dumps({
+                "time": round(time.time(), 3), "remote": request.remote, "method": request.method,
+                "client": client, "path": request.path_qs, **log,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            }))
+
+    async def _relay_http(self, request, upstream, headers, log):
+        response = None
+        try:
+            async with self.session.request(request.method, upstream, headers=headers,
+                                            data=request.content if request.body_exists else None,
+                                            allow_redirects=False) as resp:
+                # Content-Length is passed through, otherwise the body is sent chunked
+                response = web.StreamResponse(status=resp.status, headers=forward_headers(resp.headers))
+                log["status"] = resp.status
+                await response.prepare(request)
+                # Each chunk is relayed as soon as it arrives; write() waits while the client is slow
+                async for chunk in resp.content.iter_chunked(self.buffer_size):
+                    await response.write(chunk)
+                    log["bytes"] += len(chunk)
+                await response.write_eof()
+                return response
+        except asyncio.TimeoutError:
+            if response is not None and response.prepared:
+                raise
+            log["status"] = 504
+            return web.json_response({"error": "Upstream timed out"}, status=504)
+        except aiohttp.ClientConnectionError as e:
+            if response is not None and response.prepared:
+                raise
+            log["status"] = 502
+            return web.json_response({"error": f"Upstream unavailable: {str(e)}"}, status=502)
+
+    async def _relay_websocket(self, request, upstream, headers, log):
+        headers = CIMultiDict((name, value) for name, value in headers.items() if name.lower() not in WEBSOCKET_HEADERS)
+        protocols = [p.strip() for p in request.headers.get("Sec-WebSocket-Protocol", "").split(",") if p.strip()]
+        try:
+            upstream_ws = await self.session.ws_connect(upstream, headers=headers, protocols=protocols,
+                                                        autoping=False, max_msg_size=0)
+        except aiohttp.WSServerHandshakeError as e:
+            log["status"] = e.status
+            return web.json_response({"error": f"Upstream refused the WebSocket: {e.message}"}, status=e.status)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            return web.json_response({"error": f"Upstream unavailable: {str(e)}"}, status=502)
+
+        client_ws = web.WebSocketResponse(protocols=[upstream_ws.protocol] if upstream_ws.protocol else (),
+                                          autoping=False, max_msg_size=0)
+        try:
+            await client_ws.prepare(request)
+            log["status"] = 101
+
+            async def pump(source, target):
+                async for message in source:
+                    if message.type == aiohttp.WSMsgType.TEXT:
+                        await target.send_str(message.data)
+                    elif message.type == aiohttp.WSMsgType.BINARY:
+                        await target.send_bytes(message.data)
+                    elif message.type == aiohttp.WSMsgType.PING:
+                        await target.ping(message.data)
+                    elif message.type == aiohttp.WSMsgType.PONG:
+                        await target.pong(message.data)
+                    else:
+                        break
+                    log["bytes"] += len(message.data)
+                await target.close(code=source.close_code or aiohttp.WSCloseCode.OK)
+
+            # Whichever side closes first ends the relay for both
+            pumps = [asyncio.ensure_future(pump(client_ws, upstream_ws)),
+                     asyncio.ensure_future(pump(upstream_ws, client_ws))]
+            done, pending = await asyncio.wait(pumps, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            for task in done:
+                task.result()
+        finally:
+            await upstream_ws.close()
+            await client_ws.close()
+        return client_ws
+
+
+def create_app(routes=None, **options):
+    proxy = Proxy(routes, **options)
+    # Bounds how much of a request body is read ahead of the upstream
+    app = web.Application(handler_args={"read_bufsize": proxy.buffer_size})
+    app.on_startup.append(proxy.open)
+    app.on_cleanup.append(proxy.close)
+    app.router.add_route("*", "/{client}", proxy.handle)
+    app.router.add_route("*", "/{client}/{path:.*}", proxy.handle)
+    return app
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    subprocess.Popen(["ngrok", "http", str(PROXY_PORT)])
+    web.run_app(create_app(), port=PROXY_PORT, access_log=None)
@@ -0,0 +1,65 @@
+import unittest
+import asyncio
+import threading
+import time
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.models.async_storage_strategy import AsyncProjectStorage, StorageExecutor, make_async_storage
+
+class SlowModel:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def get_project_by_id(self, project_id):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        return {"project": {"id": project_id}}
+
+class TestAsyncProjectStorage(unittest.TestCase):
+    def test_offloaded_calls_do_not_block_the_loop(self):
+        storage = AsyncProjectStorage(SlowModel(0.1), StorageExecutor(2))
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def run():
+            await asyncio.gather(storage.get_project_by_id(1), ticker())
+
+        asyncio.run(run())
+        self.assertEqual(len(ticks), 5)
+        self.assertLess(ticks[-1] - ticks[0], 0.09)
+
+    def test_concurrency_is_bounded_by_workers(self):
+        model = SlowModel(0.02)
+        storage = AsyncProjectStorage(model, StorageExecutor(3))
+
+        async def run():
+            return await asyncio.gather(*(storage.get_project_by_id(i) for i in range(12)))
+
+        results = asyncio.run(run())
+        self.assertEqual([r["project"]["id"] for r in results], list(range(12)))
+        self.assertEqual(model.peak, 3)
+
+    def test_sync_mode_runs_inline(self):
+        model = SlowModel(0)
+        storage = make_async_storage(model, mode="sync")
+        self.assertIsNone(storage.executor)
+        result = asyncio.run(storage.get_project_by_id(4))
+        self.assertEqual(result["project"]["id"], 4)
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            make_async_storage(SlowModel(), mode="threads")
+
+if __name__ == '__main__':
+    unittest.main()
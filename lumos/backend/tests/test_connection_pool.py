@@ -0,0 +1,115 @@
+import unittest
+import threading
+import time
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.models.connection_pool import ConnectionPool, PoolClosed, PoolTimeout
+
+class FakeConnection:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+        self.in_transaction = False
+        self.rollbacks = 0
+
+    def is_connected(self):
+        return self.connected
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+        self.connected = False
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.created = []
+
+    def _factory(self):
+        conn = FakeConnection()
+        self.created.append(conn)
+        return conn
+
+    def test_connections_are_reused(self):
+        pool = ConnectionPool(self._factory, size=2)
+        conn = pool.acquire()
+        conn.close()
+        conn = pool.acquire()
+        conn.close()
+        self.assertEqual(len(self.created), 1)
+        self.assertEqual(pool.stats()["checkouts"], 2)
+        self.assertEqual(pool.stats()["idle"], 1)
+
+    def test_close_is_idempotent(self):
+        pool = ConnectionPool(self._factory, size=1)
+        conn = pool.acquire()
+        conn.close()
+        conn.close()
+        self.assertEqual(pool.stats()["in_use"], 0)
+        self.assertEqual(pool.stats()["idle"], 1)
+
+    def test_close_all_closes_released_connections_and_rejects_new_ones(self):
+        pool = ConnectionPool(self._factory, size=2)
+        idle = pool.acquire()
+        held = pool.acquire()
+        idle.close()
+        pool.close_all()
+        self.assertTrue(self.created[0].closed)
+        self.assertFalse(self.created[1].closed)
+        held.close()
+        self.assertTrue(self.created[1].closed)
+        self.assertEqual((pool.stats()["open"], pool.stats()["idle"]), (0, 0))
+        with self.assertRaises(PoolClosed):
+            pool.acquire()
+
+    def test_exhausted_pool_times_out(self):
+        pool = ConnectionPool(self._factory, size=1, timeout=0.05)
+        held = pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        held.close()
+        self.assertEqual(pool.stats()["timeouts"], 1)
+
+    def test_waiter_gets_released_connection(self):
+        pool = ConnectionPool(self._factory, size=1, timeout=2)
+        held = pool.acquire()
+        threading.Timer(0.05, held.close).start()
+        conn = pool.acquire()
+        conn.close()
+        stats = pool.stats()
+        self.assertEqual(len(self.created), 1)
+        self.assertEqual(stats["waited_checkouts"], 1)
+        self.assertGreater(stats["max_wait"], 0)
+
+    def test_open_transaction_is_rolled_back_on_release(self):
+        pool = ConnectionPool(self._factory, size=1)
+        conn = pool.acquire()
+        self.created[0].in_transaction = True
+        conn.close()
+        self.assertEqual(self.created[0].rollbacks, 1)
+
+    def test_stale_connection_is_replaced(self):
+        pool = ConnectionPool(self._factory, size=1, health_check_interval=0)
+        conn = pool.acquire()
+        conn.close()
+        self.created[0].connected = False
+        time.sleep(0.01)
+        conn = pool.acquire()
+        self.assertIs(conn._raw, self.created[1])
+        self.assertTrue(self.created[0].closed)
+        self.assertEqual(pool.stats()["connections_discarded"], 1)
+        conn.close()
+
+    def test_failed_connect_frees_slot(self):
+        def failing_factory():
+            raise RuntimeError("connection refused")
+        pool = ConnectionPool(failing_factory, size=1, timeout=0.05)
+        with self.assertRaises(RuntimeError):
+            pool.acquire()
+        self.assertEqual(pool.stats()["open"], 0)
+        self.assertEqual(pool.stats()["in_use"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
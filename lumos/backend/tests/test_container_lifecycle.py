@@ -0,0 +1,118 @@
+import unittest
+import asyncio
+import json
+import tempfile
+import time
+from httpx import AsyncClient, ASGITransport
+from unittest.mock import patch
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.main import app
+from app.services.container_lifecycle import ContainerLifecycle
+from app.services.route_map import add_route
+
+class FakeDocker:
+    def __init__(self):
+        self.removed = []
+
+    async def __call__(self, *args):
+        self.removed.append(args[2])
+        return 0, ""
+
+class TestContainerLifecycle(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.routes = os.path.join(self.tmp.name, "route_map.json")
+        self.inventory = os.path.join(self.tmp.name, "inventory.json")
+        self.docker = FakeDocker()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _lifecycle(self, **kwargs):
+        return ContainerLifecycle(self.docker, path=self.inventory, route_map_path=self.routes, **kwargs)
+
+    def _register(self, lifecycle, name):
+        add_route(name, f"http://localhost/{name}", self.routes)
+        return lifecycle.register(name, 5000, {"name": "demo", "version": "1.0"})
+
+    def _routes(self):
+        with open(self.routes) as f:
+            return json.load(f)
+
+    def test_lru_eviction_over_the_cap(self):
+        async def run():
+            lifecycle = self._lifecycle(max_containers=2)
+            for name in ("ui_a", "ui_b"):
+                self._register(lifecycle, name)
+            lifecycle.touch("ui_a")  # ui_b is now least recently used
+            self._register(lifecycle, "ui_c")
+            await asyncio.sleep(0.01)
+            return lifecycle
+
+        lifecycle = asyncio.run(run())
+        self.assertEqual(self.docker.removed, ["ui_b"])
+        self.assertEqual([c["name"] for c in lifecycle.inventory()], ["ui_c", "ui_a"])
+        self.assertEqual(set(self._routes()), {"ui_a", "ui_c"})
+        self.assertEqual(lifecycle.stats()["removed"]["evicted"], 1)
+
+    def test_sweep_removes_idle_containers(self):
+        async def run():
+            lifecycle = self._lifecycle(ttl=60)
+            self._register(lifecycle, "ui_old")
+            self._register(lifecycle, "ui_new")
+            lifecycle.records["ui_old"].last_used = time.time() - 120
+            return lifecycle, await lifecycle.sweep()
+
+        lifecycle, expired = asyncio.run(run())
+        self.assertEqual(expired, ["ui_old"])
+        self.assertEqual(list(self._routes()), ["ui_new"])
+
+    def test_inventory_survives_restart(self):
+        async def run():
+            self._register(self._lifecycle(), "ui_a")
+
+        asyncio.run(run())
+        reloaded = self._lifecycle()
+        self.assertEqual(reloaded.inventory()[0]["project"], {"name": "demo", "version": "1.0"})
+
+    def test_runtime_exports_unregistered_instead_of_removed(self):
+        unregistered = []
+
+        async def unregister(name):
+            unregistered.append(name)
+
+        async def run():
+            lifecycle = self._lifecycle(max_containers=1, unregister=unregister)
+            add_route("rt_old", "http://localhost:8000/run/rt_old", self.routes)
+            lifecycle.register("rt_old", None, {"name": "demo"}, kind="runtime")
+            self._register(lifecycle, "ui_new")
+            await asyncio.sleep(0.01)
+
+        asyncio.run(run())
+        self.assertEqual(unregistered, ["rt_old"])
+        self.assertEqual(self.docker.removed, [])
+        self.assertEqual(list(self._routes()), ["ui_new"])
+        self.assertEqual(self._lifecycle().inventory()[0]["kind"], "container")
+
+    def test_api(self):
+        async def run():
+            lifecycle = self._lifecycle()
+            self._register(lifecycle, "ui_a")
+            with patch('app.controllers.container_controller.get_container_lifecycle', return_value=lifecycle):
+                async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                    listed = await client.get("/api/containers")
+                    touched = await client.post("/api/containers/ui_a/touch")
+                    removed = await client.delete("/api/containers/ui_a")
+                    missing = await client.delete("/api/containers/ui_a")
+            return listed, touched, removed, missing
+
+        listed, touched, removed, missing = asyncio.run(run())
+        self.assertEqual(listed.json()["containers"][0]["name"], "ui_a")
+        self.assertEqual(touched.status_code, 200)
+        self.assertEqual(removed.status_code, 200)
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(self.docker.removed, ["ui_a"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import unittest
+import asyncio
+import time
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.services.container_pool import ContainerPool
+
+class FakeImages:
+    def __init__(self):
+        self.tag = "ui:test"
+
+    async def ensure_image(self):
+        return self.tag
+
+class FakeDocker:
+    def __init__(self):
+        self.running = set()
+        self.removed = []
+
+    async def __call__(self, *args):
+        if args[0] == "run":
+            self.running.add(args[args.index("--name") + 1])
+        elif args[0] == "rm":
+            self.running.discard(args[2])
+            self.removed.append(args[2])
+        return 0, ""
+
+def make_pool(**kwargs):
+    docker = FakeDocker()
+    configured = []
+    broken = set()
+
+    async def probe(url):
+        await asyncio.sleep(0.01)
+
+    async def configure(url, token, config):
+        if url in broken:
+            raise RuntimeError("connection refused")
+        configured.append((url, token, config))
+
+    pool = ContainerPool(FakeImages(), docker, probe, configure, **kwargs)
+    return pool, docker, configured, broken
+
+class TestContainerPool(unittest.TestCase):
+    def test_cold_then_warm(self):
+        async def run():
+            pool, docker, configured, _ = make_pool(min_size=1, max_size=3, idle_ttl=600)
+            first = await pool.acquire({"project": 1})
+            await pool._refill_task  # background warm-up after the first claim
+            self.assertEqual(len(pool.idle), 1)
+            second = await pool.acquire({"project": 2})
+            await pool.close()
+            return pool, first, second, configured
+
+        pool, first, second, configured = asyncio.run(run())
+        self.assertEqual((pool.misses, pool.hits), (1, 1))
+        self.assertNotEqual(first.name, second.name)
+        self.assertEqual([c[2] for c in configured], [{"project": 1}, {"project": 2}])
+        self.assertEqual(configured[1][1], second.token)
+
+    def test_target_follows_export_rate(self):
+        pool, *_ = make_pool(min_size=1, max_size=4)
+        pool._start_times.extend([30.0])
+        self.assertEqual(pool.target_size(), 1)
+        pool._claims.extend([time.monotonic()] * 30)  # 0.1 exports/s * 30 s start-up
+        self.assertEqual(pool.target_size(), 3)
+        pool._claims.extend([time.monotonic()] * 300)
+        self.assertEqual(pool.target_size(), 4)
+
+    def test_dead_warm_container_is_replaced(self):
+        async def run():
+            pool, docker, configured, broken = make_pool(min_size=1, max_size=1)
+            stale = await pool.start_container()
+            pool.idle.append(stale)
+            broken.add(stale.url)
+            container = await pool.acquire({})
+            await pool.close()
+            return pool, docker, stale, container
+
+        pool, docker, stale, container = asyncio.run(run())
+        self.assertNotEqual(container.name, stale.name)
+        self.assertIn(stale.name, docker.removed)
+        self.assertEqual(pool.misses, 1)
+
+    def test_containers_from_an_old_image_are_not_handed_out(self):
+        async def run():
+            pool, docker, _, _ = make_pool(min_size=1, max_size=1)
+            old = await pool.start_container()
+            pool.idle.append(old)
+            pool.images.tag = "ui:rebuilt"
+            container = await pool.acquire({})
+            await pool.close()
+            return pool, docker, old, container
+
+        pool, docker, old, container = asyncio.run(run())
+        self.assertEqual(old.image, "ui:test")
+        self.assertEqual(container.image, "ui:rebuilt")
+        self.assertIn(old.name, docker.removed)
+        self.assertEqual((pool.stale, pool.hits, pool.misses), (1, 0, 1))
+
+    def test_reap_removes_containers_from_an_old_image(self):
+        async def run():
+            pool, docker, _, _ = make_pool(min_size=2, max_size=2, idle_ttl=600)
+            old = await pool.start_container()
+            pool.idle.append(old)
+            pool.images.tag = "ui:rebuilt"
+            pool.idle.append(await pool.start_container())
+            await pool.reap()
+            return pool, docker, old
+
+        pool, docker, old = asyncio.run(run())
+        self.assertEqual([c.image for c in pool.idle], ["ui:rebuilt"])
+        self.assertEqual(docker.removed, [old.name])
+
+    def test_cancelled_docker_run_removes_the_container(self):
+        async def run():
+            pool, docker, _, _ = make_pool()
+            plain = pool.docker
+
+            async def slow_run(*args):
+                await plain(*args)
+                if args[0] == "run":
+                    await asyncio.sleep(10)
+                return 0, ""
+
+            pool.docker = slow_run
+            task = asyncio.create_task(pool.start_container())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return docker
+
+        docker = asyncio.run(run())
+        self.assertEqual(docker.running, set())
+        self.assertEqual(len(docker.removed), 1)
+
+    def test_reap_keeps_target(self):
+        async def run():
+            pool, docker, _, _ = make_pool(min_size=1, max_size=5, idle_ttl=0)
+            for _ in range(3):
+                pool.idle.append(await pool.start_container())
+            await asyncio.sleep(0.01)
+            await pool.reap()
+            return pool, docker
+
+        pool, docker = asyncio.run(run())
+        self.assertEqual(len(pool.idle), 1)
+        self.assertEqual(len(docker.removed), 2)
+
+    def test_warms_up_without_claims_and_close_removes_everything(self):
+        async def run():
+            pool, docker, _, _ = make_pool(min_size=2, max_size=2)
+            pool.schedule_refill()  # as the startup hook does
+            await pool._refill_task
+            warm = len(pool.idle)
+            pool.schedule_refill()
+            await asyncio.sleep(0)  # a container is now starting
+            pool.idle.popleft()
+            pool.schedule_refill()
+            await asyncio.sleep(0.005)
+            await pool.close()
+            return warm, set(docker.running)
+
+        warm, running = asyncio.run(run())
+        self.assertEqual(warm, 2)
+        # Only the container handed out by popleft() is left running
+        self.assertEqual(len(running), 1)
+
+if __name__ == '__main__':
+    unittest.main()
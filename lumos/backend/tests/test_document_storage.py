@@ -0,0 +1,107 @@
+import unittest
+from unittest.mock import patch
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.models import document_storage_strategy
+from app.models.document_storage_strategy import DocumentProjectStorage, canonical_bytes, compress, decompress
+from app.models.project_model import ProjectModel
+
+def make_canvas(name="canvas", label="asks"):
+    return {
+        "project": {"name": name, "version": "1.0", "description": ""},
+        "agents": [{"id": "agent-a", "name": "A", "description": "", "type": "AI", "position": {"x": 10, "y": 20}},
+                   {"id": "agent-b", "name": "B", "description": "", "type": "AI"}],
+        "tools": [{"id": "tool-1", "name": "Search", "description": "", "type": "Information"}],
+        "tasks": [],
+        "connections": [{"id": "c-1", "source": "agent-a", "target": "agent-b", "label": label}],
+    }
+
+class TestDocumentProjectStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = DocumentProjectStorage(os.path.join(self.tmp.name, "docs.db"))
+        self.model = ProjectModel(self.storage)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _count(self, table):
+        cursor = self.storage.db.get_connection().cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        return cursor.fetchone()[0]
+
+    def test_round_trip_keeps_positions(self):
+        result = self.model.save_project(make_canvas())
+        project = self.model.get_project_by_id(result["project_id"])
+        self.assertEqual(project["project"]["name"], "canvas")
+        self.assertEqual(project["agents"][0]["position"], {"x": 10, "y": 20})
+        self.assertEqual(project["agents"][0]["agent_id"], "agent-a")
+        self.assertIn("position", project["agents"][1])
+        self.assertEqual(project["interactions"][0]["participants"], ["agent-a", "agent-b"])
+
+    def test_unchanged_save_is_deduplicated(self):
+        first = self.model.save_project(make_canvas())
+        second = self.model.save_project(make_canvas())
+        self.assertEqual(second["project_id"], first["project_id"])
+        self.assertTrue(second["deduplicated"])
+        self.assertEqual((self._count("projects"), self._count("project_blobs")), (1, 1))
+
+    def test_save_ids_do_not_defeat_deduplication(self):
+        first = self.model.save_project(make_canvas())
+        canvas = make_canvas()
+        canvas["project"].update(id=first["project_id"], revision=None)
+        second = self.model.save_project(canvas)
+        self.assertTrue(second["deduplicated"])
+        self.assertEqual(self._count("project_blobs"), 1)
+
+    def test_concurrent_identical_saves_write_once(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: self.model.save_project(make_canvas()), range(16)))
+        self.assertTrue(all(r["status"] == "success" for r in results), results)
+        self.assertEqual(len({r["project_id"] for r in results}), 1)
+        self.assertEqual(sum(not r["deduplicated"] for r in results), 1)
+        self.assertEqual((self._count("projects"), self._count("project_blobs")), (1, 1))
+
+    def test_changed_save_adds_a_version(self):
+        first = self.model.save_project(make_canvas())
+        second = self.model.save_project(make_canvas(label="tells"))
+        self.assertNotEqual(second["project_id"], first["project_id"])
+        self.assertEqual((self._count("projects"), self._count("project_blobs")), (2, 2))
+
+    def test_reverted_canvas_reuses_its_blob(self):
+        self.model.save_project(make_canvas())
+        self.model.save_project(make_canvas(label="tells"))
+        self.model.save_project(make_canvas())  # back to the first version
+        self.assertEqual((self._count("projects"), self._count("project_blobs")), (3, 2))
+
+    def test_listing(self):
+        for i in range(3):
+            self.model.save_project(make_canvas(name=f"p{i}"))
+        page = self.model.get_all_projects(limit=2, count="exact")
+        self.assertEqual([p["name"] for p in page["projects"]], ["p2", "p1"])
+        self.assertEqual(page["total"], 3)
+        self.assertIsNotNone(page["next_cursor"])
+
+    def test_missing_project(self):
+        self.assertEqual(self.model.get_project_by_id(5)["status"], "error")
+
+    def test_canonical_form_ignores_key_order(self):
+        self.assertEqual(canonical_bytes({"a": 1, "b": [1, 2]}), canonical_bytes({"b": [1, 2], "a": 1}))
+
+    def test_json_fallback_matches_orjson(self):
+        document = make_canvas()
+        with patch.object(document_storage_strategy, "orjson", None):
+            fallback = canonical_bytes(document)
+        self.assertEqual(fallback, canonical_bytes(document))
+
+    def test_compression_round_trip(self):
+        raw = canonical_bytes(make_canvas())
+        codec, data = compress(raw)
+        self.assertEqual(decompress(codec, data), raw)
+        with self.assertRaises(ValueError):
+            decompress("lz4", data)
+
+if __name__ == '__main__':
+    unittest.main()
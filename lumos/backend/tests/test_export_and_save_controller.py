@@ -31,7 +31,7 @@ class TestExportAndSaveController(unittest.TestCase):
 
     @patch('app.controllers.export_controller.service')
     def test_save_project_success(self, mock_service):
-        mock_service.save_project.return_value = {'status': 'success', 'project_id': 1}
+        mock_service.save_project_async = AsyncMock(return_value={'status': 'success', 'project_id': 1})
         payload = {"project": {"name": "test", "version": "1.0", "description": "desc", "authors": []}, "agents": [], "tools": [], "tasks": [], "connections": []}
         response = self._post("/api/save", payload)
         self.assertEqual(response.status_code, 200)
@@ -39,7 +39,17 @@ class TestExportAndSaveController(unittest.TestCase):
 
     @patch('app.controllers.export_controller.service')
     def test_save_project_error(self, mock_service):
-        mock_service.save_project.return_value = {'status': 'error', 'message': 'fail'}
+        mock_service.save_project_async = AsyncMock(return_value={'status': 'error', 'message': 'fail'})
         payload = {"project": {"name": "test", "version": "1.0", "description": "desc", "authors": []}, "agents": [], "tools": [], "tasks": [], "connections": []}
         response = self._post("/api/save", payload)
-        self.assertEqual(response.status_code, 400)
\ No newline at end of file
+        self.assertEqual(response.status_code, 400)
+
+    @patch('app.controllers.export_controller.service')
+    def test_save_project_conflict(self, mock_service):
+        mock_service.save_project_async = AsyncMock(return_value={'status': 'error', 'conflict': True, 'revision': 4, 'message': 'stale'})
+        payload = {"project": {"name": "test", "version": "1.0", "description": "desc", "id": 1, "revision": 3}, "agents": []}
+        response = self._post("/api/save", payload)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json().get('revision'), 4)
+        saved = mock_service.save_project_async.call_args[0][0]["project"]
+        self.assertEqual((saved["id"], saved["revision"]), (1, 3))
\ No newline at end of file
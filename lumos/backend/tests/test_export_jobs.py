@@ -0,0 +1,132 @@
+import unittest
+import asyncio
+import json
+from httpx import AsyncClient, ASGITransport
+from unittest.mock import patch
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.main import app
+from app.controllers.export_controller import service
+from app.services.export_jobs import ExportJob, ExportJobRegistry
+
+PAYLOAD = {"project": {"name": "demo", "version": "1.0", "description": "", "authors": []},
+           "agents": [], "interactions": []}
+
+def parse_sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+class TestExportJob(unittest.TestCase):
+    def test_stage_timings_and_result(self):
+        async def run():
+            job = ExportJob()
+            future = asyncio.get_running_loop().create_future()
+            job.attach(future)
+            job.start_stage("build")
+            job.start_stage("run")
+            future.set_result({"ngrok_url": "http://x"})
+            await asyncio.sleep(0)
+            return job
+
+        job = asyncio.run(run())
+        self.assertEqual(job.state, "succeeded")
+        self.assertEqual([s["name"] for s in job.stages], ["build", "run"])
+        self.assertTrue(all(s["duration"] is not None for s in job.stages))
+        self.assertEqual([e["event"] for e in job.events], ["queued", "stage", "stage", "succeeded"])
+        self.assertEqual(job.to_dict()["result"], {"ngrok_url": "http://x"})
+
+    def test_stream_follows_live_job(self):
+        async def run():
+            job = ExportJob()
+            future = asyncio.get_running_loop().create_future()
+            job.attach(future)
+
+            async def progress():
+                await asyncio.sleep(0.01)
+                job.start_stage("build")
+                await asyncio.sleep(0.01)
+                future.set_exception(RuntimeError("boom"))
+
+            asyncio.ensure_future(progress())
+            return [event["event"] async for event in job.stream() if event]
+
+        self.assertEqual(asyncio.run(run()), ["queued", "stage", "failed"])
+
+    def test_registry_retention(self):
+        async def run():
+            registry = ExportJobRegistry(max_jobs=2, ttl=3600)
+            jobs = []
+            for _ in range(4):
+                job = registry.add(ExportJob())
+                future = asyncio.get_running_loop().create_future()
+                job.attach(future)
+                future.set_result({})
+                jobs.append(job)
+            await asyncio.sleep(0)
+            pending = registry.add(ExportJob())  # never finishes, never pruned
+            registry.ttl = -1
+            return registry, jobs, pending
+
+        registry, jobs, pending = asyncio.run(run())
+        self.assertIsNone(registry.get(jobs[0].id))
+        self.assertIs(registry.get(pending.id), pending)
+        self.assertEqual(len(registry), 1)
+
+class TestExportJobRoutes(unittest.TestCase):
+    def test_submit_stream_and_poll(self):
+        async def fake_export(project_data, progress=None):
+            for stage in ("build", "run", "route", "tunnel"):
+                progress(stage)
+                await asyncio.sleep(0.01)
+            return {"container": "ui_test", "ngrok_url": "https://tunnel/ui_test", "status": "success"}
+
+        async def run():
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                submitted = await client.post("/api/export/jobs", json=PAYLOAD)
+                job_id = submitted.json()["job_id"]
+                events = await client.get(submitted.json()["events_url"])
+                status = await client.get(f"/api/export/{job_id}")
+                missing = await client.get("/api/export/nope")
+                return submitted, events, status, missing
+
+        with patch.object(service, "_execute_export", fake_export):
+            submitted, events, status, missing = asyncio.run(run())
+
+        self.assertEqual(submitted.status_code, 202)
+        self.assertEqual(events.headers["content-type"].split(";")[0], "text/event-stream")
+        names = [(name, data.get("stage")) for name, data in parse_sse(events.text)]
+        self.assertEqual(names, [("queued", None), ("stage", "build"), ("stage", "run"),
+                                 ("stage", "route"), ("stage", "tunnel"), ("succeeded", None)])
+        body = status.json()
+        self.assertEqual(body["state"], "succeeded")
+        self.assertEqual(body["result"]["ngrok_url"], "https://tunnel/ui_test")
+        self.assertEqual(len(body["stages"]), 4)
+        self.assertEqual(missing.status_code, 404)
+
+    def test_cancel(self):
+        async def slow_export(project_data, progress=None):
+            progress("build")
+            await asyncio.sleep(5)
+
+        async def run():
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                job_id = (await client.post("/api/export/jobs", json=PAYLOAD)).json()["job_id"]
+                await asyncio.sleep(0.01)
+                cancelled = await client.delete(f"/api/export/{job_id}")
+                await asyncio.sleep(0)
+                again = await client.delete(f"/api/export/{job_id}")
+                status = await client.get(f"/api/export/{job_id}")
+                return cancelled, again, status
+
+        with patch.object(service, "_execute_export", slow_export):
+            cancelled, again, status = asyncio.run(run())
+        self.assertEqual(cancelled.status_code, 200)
+        self.assertEqual(again.status_code, 409)
+        self.assertEqual(status.json()["state"], "cancelled")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+import asyncio
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.services.export_scheduler import ExportCancelled, ExportScheduler
+
+class TestExportScheduler(unittest.TestCase):
+    def test_runs_up_to_max_concurrent_at_once(self):
+        running = []
+        peak = []
+
+        async def handler(payload):
+            running.append(payload)
+            peak.append(len(running))
+            await asyncio.sleep(0.05)
+            running.remove(payload)
+            return payload * 2
+
+        async def run():
+            scheduler = ExportScheduler(handler, max_concurrent=3, timeout=5)
+            tickets = [scheduler.submit(i) for i in range(6)]
+            results = await asyncio.gather(*(t.future for t in tickets))
+            await scheduler.close()
+            return results, scheduler.stats()
+
+        results, stats = asyncio.run(run())
+        self.assertEqual(results, [0, 2, 4, 6, 8, 10])
+        self.assertEqual(max(peak), 3)
+        self.assertEqual(stats["completed"], 6)
+        self.assertEqual(stats["queued"], 0)
+
+    def test_priority_order(self):
+        order = []
+
+        async def handler(payload):
+            order.append(payload)
+
+        async def run():
+            scheduler = ExportScheduler(handler, max_concurrent=1, timeout=5)
+            tickets = [scheduler.submit("low", priority=5), scheduler.submit("high", priority=0),
+                       scheduler.submit("normal", priority=1)]
+            await asyncio.gather(*(t.future for t in tickets))
+            await scheduler.close()
+
+        asyncio.run(run())
+        self.assertEqual(order, ["high", "normal", "low"])
+
+    def test_timeout(self):
+        async def handler(payload):
+            await asyncio.sleep(5)
+
+        async def run():
+            scheduler = ExportScheduler(handler, max_concurrent=1, timeout=0.05)
+            ticket = scheduler.submit("slow")
+            with self.assertRaises(TimeoutError):
+                await ticket.future
+            await scheduler.close()
+            return scheduler.stats()
+
+        self.assertEqual(asyncio.run(run())["timed_out"], 1)
+
+    def test_cancel_queued_and_running(self):
+        started = []
+
+        async def handler(payload):
+            started.append(payload)
+            await asyncio.sleep(5)
+
+        async def run():
+            scheduler = ExportScheduler(handler, max_concurrent=1, timeout=10)
+            running = scheduler.submit("a")
+            queued = scheduler.submit("b")
+            await asyncio.sleep(0.01)
+            self.assertEqual(scheduler.stats()["queued"], 1)
+            self.assertTrue(scheduler.cancel(queued.id))
+            self.assertTrue(scheduler.cancel(running.id))
+            self.assertFalse(scheduler.cancel(running.id))
+            with self.assertRaises(ExportCancelled):
+                await running.future
+            await asyncio.sleep(0.01)
+            self.assertTrue(running.task.cancelled())
+            await scheduler.close()
+            return scheduler.stats()
+
+        stats = asyncio.run(run())
+        self.assertEqual(started, ["a"])
+        self.assertEqual(stats["cancelled"], 2)
+
+    def test_handler_errors_reach_the_caller(self):
+        async def handler(payload):
+            raise RuntimeError("docker build failed")
+
+        async def run():
+            scheduler = ExportScheduler(handler, max_concurrent=2, timeout=5)
+            with self.assertRaises(RuntimeError):
+                await scheduler.submit("x").future
+            await scheduler.close()
+            return scheduler.stats()
+
+        self.assertEqual(asyncio.run(run())["failed"], 1)
+
+    def test_timeouts_inside_the_export_are_failures(self):
+        async def handler(payload):
+            raise TimeoutError("ui_app container did not become healthy")
+
+        async def run():
+            scheduler = ExportScheduler(handler, max_concurrent=1, timeout=5)
+            with self.assertRaisesRegex(TimeoutError, "did not become healthy"):
+                await scheduler.submit("x").future
+            await scheduler.close()
+            return scheduler.stats()
+
+        stats = asyncio.run(run())
+        self.assertEqual((stats["failed"], stats["timed_out"]), (1, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+import asyncio
+import json
+import time
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.services.generation_cache import GenerationCache, cosine, embed, normalize_prompt
+from app.services.generator_service import GeneratorService
+
+TOOL = {"name": "Web Search", "description": "Searches the web", "type": "Information",
+        "subtype": "Search", "parameters": {"query": "(search terms)"}}
+# Valid as both a tool and an agent
+ANSWER = {**TOOL, "capabilities": ["search"], "suggested_tools": {}}
+
+class FakeLLM:
+    def __init__(self, content):
+        self.content = content
+        self.prompts = []
+
+    async def chat(self, messages, model, temperature):
+        self.prompts.append(messages[0]["content"])
+        return self.content
+
+class TestEmbedding(unittest.TestCase):
+    def test_normalize_prompt(self):
+        self.assertEqual(normalize_prompt("  Web   Search Tool! "), "web search tool")
+
+    def test_similarity(self):
+        self.assertAlmostEqual(cosine(embed("a web search tool"), embed("Web search tool")), 1.0)
+        self.assertLess(cosine(embed("web search tool"), embed("web scraping tool")), 0.9)
+        # Same words, different meaning
+        self.assertLess(cosine(embed("pdf to csv converter"), embed("csv to pdf converter")), 0.9)
+        self.assertEqual(embed("a tool"), {})
+
+class TestGenerationCache(unittest.TestCase):
+    def test_exact_hit(self):
+        cache = GenerationCache()
+        self.assertIsNone(cache.get("tool", "web search", "gpt-4o", "v1"))
+        cache.put("tool", "web search", "gpt-4o", "v1", TOOL)
+        self.assertEqual(cache.get("tool", "Web search.", "gpt-4o", "v1"), TOOL)
+        self.assertEqual(cache.stats()["exact_hits"], 1)
+
+    def test_similar_hit(self):
+        cache = GenerationCache(threshold=0.9)
+        cache.put("tool", "a web search tool", "gpt-4o", "v1", TOOL)
+        self.assertEqual(cache.get("tool", "please create a web search tool", "gpt-4o", "v1"), TOOL)
+        self.assertIsNone(cache.get("tool", "web scraping tool", "gpt-4o", "v1"))
+        stats = cache.stats()
+        self.assertEqual((stats["similar_hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_one_deciding_word_is_never_similar(self):
+        intake = ("an agent that reads incoming customer support emails, classifies them by urgency and "
+                  "product area, drafts a reply and files tickets in ")
+        cleanup = ("a cleanup tool that scans the downloads folder, groups duplicates by checksum, reports "
+                   "their total size and does {}delete any files")
+        prompts = [(intake + "jira", intake + "linear"), (cleanup.format("not "), cleanup.format(""))]
+        for stored, asked in prompts:
+            # Close enough to pass the threshold on their own...
+            self.assertGreater(cosine(embed(stored), embed(asked)), 0.9)
+            for cache in (GenerationCache(), GenerationCache(threshold=0.9)):
+                cache.put("agent", stored, "gpt-4o", "v1", TOOL)
+                # ...but never served for each other, by default or when opted in
+                self.assertIsNone(cache.get("agent", asked, "gpt-4o", "v1"))
+
+    def test_relational_words_are_not_ignored(self):
+        cache = GenerationCache(threshold=0.5)
+        cache.put("tool", "convert csv to pdf", "gpt-4o", "v1", TOOL)
+        self.assertIsNone(cache.get("tool", "convert csv and pdf", "gpt-4o", "v1"))
+        self.assertIsNone(cache.get("tool", "convert csv with pdf", "gpt-4o", "v1"))
+
+    def test_reworded_prompt_is_found_through_its_content_words(self):
+        cache = GenerationCache(threshold=0.9)
+        cache.put("tool", "web search", "gpt-4o", "v1", TOOL)
+        cache.put("tool", "web search", "gpt-4o", "v1", ANSWER)  # replaces, doesn't duplicate
+        for prompt in ("pdf parser", "email sender"):
+            cache.put("tool", prompt, "gpt-4o", "v1", TOOL)
+        self.assertEqual(cache.get("tool", "please build a new web search tool", "gpt-4o", "v1"), ANSWER)
+        self.assertEqual(cache.stats()["vectors"], 3)
+
+    def test_similarity_tier_off_by_default(self):
+        cache = GenerationCache()
+        cache.put("tool", "a web search tool", "gpt-4o", "v1", TOOL)
+        self.assertIsNone(cache.get("tool", "please create a web search tool", "gpt-4o", "v1"))
+
+    def test_similarity_tier_can_be_disabled(self):
+        cache = GenerationCache(threshold=0)
+        cache.put("tool", "a web search tool", "gpt-4o", "v1", TOOL)
+        self.assertIsNone(cache.get("tool", "please create a web search tool", "gpt-4o", "v1"))
+        self.assertEqual(cache.stats()["vectors"], 0)
+
+    def test_kind_model_and_template_kept_apart(self):
+        cache = GenerationCache()
+        cache.put("tool", "web search", "gpt-4o", "v1", TOOL)
+        self.assertIsNone(cache.get("agent", "web search", "gpt-4o", "v1"))
+        self.assertIsNone(cache.get("tool", "web search", "gpt-4o-mini", "v1"))
+        self.assertIsNone(cache.get("tool", "web search", "gpt-4o", "v2"))
+
+    def test_expired_answers_not_served_by_similarity(self):
+        cache = GenerationCache(ttl=0.05, threshold=0.9)
+        cache.put("tool", "a web search tool", "gpt-4o", "v1", TOOL)
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("tool", "web search tool", "gpt-4o", "v1"))
+        self.assertEqual(cache.stats()["vectors"], 0)
+
+    def test_size_bound(self):
+        cache = GenerationCache(max_entries=2, threshold=0.9)
+        for prompt in ("pdf parser", "email sender", "weather lookup"):
+            cache.put("tool", prompt, "gpt-4o", "v1", TOOL)
+        self.assertIsNone(cache.get("tool", "pdf parser", "gpt-4o", "v1"))
+        self.assertEqual(cache.get("tool", "weather lookup", "gpt-4o", "v1"), TOOL)
+        self.assertEqual(cache.stats()["vectors"], 2)
+
+class TestCachedGeneration(unittest.TestCase):
+    def test_repeat_prompts_skip_the_llm(self):
+        llm = FakeLLM('```json\n' + json.dumps(ANSWER) + '\n```')
+        service = GeneratorService(llm, GenerationCache(threshold=0.9))
+
+        async def scenario():
+            first = await service.generate_tool("a web search tool")
+            again = await service.generate_tool("Web search tool")
+            agent = await service.generate_agent("a web search tool")
+            return first, again, agent
+
+        first, again, agent = asyncio.run(scenario())
+        self.assertEqual(first, again)
+        self.assertEqual(agent, ANSWER)
+        # Tool answered once; the agent prompt is a different template
+        self.assertEqual(len(llm.prompts), 2)
+
+    def test_failed_generations_not_cached(self):
+        llm = FakeLLM("not json")
+        service = GeneratorService(llm, GenerationCache())
+
+        async def scenario():
+            for _ in range(2):
+                with self.assertRaises(Exception):
+                    await service.generate_tool("web search")
+
+        asyncio.run(scenario())
+        # Each attempt is the generation plus one repair request
+        self.assertEqual(len(llm.prompts), 4)
+
+if __name__ == '__main__':
+    unittest.main()
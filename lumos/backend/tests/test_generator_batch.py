@@ -0,0 +1,123 @@
+import unittest
+import asyncio
+import json
+import time
+from unittest.mock import patch
+from httpx import AsyncClient, ASGITransport
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.main import app, generator_controller
+from app.services.generation_cache import GenerationCache
+from app.services.generator_service import GeneratorService
+
+class SlowLLM:
+    """
+    Answers after `delay` seconds with a JSON object (a valid tool and agent)
+    named after the prompt; "broken" prompts, and requests to fix an answer, get prose
+    """
+
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def chat(self, messages, model, temperature):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        content = messages[0]["content"]
+        prompt = content.rsplit("User:", 1)[-1].strip()
+        if "broken" in prompt or "Previous answer:" in content:
+            return "Sorry, no."
+        return json.dumps({"name": prompt, "description": prompt, "type": "Test", "subtype": "Test",
+                           "parameters": {}, "capabilities": [], "suggested_tools": {}})
+
+def collect(service, items, **kwargs):
+    async def run():
+        return [event async for event in service.generate_batch(items, **kwargs)]
+    return asyncio.run(run())
+
+class TestGenerateBatch(unittest.TestCase):
+    def test_fans_out_concurrently(self):
+        llm = SlowLLM(delay=0.1)
+        service = GeneratorService(llm, GenerationCache(threshold=0))
+        items = [{"kind": "agent", "user_prompt": f"agent number {i}"} for i in range(20)]
+        started = time.monotonic()
+        events = collect(service, items, concurrency=20)
+        self.assertLess(time.monotonic() - started, 0.5)
+        results = sorted(events[:-1], key=lambda event: event["index"])
+        self.assertEqual([event["agent"]["name"] for event in results], [item["user_prompt"] for item in items])
+        self.assertTrue(all(event["latency_ms"] >= 100 for event in results))
+        self.assertEqual(events[-1]["event"], "done")
+        self.assertEqual((events[-1]["items"], events[-1]["unique"], events[-1]["failed"]), (20, 20, 0))
+
+    def test_concurrency_bounded(self):
+        llm = SlowLLM(delay=0.02)
+        service = GeneratorService(llm, GenerationCache(threshold=0))
+        collect(service, [{"kind": "tool", "user_prompt": f"tool {i}"} for i in range(10)], concurrency=3)
+        self.assertEqual(llm.max_in_flight, 3)
+
+    def test_identical_prompts_generated_once(self):
+        llm = SlowLLM(delay=0.01)
+        service = GeneratorService(llm, GenerationCache(threshold=0))
+        items = [
+            {"kind": "tool", "user_prompt": "A web search tool", "id": "first"},
+            {"kind": "tool", "user_prompt": "a web search tool.", "id": "second"},
+            {"kind": "agent", "user_prompt": "a web search tool", "id": "third"},
+        ]
+        events = {event["id"]: event for event in collect(service, items) if event["event"] == "item"}
+        self.assertEqual(llm.calls, 2)
+        self.assertEqual(events["first"]["tool"], events["second"]["tool"])
+        self.assertEqual([events[key]["deduplicated"] for key in ("first", "second", "third")], [False, True, False])
+
+    def test_failures_reported_per_item(self):
+        service = GeneratorService(SlowLLM(delay=0), GenerationCache(threshold=0))
+        events = collect(service, [{"kind": "tool", "user_prompt": "fine"}, {"kind": "tool", "user_prompt": "broken"}])
+        statuses = {event["index"]: event["status"] for event in events if event["event"] == "item"}
+        self.assertEqual(statuses, {0: "success", 1: "error"})
+        self.assertEqual(events[-1]["failed"], 1)
+
+class TestBatchEndpoints(unittest.TestCase):
+    def setUp(self):
+        service = GeneratorService(SlowLLM(delay=0.01), GenerationCache(threshold=0))
+        self.patcher = patch.object(generator_controller, 'service', service)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    @staticmethod
+    def _post(path, payload):
+        async def _do():
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                return await client.post(path, json=payload)
+        return asyncio.run(_do())
+
+    def test_batch_results_in_input_order(self):
+        items = [{"kind": "tool", "user_prompt": f"tool {i}"} for i in range(5)]
+        response = self._post('/api/generate_batch', {"items": items})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual([result["index"] for result in body["results"]], list(range(5)))
+        self.assertEqual(body["results"][3]["tool"]["name"], "tool 3")
+        self.assertEqual(body["summary"]["unique"], 5)
+
+    def test_batch_stream(self):
+        response = self._post('/api/generate_batch/stream', {"items": [{"kind": "agent", "user_prompt": "x"}]})
+        self.assertTrue(response.headers['content-type'].startswith('text/event-stream'))
+        self.assertEqual([line for line in response.text.splitlines() if line.startswith("event:")],
+                         ["event: item", "event: done"])
+
+    def test_batch_limits(self):
+        self.assertEqual(self._post('/api/generate_batch', {"items": []}).status_code, 422)
+        self.assertEqual(self._post('/api/generate_batch', {"items": [{"kind": "task", "user_prompt": "x"}]}).status_code, 422)
+        too_many = [{"kind": "tool", "user_prompt": str(i)} for i in range(51)]
+        self.assertEqual(self._post('/api/generate_batch', {"items": too_many}).status_code, 422)
+
+if __name__ == '__main__':
+    unittest.main()
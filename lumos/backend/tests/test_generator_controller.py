@@ -28,4 +28,18 @@ class TestGeneratorController(unittest.TestCase):
         payload = {'user_prompt': 'create an agent'}
         response = self._post('/api/generate_agent', payload)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.json().get('agent'), {'id': 'agent1', 'name': 'Agent1'})
\ No newline at end of file
+        self.assertEqual(response.json().get('agent'), {'id': 'agent1', 'name': 'Agent1'})
+
+    @patch('app.controllers.generator_controller.GeneratorService.stream_tool')
+    def test_stream_tool(self, mock_stream):
+        async def events(user_prompt):
+            yield {"event": "partial", "tool": {"name": "To"}}
+            yield {"event": "done", "tool": {"name": "Tool1"}, "cached": False}
+        mock_stream.side_effect = events
+        response = self._post('/api/generate_tool/stream', {'user_prompt': 'create a tool'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers['content-type'].startswith('text/event-stream'))
+        self.assertEqual(response.text.split('\n\n')[:2], [
+            'event: partial\ndata: {"event": "partial", "tool": {"name": "To"}}',
+            'event: done\ndata: {"event": "done", "tool": {"name": "Tool1"}, "cached": false}',
+        ])
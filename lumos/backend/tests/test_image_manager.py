@@ -0,0 +1,126 @@
+import unittest
+import asyncio
+import tempfile
+from unittest.mock import patch
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.services.image_manager import ImageManager, content_hash, run_docker
+
+class FakeDocker:
+    def __init__(self, existing=(), fail=False):
+        self.images = set(existing)
+        self.fail = fail
+        self.calls = []
+
+    async def __call__(self, *args):
+        self.calls.append(args)
+        if args[0] == "image":
+            return (0 if args[2] in self.images else 1), ""
+        await asyncio.sleep(0.01)
+        if self.fail:
+            return 1, "pip failed"
+        self.images.add(args[2])
+        return 0, ""
+
+    @property
+    def builds(self):
+        return [call for call in self.calls if call[0] == "build"]
+
+class HangingProcess:
+    """A docker process that never finishes on its own."""
+    def __init__(self):
+        self.killed = asyncio.Event()
+        self.returncode = None
+
+    async def communicate(self):
+        await self.killed.wait()
+        return b"", None
+
+    def kill(self):
+        self.killed.set()
+
+    async def wait(self):
+        await self.killed.wait()
+        self.returncode = -9
+        return self.returncode
+
+class TestRunDocker(unittest.TestCase):
+    def test_cancelled_command_is_killed(self):
+        process = HangingProcess()
+
+        async def spawn(*args, **kwargs):
+            return process
+
+        async def run():
+            task = asyncio.create_task(run_docker("build", "-t", "ui:abc", "."))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with patch("app.services.image_manager.asyncio.create_subprocess_exec", spawn):
+            asyncio.run(run())
+        self.assertTrue(process.killed.is_set())
+        self.assertEqual(process.returncode, -9)
+
+class TestImageManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.context = self.tmp.name
+        self._write("Dockerfile", "FROM python:3.10-slim\n")
+        self._write("app.py", "print('hi')\n")
+        os.makedirs(os.path.join(self.context, "templates"))
+        self._write(os.path.join("templates", "index.html"), "<html></html>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, text):
+        with open(os.path.join(self.context, name), "w") as f:
+            f.write(text)
+
+    def test_concurrent_exports_share_one_build(self):
+        docker = FakeDocker()
+        manager = ImageManager(self.context, "ui", docker)
+
+        async def run():
+            return await asyncio.gather(*(manager.ensure_image() for _ in range(5)))
+
+        tags = asyncio.run(run())
+        self.assertEqual(len(set(tags)), 1)
+        self.assertEqual(len(docker.builds), 1)
+        asyncio.run(manager.ensure_image())
+        self.assertEqual(len(docker.calls), 2)  # one inspect, one build; later calls skip docker
+
+    def test_changed_sources_rebuild(self):
+        docker = FakeDocker()
+        manager = ImageManager(self.context, "ui", docker)
+        first = asyncio.run(manager.ensure_image())
+        self._write(os.path.join("templates", "index.html"), "<html>v2</html>")
+        second = asyncio.run(manager.ensure_image())
+        self.assertNotEqual(first, second)
+        self.assertEqual(len(docker.builds), 2)
+
+    def test_existing_image_is_reused(self):
+        tag = f"ui:{content_hash(self.context)[:16]}"
+        docker = FakeDocker(existing=[tag])
+        self.assertEqual(asyncio.run(ImageManager(self.context, "ui", docker).ensure_image()), tag)
+        self.assertEqual(docker.builds, [])
+
+    def test_failed_build_is_retried(self):
+        docker = FakeDocker(fail=True)
+        manager = ImageManager(self.context, "ui", docker)
+        with self.assertRaises(RuntimeError):
+            asyncio.run(manager.ensure_image())
+        docker.fail = False
+        asyncio.run(manager.ensure_image())
+        self.assertEqual(len(docker.builds), 2)
+
+    def test_hash_ignores_bytecode(self):
+        before = content_hash(self.context)
+        os.makedirs(os.path.join(self.context, "__pycache__"))
+        self._write(os.path.join("__pycache__", "app.cpython-310.pyc"), "x")
+        self.assertEqual(content_hash(self.context), before)
+
+if __name__ == '__main__':
+    unittest.main()
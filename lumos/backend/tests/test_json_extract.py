@@ -0,0 +1,109 @@
+import unittest
+import asyncio
+import json
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ui_app.json_extract import JSONExtractError, JSONExtractor, extract, extract_json
+from app.services.generation_cache import GenerationCache
+from app.services.generator_service import AGENT_PROMPT, GeneratorService
+
+TOOL = {"name": "Search", "description": "Finds pages", "type": "Information",
+        "subtype": "Search", "parameters": {"query": "(terms)"}}
+
+class ScriptedLLM:
+    """Gives the answers in order, one per call"""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.prompts = []
+
+    async def chat(self, messages, model, temperature):
+        self.prompts.append(messages[0]["content"])
+        return self.answers.pop(0)
+
+class TestExtract(unittest.TestCase):
+    def test_clean_json_not_repaired(self):
+        self.assertEqual(extract('```json\n{"a": [1, {"b": "}"}]}\n```'), ({"a": [1, {"b": "}"}]}, False))
+
+    def test_prose_around_json(self):
+        text = 'Sure! Here is the tool {as asked}:\n{"name": "x"}\nLet me know if {anything} else.'
+        self.assertEqual(extract_json(text), {"name": "x"})
+
+    def test_repairs(self):
+        text = '''{
+            name: 'It\\'s a tool', // a comment
+            "ok": True, "missing": None,
+            "list": [1, 2,],
+            /* block */ "multi": "line
+text",
+        }'''
+        self.assertEqual(extract(text), ({"name": "It's a tool", "ok": True, "missing": None,
+                                          "list": [1, 2], "multi": "line\ntext"}, True))
+
+    def test_strings_left_alone(self):
+        text = '{"url": "http://x/y", "note": "True, None, {a: b,}"}'
+        self.assertEqual(extract_json(text), {"url": "http://x/y", "note": "True, None, {a: b,}"})
+
+    def test_agent_example_in_prompt_parses(self):
+        # Trailing commas and an unquoted key, as the model is shown them
+        agent = extract_json(AGENT_PROMPT.format(user_prompt="x"))
+        self.assertEqual(agent["name"], "Documentation Writer")
+        self.assertIn("TextSummarizer", agent["suggested_tools"])
+
+    def test_nothing_usable(self):
+        for text in ("no json here", '{"name": "cut off', "{not: json: at all}"):
+            with self.assertRaises(JSONExtractError):
+                extract(text)
+
+    def test_incremental(self):
+        extractor = JSONExtractor()
+        pieces = ['Here: {"a": "{', '", "b": [1', ']}', ' trailing {"c": 1}']
+        self.assertEqual([extractor.feed(piece) for piece in pieces],
+                         [None, None, '{"a": "{", "b": [1]}', '{"a": "{", "b": [1]}'])
+
+    def test_expected_type(self):
+        text = 'Step [1]: {"name": "x"}'
+        self.assertEqual(extract_json(text), [1])
+        self.assertEqual(extract_json(text, expect=dict), {"name": "x"})
+        with self.assertRaises(JSONExtractError):
+            extract("Steps: [1, 2]", expect=dict)
+
+class TestGeneratorParsing(unittest.TestCase):
+    def test_defects_repaired_without_asking_again(self):
+        llm = ScriptedLLM('Here you go:\n```json\n{"name": "Search", "description": "Finds pages", '
+                          '"type": "Information", "subtype": "Search", parameters: {"query": "(terms)",},}\n```')
+        tool = asyncio.run(GeneratorService(llm, GenerationCache()).generate_tool("search"))
+        self.assertEqual(tool, TOOL)
+        self.assertEqual(len(llm.prompts), 1)
+
+    def test_leading_list_does_not_cost_a_repair(self):
+        llm = ScriptedLLM('Step [1]: ' + json.dumps(TOOL))
+        tool = asyncio.run(GeneratorService(llm, GenerationCache()).generate_tool("search"))
+        self.assertEqual(tool, TOOL)
+        self.assertEqual(len(llm.prompts), 1)
+
+    def test_invalid_answer_repaired_by_model(self):
+        llm = ScriptedLLM('{"name": "Search"}', json.dumps(TOOL))
+        tool = asyncio.run(GeneratorService(llm, GenerationCache()).generate_tool("search"))
+        self.assertEqual(tool, TOOL)
+        # The fix request names the problem and carries the bad answer, not the original prompt
+        self.assertIn("description", llm.prompts[1])
+        self.assertIn('{"name": "Search"}', llm.prompts[1])
+        self.assertNotIn("Example Tool", llm.prompts[1])
+
+    def test_stream_repaired_by_model(self):
+        class StreamingLLM(ScriptedLLM):
+            async def stream_chat(self, messages, model, temperature):
+                yield "Sorry, I can't"
+
+        llm = StreamingLLM(json.dumps(TOOL))
+
+        async def scenario():
+            return [event async for event in GeneratorService(llm, GenerationCache()).stream_tool("search")]
+
+        events = asyncio.run(scenario())
+        self.assertEqual(events[-1]["event"], "done")
+        self.assertEqual(events[-1]["tool"], TOOL)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+import unittest
+import asyncio
+import time
+import json
+from aiohttp import web
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.services.llm_client import LLMError, ProviderClient, close_http_client
+from app.services.generator_service import GeneratorService
+from app.services.generation_cache import GenerationCache
+from app.utils.network_utils import random_free_port
+
+FAST_BACKOFF = {"initial": 0.01, "maximum": 0.02}
+
+def completion(content):
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+class FakeCompletionServer:
+    """OpenAI-style /v1/chat/completions answering from a script of (status, delay) steps, then 200s"""
+
+    def __init__(self, script=(), content="hello", delay=0, token_delay=0, retry_after="0"):
+        self.script = list(script)
+        self.retry_after = retry_after
+        self.content = content
+        self.delay = delay
+        self.token_delay = token_delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle(self, request):
+        self.calls.append(await request.json())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            status, delay = self.script.pop(0) if self.script else (200, self.delay)
+            await asyncio.sleep(delay)
+            if status == 429:
+                return web.json_response({"error": "rate limited"}, status=429, headers={"Retry-After": self.retry_after})
+            if status != 200:
+                return web.json_response({"error": "boom"}, status=status)
+            if self.calls[-1].get("stream"):
+                return await self.stream(request)
+            return web.json_response(completion(self.content))
+        finally:
+            self.in_flight -= 1
+
+    async def stream(self, request):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for i in range(0, len(self.content), 4):
+            chunk = {"choices": [{"delta": {"content": self.content[i:i + 4]}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            await asyncio.sleep(self.token_delay)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        port = random_free_port()
+        await web.TCPSite(self.runner, "127.0.0.1", port).start()
+        self.url = f"http://127.0.0.1:{port}/v1"
+        return self
+
+    async def __aexit__(self, *exc):
+        await close_http_client()
+        await self.runner.cleanup()
+
+def client_for(server, **kwargs):
+    kwargs.setdefault("backoff", FAST_BACKOFF)
+    return ProviderClient("fake", server.url, "sk-test", **kwargs)
+
+class TestProviderClient(unittest.TestCase):
+    def test_completion(self):
+        async def scenario():
+            async with FakeCompletionServer(content="hi there") as server:
+                client = client_for(server)
+                reply = await client.chat([{"role": "user", "content": "hi"}], model="gpt-4o")
+                self.assertEqual(reply, "hi there")
+                self.assertEqual(server.calls[0]["messages"], [{"role": "user", "content": "hi"}])
+                self.assertEqual(server.calls[0]["temperature"], 0.0)
+
+        asyncio.run(scenario())
+
+    def test_retries_rate_limits_and_server_errors(self):
+        async def scenario():
+            async with FakeCompletionServer(script=[(429, 0), (503, 0)]) as server:
+                client = client_for(server)
+                self.assertEqual(await client.chat([]), "hello")
+                self.assertEqual(len(server.calls), 3)
+                self.assertEqual(client.stats()["retries"], 2)
+
+        asyncio.run(scenario())
+
+    def test_gives_up_after_max_retries(self):
+        async def scenario():
+            async with FakeCompletionServer(script=[(500, 0)] * 5) as server:
+                client = client_for(server, max_retries=2)
+                with self.assertRaises(LLMError) as ctx:
+                    await client.chat([])
+                self.assertEqual(ctx.exception.status, 500)
+                self.assertEqual(len(server.calls), 3)
+                self.assertEqual(client.stats()["failures"], 1)
+
+        asyncio.run(scenario())
+
+    def test_retry_after_capped_and_slot_released_while_waiting(self):
+        async def scenario():
+            async with FakeCompletionServer(script=[(429, 0)], retry_after="600") as server:
+                client = client_for(server, max_concurrency=1, backoff={"initial": 0.2, "maximum": 0.2})
+                started = time.monotonic()
+                finished = {}
+
+                async def call(name):
+                    self.assertEqual(await client.chat([]), "hello")
+                    finished[name] = time.monotonic() - started
+
+                first = asyncio.ensure_future(call("throttled"))
+                await asyncio.sleep(0.05)  # the 429 has come back and the first call is backing off
+                await call("other")
+                await first
+            return finished
+
+        finished = asyncio.run(scenario())
+        # The other call didn't wait out the backoff, and the backoff wasn't 600 s
+        self.assertLess(finished["other"], 0.15)
+        self.assertLess(finished["throttled"], 1)
+
+    def test_client_errors_not_retried(self):
+        async def scenario():
+            async with FakeCompletionServer(script=[(400, 0)]) as server:
+                with self.assertRaises(LLMError):
+                    await client_for(server).chat([])
+                self.assertEqual(len(server.calls), 1)
+
+        asyncio.run(scenario())
+
+    def test_timeouts_retried(self):
+        async def scenario():
+            async with FakeCompletionServer(script=[(200, 1)]) as server:
+                client = client_for(server, timeout=0.2)
+                self.assertEqual(await client.chat([]), "hello")
+                self.assertEqual(client.stats()["retries"], 1)
+
+        asyncio.run(scenario())
+
+    def test_concurrency_limited(self):
+        async def scenario():
+            async with FakeCompletionServer(delay=0.05) as server:
+                client = client_for(server, max_concurrency=3)
+                replies = await asyncio.gather(*(client.chat([]) for _ in range(10)))
+                self.assertEqual(replies, ["hello"] * 10)
+                self.assertEqual(server.max_in_flight, 3)
+
+        asyncio.run(scenario())
+
+    def test_stream(self):
+        async def scenario():
+            async with FakeCompletionServer(script=[(429, 0)], content="hello streaming world") as server:
+                client = client_for(server)
+                pieces = [piece async for piece in client.stream_chat([])]
+                self.assertEqual("".join(pieces), "hello streaming world")
+                self.assertGreater(len(pieces), 1)
+                self.assertTrue(server.calls[-1]["stream"])
+                self.assertEqual(client.stats()["retries"], 1)
+
+        asyncio.run(scenario())
+
+TOOL_JSON = '```json\n{"name": "Search", "description": "Finds pages on the web", "type": "Information", "subtype": "Search", "parameters": {"query": "(terms)"}}\n```'
+
+class TestGeneratorService(unittest.TestCase):
+    def test_generate_tool_parses_fenced_json(self):
+        async def scenario():
+            content = '```json\n{"name": "Search", "description": "d", "type": "t", "subtype": "s", "parameters": {}}\n```'
+            async with FakeCompletionServer(content=content) as server:
+                service = GeneratorService(client_for(server), GenerationCache())
+                tool = await service.generate_tool("a search tool")
+                self.assertEqual(tool["name"], "Search")
+                self.assertIn("a search tool", server.calls[0]["messages"][0]["content"])
+
+        asyncio.run(scenario())
+
+    def test_stream_tool_shows_fields_before_completion(self):
+        async def scenario():
+            async with FakeCompletionServer(content=TOOL_JSON, token_delay=0.01) as server:
+                service = GeneratorService(client_for(server), GenerationCache())
+                events = [event async for event in service.stream_tool("a search tool")]
+                again = [event async for event in service.stream_tool("a search tool")]
+            return events, again
+
+        events, again = asyncio.run(scenario())
+        kinds = [event["event"] for event in events]
+        self.assertEqual(kinds[-1], "done")
+        first_named = next(i for i, event in enumerate(events)
+                           if event["event"] == "partial" and event["tool"].get("name") == "Search")
+        self.assertLess(first_named, kinds.index("done") - 10)
+        done = events[-1]
+        self.assertEqual(done["tool"]["description"], "Finds pages on the web")
+        self.assertLess(done["first_content_ms"], done["total_ms"] / 2)
+        self.assertEqual("".join(event["text"] for event in events if event["event"] == "token"), TOOL_JSON)
+        # A repeat is answered from the cache in one event
+        self.assertEqual([(event["event"], event["cached"]) for event in again], [("done", True)])
+
+    def test_stream_error(self):
+        async def scenario():
+            async with FakeCompletionServer(script=[(400, 0)]) as server:
+                service = GeneratorService(client_for(server), GenerationCache())
+                return [event async for event in service.stream_agent("anything")]
+
+        events = asyncio.run(scenario())
+        self.assertEqual([event["event"] for event in events], ["error"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import json
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.utils.partial_json import parse_partial
+
+AGENT = {
+    "name": "Doc \"Writer\"",
+    "description": "Writes docs, then checks them",
+    "capabilities": ["contentGeneration", "formatting"],
+    "temperature": 0.25,
+    "active": True,
+    "suggested_tools": {"Grammar": "Checks grammar", "Exporter": None},
+}
+
+class TestParsePartial(unittest.TestCase):
+    def test_every_prefix_parses_to_a_prefix_of_the_result(self):
+        text = "```json\n" + json.dumps(AGENT, indent=2) + "\n```"
+        previous = None
+        for end in range(len(text) + 1):
+            partial = parse_partial(text[:end])
+            if partial is None:
+                self.assertIsNone(previous)
+                continue
+            self.assertIsInstance(partial, dict)
+            for key, value in partial.items():
+                self.assertIn(key, AGENT)
+                if isinstance(value, str):
+                    self.assertTrue(AGENT[key].startswith(value), (key, value))
+            previous = partial
+        self.assertEqual(previous, AGENT)
+
+    def test_open_string_value_shown(self):
+        self.assertEqual(parse_partial('{"name": "Web Se'), {"name": "Web Se"})
+
+    def test_key_without_value_left_out(self):
+        self.assertEqual(parse_partial('{"name": "Web", "descr'), {"name": "Web"})
+        self.assertEqual(parse_partial('{"name": "Web", "description":'), {"name": "Web"})
+
+    def test_incomplete_literal_and_escape(self):
+        self.assertEqual(parse_partial('{"a": 1, "b": tru'), {"a": 1})
+        self.assertEqual(parse_partial('{"a": "caf\\u00'), {"a": "caf"})
+
+    def test_nested_containers_closed(self):
+        self.assertEqual(parse_partial('{"tools": [{"name": "x"}, {"na'), {"tools": [{"name": "x"}, {}]})
+
+    def test_text_after_the_value_ignored(self):
+        self.assertEqual(parse_partial('{"a": 1}\n```\nHope this helps! {'), {"a": 1})
+
+    def test_nothing_yet(self):
+        self.assertIsNone(parse_partial(""))
+        self.assertIsNone(parse_partial("```json\n"))
+
+if __name__ == '__main__':
+    unittest.main()
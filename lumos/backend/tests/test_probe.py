@@ -0,0 +1,138 @@
+import unittest
+import asyncio
+from aiohttp import web
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.utils.network_utils import random_free_port
+from app.utils.probe import (TunnelCache, backoff_delays, close_session, http_check, tcp_check,
+                             wait_for_http, wait_until)
+
+async def start_server(app):
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = random_free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner, f"http://127.0.0.1:{port}"
+
+async def healthy(request):
+    return web.json_response({"status": "ok"})
+
+async def no_tunnels(request):
+    return web.json_response({"tunnels": []})
+
+class TestBackoff(unittest.TestCase):
+    def test_delays_grow_to_cap_with_jitter(self):
+        delays = backoff_delays(initial=0.1, maximum=0.4, jitter=0.5)
+        bounds = [0.1, 0.2, 0.4, 0.4]
+        for bound in bounds:
+            delay = next(delays)
+            self.assertTrue(bound / 2 <= delay <= bound, (bound, delay))
+
+    def test_wait_until_returns_first_truthy_result(self):
+        calls = []
+
+        async def check():
+            calls.append(1)
+            return "ready" if len(calls) == 3 else None
+
+        result = asyncio.run(wait_until(check, 1, initial=0.001))
+        self.assertEqual((result, len(calls)), ("ready", 3))
+
+    def test_wait_until_times_out(self):
+        async def never():
+            return False
+
+        with self.assertRaises(TimeoutError):
+            asyncio.run(wait_until(never, 0.05, initial=0.01))
+
+class TestChecks(unittest.TestCase):
+    def test_tcp_and_http_checks(self):
+        async def scenario():
+            app = web.Application()
+            app.router.add_get("/healthz", healthy)
+            runner, url = await start_server(app)
+            port = int(url.rsplit(":", 1)[1])
+            try:
+                self.assertTrue(await tcp_check("127.0.0.1", port))
+                self.assertTrue(await http_check(f"{url}/healthz"))
+                self.assertFalse(await http_check(f"{url}/missing"))
+                await wait_for_http(f"{url}/healthz", 1)
+            finally:
+                await runner.cleanup()
+            self.assertFalse(await tcp_check("127.0.0.1", port))
+            with self.assertRaises(TimeoutError):
+                await wait_for_http(f"{url}/healthz", 0.1)
+            await close_session()
+
+        asyncio.run(scenario())
+
+    def test_waits_for_server_to_come_up(self):
+        async def scenario():
+            app = web.Application()
+            app.router.add_get("/healthz", healthy)
+            port = random_free_port()
+            runner = web.AppRunner(app)
+
+            async def start_later():
+                await asyncio.sleep(0.2)
+                await runner.setup()
+                await web.TCPSite(runner, "127.0.0.1", port).start()
+
+            starter = asyncio.ensure_future(start_later())
+            try:
+                await wait_for_http(f"http://127.0.0.1:{port}/healthz", 5)
+            finally:
+                await starter
+                await runner.cleanup()
+                await close_session()
+
+        asyncio.run(scenario())
+
+class TestTunnelCache(unittest.TestCase):
+    def test_url_cached_until_invalidated(self):
+        async def scenario():
+            requests = []
+
+            async def tunnels(request):
+                requests.append(1)
+                return web.json_response({"tunnels": [
+                    {"public_url": f"http://tunnel{len(requests)}.example"},
+                    {"public_url": f"https://tunnel{len(requests)}.example"},
+                ]})
+
+            app = web.Application()
+            app.router.add_get("/api/tunnels", tunnels)
+            runner, url = await start_server(app)
+            try:
+                cache = TunnelCache(f"{url}/api/tunnels", timeout=1)
+                first = await asyncio.gather(cache.get(), cache.get(), cache.get())
+                self.assertEqual(first, ["https://tunnel1.example"] * 3)
+                self.assertEqual(len(requests), 1)
+                cache.invalidate()
+                self.assertEqual(await cache.get(), "https://tunnel2.example")
+                self.assertEqual(cache.stats()["refreshes"], 2)
+                # A restarted ngrok is picked up once the URL has aged out
+                cache.ttl = 0
+                self.assertEqual(await cache.get(), "https://tunnel3.example")
+            finally:
+                await runner.cleanup()
+                await close_session()
+
+        asyncio.run(scenario())
+
+    def test_missing_tunnel(self):
+        async def scenario():
+            app = web.Application()
+            app.router.add_get("/api/tunnels", no_tunnels)
+            runner, url = await start_server(app)
+            try:
+                with self.assertRaises(RuntimeError):
+                    await TunnelCache(f"{url}/api/tunnels", timeout=0.1).get()
+            finally:
+                await runner.cleanup()
+                await close_session()
+
+        asyncio.run(scenario())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+import asyncio
+import tempfile
+import sqlite3
+from httpx import AsyncClient, ASGITransport
+from unittest.mock import patch
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.main import app
+from app.models import project_cache
+from app.models.project_cache import LocalCache, NullCache, ProjectCache, create_project_cache, etag_matches
+from app.models.project_model import ProjectModel
+from app.models.sqlite_storage_strategy import SQLiteProjectStorage
+from app.models.async_storage_strategy import make_async_storage
+
+class TestLocalCache(unittest.TestCase):
+    def test_lru_eviction_by_count(self):
+        cache = LocalCache(max_entries=2, max_bytes=1000, ttl=60)
+        cache.set("a", b"1")
+        cache.set("b", b"2")
+        cache.get("a")  # b is now least recently used
+        cache.set("c", b"3")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"1")
+        self.assertEqual(cache.evictions, 1)
+
+    def test_eviction_by_size(self):
+        cache = LocalCache(max_entries=10, max_bytes=10, ttl=60)
+        cache.set("a", b"x" * 6)
+        cache.set("b", b"y" * 6)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["bytes"], 6)
+        cache.set("huge", b"z" * 11)  # larger than the whole cache; not stored
+        self.assertIsNone(cache.get("huge"))
+
+    def test_ttl(self):
+        cache = LocalCache(ttl=60)
+        cache.set("a", b"1", ttl=-1)
+        self.assertIsNone(cache.get("a"))
+
+class TestProjectCache(unittest.TestCase):
+    def test_invalidate_drops_project_and_pages(self):
+        cache = ProjectCache(LocalCache())
+        generation = cache.generation()
+        cache.put_project(1, {"status": "success", "project": {"project": {"revision": 2}}}, generation)
+        cache.put_page({"limit": 10}, {"projects": []}, generation)
+        self.assertIn(".r2.", cache.get_project(1)["etag"])
+        self.assertEqual(cache.get_page({"limit": 10}), {"projects": []})
+        cache.invalidate(1)
+        self.assertIsNone(cache.get_project(1))
+        self.assertIsNone(cache.get_page({"limit": 10}))
+
+    def test_stale_load_is_not_cached(self):
+        cache = ProjectCache(LocalCache())
+        generation = cache.generation()
+        cache.invalidate(1)  # a save lands while the read is in flight
+        entry = cache.put_project(1, {"status": "success"}, generation)
+        self.assertEqual(entry["body"], b'{"status":"success"}')
+        self.assertIsNone(cache.get_project(1))
+
+    def test_backend_selection(self):
+        self.assertIsInstance(create_project_cache("none").backend, NullCache)
+        with patch.object(project_cache, "redis", None):
+            self.assertIsInstance(create_project_cache("redis").backend, LocalCache)
+        with self.assertRaises(ValueError):
+            create_project_cache("memcached")
+
+    def test_etag_matches(self):
+        self.assertTrue(etag_matches('"a", "b"', '"b"'))
+        self.assertTrue(etag_matches('W/"b"', '"b"'))
+        self.assertTrue(etag_matches('*', '"b"'))
+        self.assertFalse(etag_matches(None, '"b"'))
+
+class TestCachedProjectRoutes(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.model = ProjectModel(SQLiteProjectStorage(os.path.join(self.tmp.name, "lumos.db")))
+        self.cache = ProjectCache(LocalCache())
+        self.model.add_write_listener(self.cache.invalidate)
+        self.patcher = patch.multiple('app.controllers.export_controller.service', model=self.model,
+                                      storage=make_async_storage(self.model, mode="sync"), cache=self.cache)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp.cleanup()
+
+    @staticmethod
+    def _request(method, path, payload=None, headers=None):
+        async def _do():
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                return await client.request(method, path, json=payload, headers=headers)
+        return asyncio.run(_do())
+
+    def _save(self, **project):
+        payload = {"project": {"name": "cached", "version": "1.0", "description": "", **project},
+                   "agents": [{"id": "agent-a", "name": "A", "description": "", "type": "AI"}]}
+        return self._request("POST", "/api/save", payload).json()
+
+    def test_etag_and_invalidation(self):
+        project_id = self._save()["project_id"]
+        first = self._request("GET", f"/api/projects/{project_id}")
+        etag = first.headers["etag"]
+        self.assertEqual(first.json()["project"]["project"]["name"], "cached")
+
+        not_modified = self._request("GET", f"/api/projects/{project_id}", headers={"If-None-Match": etag})
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(self.cache.hits, 1)
+
+        self._save(id=project_id, revision=1, description="edited")
+        changed = self._request("GET", f"/api/projects/{project_id}", headers={"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()["project"]["project"]["description"], "edited")
+        self.assertNotEqual(changed.headers["etag"], etag)
+
+    def test_listing_is_cached_until_a_save(self):
+        self._save()
+        self.assertEqual(len(self._request("GET", "/api/projects").json()["projects"]), 1)
+        self._request("GET", "/api/projects")
+        self.assertEqual(self.cache.hits, 1)
+        self._save()
+        self.assertEqual(len(self._request("GET", "/api/projects").json()["projects"]), 2)
+
+    def test_listing_errors_are_not_cached(self):
+        self._save()
+        outage = sqlite3.OperationalError("database is locked")
+        with patch.object(self.model.strategy.db, "get_connection", side_effect=outage):
+            failed = self._request("GET", "/api/projects").json()
+        self.assertEqual(failed["status"], "error")
+        self.assertEqual(len(self._request("GET", "/api/projects").json()["projects"]), 1)
+        self.assertEqual(self.cache.hits, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.models.project_diff import connection_numeric_ids, diff_rows, diff_summary, stable_id, tool_numeric_id, tool_numeric_ids
+
+class TestProjectDiff(unittest.TestCase):
+    def test_diff_rows(self):
+        stored = {"a": ("A", ""), "b": ("B", ""), "c": ("C", None)}
+        incoming = {"a": ("A", ""), "b": ("B2", ""), "c": ("C", ""), "d": ("D", "")}
+        diff = diff_rows(stored, incoming)
+        self.assertEqual(diff.added, [("d", ("D", ""))])
+        self.assertEqual(diff.changed, [("b", ("B2", ""))])  # NULL and '' compare equal
+        self.assertEqual(diff_rows(incoming, {}).removed, ["a", "b", "c", "d"])
+
+    def test_summary(self):
+        summary = diff_summary({"agents": diff_rows({"x": (1,)}, {"y": (1,)})})
+        self.assertEqual(summary, {"agents": {"added": 1, "changed": 0, "removed": 1}})
+
+    def test_ids_are_stable(self):
+        # crc32 rather than hash(), which changes with PYTHONHASHSEED
+        self.assertEqual(stable_id("conn-1"), 202820)
+        self.assertEqual(tool_numeric_id("tool-7"), 7)
+        self.assertTrue(20000 <= tool_numeric_id("search") < 30000)
+        self.assertEqual(tool_numeric_id(None), 20000)
+
+    def test_tool_fallback_ids_do_not_collide(self):
+        tools = [{"id": "tool-abc"}, {"id": "tool-xyz"}, {"id": "search"}, {"id": "tool-1712345678901"}]
+        ids = tool_numeric_ids(tools)
+        self.assertEqual(len(set(ids)), 4)
+        self.assertEqual(ids[3], 1712345678901)
+        # A fallback landing on an explicit id moves, the explicit id doesn't
+        taken = tool_numeric_id("search")
+        self.assertEqual(tool_numeric_ids([{"id": "search"}, {"id": f"tool-{taken}"}]), [taken + 1, taken])
+        # Repeats keep the same number so the save can reject them
+        self.assertEqual(tool_numeric_ids([{"id": "tool-abc"}, {"id": "tool-abc"}])[0],
+                         tool_numeric_ids([{"id": "tool-abc"}])[0])
+
+    def test_connection_collisions_are_bumped(self):
+        ids = connection_numeric_ids([{"id": "same"}, {"id": "same"}])
+        self.assertEqual(ids[1], ids[0] + 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import re
+import sqlite3
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.models.project_hydrator import ProjectHydrator
+
+class FakeCursor:
+    """Answers each query with the canned rows of the first table in its FROM clause."""
+    def __init__(self, tables):
+        self.tables = tables
+        self.queries = []
+        self._rows = []
+
+    def execute(self, query, params=()):
+        self.queries.append(query)
+        table = re.search(r"FROM\s+(\w+)", query).group(1)
+        if isinstance(self.tables.get(table), Exception):
+            raise self.tables[table]
+        self._rows = self.tables.get(table, [])
+
+    def fetchall(self):
+        return list(self._rows)
+
+def make_tables(n_agents):
+    agents = [{"id": i + 1, "project_id": 7, "agent_id": f"agent-{i}", "name": f"Agent {i}",
+               "description": "", "type": "AI", "subtype": "LLM"} for i in range(n_agents)]
+    return {
+        "projects": [{"id": 7, "name": "p", "version": "1.0", "description": "d", "created_at": None,
+                      "revision": 1}],
+        "agents": agents,
+        "agent_models": [{"agent_id": 1, "name": "gpt-4o", "version": "latest", "provider": "openai",
+                          "parameters": "{'temperature': 0.2}"}],
+        "agent_capabilities": [{"agent_id": a["id"], "capability": "planning"} for a in agents],
+        "agent_tools": [{"agent_id": 1, "name": "Search", "description": "", "type": "Information",
+                         "subtype": "", "parameters": "{}"}],
+        "tools": [{"id": 1, "project_id": 7, "name": "Search", "description": "", "type": "Information"}],
+        "connections": [{"id": 5, "project_id": 7, "source": "agent-0", "target": "tool-1", "label": ""}],
+        "interactions": [{"id": 3, "interaction_id": "i-1", "type": "AgentAgent", "subtype": "", "pattern": "",
+                          "protocol_type": "DirectedMessaging", "protocol_message_types": "['task']"}],
+        "interaction_participants": [{"interaction_id": 3, "agent_id": "agent-0"},
+                                     {"interaction_id": 3, "agent_id": "agent-1"}],
+    }
+
+class TestProjectHydrator(unittest.TestCase):
+    def test_query_count_is_independent_of_agent_count(self):
+        small, large = FakeCursor(make_tables(2)), FakeCursor(make_tables(500))
+        ProjectHydrator(small).load(7)
+        ProjectHydrator(large).load(7)
+        self.assertEqual(len(small.queries), len(large.queries))
+
+    def test_assembles_nested_agent_data(self):
+        project = ProjectHydrator(FakeCursor(make_tables(3))).load(7)
+        first = project["agents"][0]
+        self.assertEqual(first["model"]["parameters"], {"temperature": 0.2})
+        self.assertEqual(first["capabilities"], ["planning"])
+        self.assertEqual(first["tools"][0]["name"], "Search")
+        self.assertIsNone(project["agents"][1]["model"])
+        self.assertIn("position", first)
+
+    def test_response_shape(self):
+        project = ProjectHydrator(FakeCursor(make_tables(2))).load(7)
+        self.assertEqual(set(project), {"project", "agents", "tools", "interactions", "connections"})
+        self.assertEqual(project["project"]["id"], 7)
+        stored, from_connection = project["interactions"]
+        self.assertEqual(stored["participants"], ["agent-0", "agent-1"])
+        self.assertEqual(stored["protocol"], {"type": "DirectedMessaging", "messageTypes": ["task"]})
+        self.assertEqual(from_connection["id"], "interaction-agent-0-tool-1")
+
+    def test_missing_project_returns_none(self):
+        tables = make_tables(1)
+        tables["projects"] = []
+        self.assertIsNone(ProjectHydrator(FakeCursor(tables)).load(7))
+
+    def test_placeholder_is_rewritten(self):
+        cursor = FakeCursor(make_tables(1))
+        ProjectHydrator(cursor, placeholder="?").load(7)
+        self.assertTrue(all("%s" not in q and "?" in q for q in cursor.queries))
+
+    def test_missing_optional_table_yields_empty_list(self):
+        tables = make_tables(1)
+        tables["tools"] = sqlite3.OperationalError("no such table: tools")
+        project = ProjectHydrator(FakeCursor(tables)).load(7)
+        self.assertEqual(project["tools"], [])
+
+    def test_other_errors_on_optional_tables_propagate(self):
+        tables = make_tables(1)
+        tables["connections"] = sqlite3.OperationalError("database is locked")
+        with self.assertRaises(sqlite3.OperationalError):
+            ProjectHydrator(FakeCursor(tables)).load(7)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import patch, AsyncMock
+import asyncio
+import sqlite3
+from httpx import AsyncClient, ASGITransport
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.main import app
+from app.models.project_listing import (
+    build_list_query, build_page, decode_cursor, encode_cursor, parse_fields
+)
+
+class TestProjectListing(unittest.TestCase):
+    def setUp(self):
+        self.db = sqlite3.connect(":memory:")
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY, name TEXT, version TEXT, "
+                        "description TEXT, created_at TEXT)")
+        # Several projects share a timestamp to exercise the id tie-breaker
+        rows = [(i, f"proj_{i}" if i % 2 else f"other-{i}", "1.0" if i % 3 else "2.0", "",
+                 f"2025-01-0{1 + i // 4} 10:00:00") for i in range(1, 21)]
+        self.db.executemany("INSERT INTO projects VALUES (?, ?, ?, ?, ?)", rows)
+
+    def _page(self, limit, after=None, **filters):
+        query, params = build_list_query(limit, after, placeholder="?", **filters)
+        rows = [dict(r) for r in self.db.execute(query, params).fetchall()]
+        return build_page(rows, limit, filters.get("fields", ("id", "name", "version", "description", "created_at")))
+
+    def test_pages_cover_every_row_once_in_order(self):
+        seen, after = [], None
+        while True:
+            projects, next_cursor = self._page(3, after)
+            seen.extend(p["id"] for p in projects)
+            if not next_cursor:
+                break
+            after = decode_cursor(next_cursor)
+        self.assertEqual(seen, list(range(20, 0, -1)))
+
+    def test_filters(self):
+        projects, _ = self._page(50, name="proj_1")
+        self.assertEqual(sorted(p["id"] for p in projects), [1, 11, 13, 15, 17, 19])
+        projects, _ = self._page(50, version="2.0")
+        self.assertEqual(sorted(p["id"] for p in projects), [3, 6, 9, 12, 15, 18])
+
+    def test_like_wildcards_are_literal(self):
+        # "_" must not match the "-" in "other-N"
+        projects, _ = self._page(50, name="other_")
+        self.assertEqual(projects, [])
+
+    def test_field_projection(self):
+        projects, _ = self._page(2, fields=("name",))
+        self.assertEqual(set(projects[0]), {"name"})
+
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor({"created_at": "2025-01-01 10:00:00", "id": 4})
+        self.assertEqual(decode_cursor(cursor), ("2025-01-01 10:00:00", 4))
+        with self.assertRaises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    def test_parse_fields(self):
+        self.assertEqual(parse_fields("name, id,name"), ("name", "id"))
+        with self.assertRaises(ValueError):
+            parse_fields("name,password")
+
+class TestProjectListEndpoint(unittest.TestCase):
+    @staticmethod
+    def _get(path):
+        async def _do():
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                return await client.get(path)
+        return asyncio.run(_do())
+
+    @patch('app.controllers.export_controller.service')
+    def test_passes_page_through(self, mock_service):
+        mock_service.get_all_projects_async = AsyncMock(
+            return_value={"status": "success", "projects": [{"id": 1}], "next_cursor": "abc"})
+        response = self._get("/api/projects?limit=1&name=demo&fields=id")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["next_cursor"], "abc")
+        kwargs = mock_service.get_all_projects_async.call_args.kwargs
+        self.assertEqual((kwargs["limit"], kwargs["name"], kwargs["fields"]), (1, "demo", ("id",)))
+
+    @patch('app.controllers.export_controller.service')
+    def test_rejects_bad_cursor(self, mock_service):
+        response = self._get("/api/projects?cursor=garbage")
+        self.assertEqual(response.status_code, 400)
+        mock_service.get_all_projects_async.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,267 @@
+import unittest
+import asyncio
+import json
+import tempfile
+import aiohttp
+from aiohttp import web
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import proxy
+from app.services.route_map import RouteRegistry, RouteTable
+from app.utils.network_utils import random_free_port
+
+async def start_server(app):
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = random_free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner, f"http://127.0.0.1:{port}"
+
+async def echo(request):
+    body = await request.read()
+    return web.json_response({
+        "method": request.method,
+        "path": request.raw_path,
+        "body": body.decode(),
+        "headers": dict(request.headers),
+    }, headers={"Keep-Alive": "timeout=5", "X-Upstream": "yes"})
+
+async def chunks(request):
+    response = web.StreamResponse()
+    await response.prepare(request)
+    for i in range(3):
+        await response.write(f"chunk{i}\n".encode())
+        await asyncio.sleep(0.05)
+    await response.write_eof()
+    return response
+
+async def cookies(request):
+    response = web.Response(text="ok")
+    response.headers.add("Set-Cookie", "session=abc; Path=/")
+    response.headers.add("Set-Cookie", "theme=dark; Path=/")
+    return response
+
+async def slow(request):
+    await asyncio.sleep(1)
+    return web.Response(text="late")
+
+LARGE_MB = 128
+
+class RecordingToucher:
+    def __init__(self):
+        self.clients = []
+
+    def __call__(self, session, client):
+        self.clients.append(client)
+
+class TestProxy(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.routes_path = os.path.join(self.tmp.name, "route_map.json")
+        self.registry = RouteRegistry(self.routes_path)
+        self.toucher = RecordingToucher()
+        self.written = 0
+        self.release = None
+
+    async def events(self, request):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await response.write(b"data: first\n\n")
+        await self.release.wait()
+        await response.write(b"data: second\n\n")
+        await response.write_eof()
+        return response
+
+    async def large(self, request):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        chunk = b"x" * (1024 * 1024)
+        for _ in range(LARGE_MB):
+            await response.write(chunk)
+            self.written += len(chunk)
+        await response.write_eof()
+        return response
+
+    async def websocket(self, request):
+        ws = web.WebSocketResponse(protocols=["lumos"])
+        await ws.prepare(request)
+        async for message in ws:
+            if message.type == aiohttp.WSMsgType.TEXT and message.data == "bye":
+                await ws.close(code=4000)
+            elif message.type == aiohttp.WSMsgType.TEXT:
+                await ws.send_str(f"echo {message.data}")
+            elif message.type == aiohttp.WSMsgType.BINARY:
+                await ws.send_bytes(message.data[::-1])
+        return ws
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self, scenario, **proxy_options):
+        async def main():
+            upstream = web.Application()
+            upstream.router.add_get("/chunks", chunks)
+            upstream.router.add_get("/slow", slow)
+            upstream.router.add_get("/cookies", cookies)
+            upstream.router.add_get("/events", self.events)
+            upstream.router.add_get("/large", self.large)
+            upstream.router.add_get("/ws", self.websocket)
+            upstream.router.add_route("*", "/{tail:.*}", echo)
+            upstream_runner, upstream_url = await start_server(upstream)
+            proxy_app = proxy.create_app(RouteTable(self.routes_path), toucher=self.toucher, **proxy_options)
+            proxy_runner, proxy_url = await start_server(proxy_app)
+            try:
+                async with aiohttp.ClientSession() as session:
+                    await scenario(session, proxy_url, upstream_url)
+            finally:
+                await proxy_runner.cleanup()
+                await upstream_runner.cleanup()
+
+        asyncio.run(main())
+
+    def test_forwards_method_path_query_and_body(self):
+        async def scenario(session, proxy_url, upstream_url):
+            self.registry.add("ui_a", upstream_url)
+            async with session.post(f"{proxy_url}/ui_a/api/x%20y?q=1&r=2", data="hello",
+                                    headers={"Connection": "keep-alive, X-Private", "X-Private": "1"}) as resp:
+                self.assertEqual(resp.status, 200)
+                self.assertEqual(resp.headers["X-Upstream"], "yes")
+                self.assertNotIn("Keep-Alive", resp.headers)
+                seen = await resp.json()
+            self.assertEqual(seen["method"], "POST")
+            self.assertEqual(seen["path"], "/api/x%20y?q=1&r=2")
+            self.assertEqual(seen["body"], "hello")
+            self.assertNotIn("X-Private", seen["headers"])
+            self.assertIn("X-Forwarded-For", seen["headers"])
+            async with session.get(f"{proxy_url}/ui_a") as resp:
+                self.assertEqual((await resp.json())["path"], "/")
+            self.assertEqual(self.toucher.clients, ["ui_a", "ui_a"])
+
+        self._run(scenario)
+
+    def test_repeated_response_headers_kept(self):
+        async def scenario(session, proxy_url, upstream_url):
+            self.registry.add("ui_a", upstream_url)
+            async with session.get(f"{proxy_url}/ui_a/cookies") as resp:
+                self.assertEqual(resp.headers.getall("Set-Cookie"),
+                                 ["session=abc; Path=/", "theme=dark; Path=/"])
+
+        self._run(scenario)
+
+    def test_routes_hot_reloaded(self):
+        async def scenario(session, proxy_url, upstream_url):
+            async with session.get(f"{proxy_url}/ui_b/") as resp:
+                self.assertEqual(resp.status, 404)
+            self.registry.add("ui_b", upstream_url)
+            async with session.get(f"{proxy_url}/ui_b/") as resp:
+                self.assertEqual(resp.status, 200)
+
+        self._run(scenario)
+
+    def test_response_streamed(self):
+        async def scenario(session, proxy_url, upstream_url):
+            self.registry.add("ui_a", upstream_url)
+            async with session.get(f"{proxy_url}/ui_a/chunks") as resp:
+                first = await resp.content.readline()
+                self.assertEqual(first, b"chunk0\n")
+                self.assertEqual(await resp.content.read(), b"chunk1\nchunk2\n")
+
+        self._run(scenario)
+
+    def test_sse_events_relayed_as_they_happen(self):
+        async def scenario(session, proxy_url, upstream_url):
+            self.registry.add("ui_a", upstream_url)
+            self.release = asyncio.Event()
+            async with session.get(f"{proxy_url}/ui_a/events") as resp:
+                self.assertEqual(resp.headers["Content-Type"], "text/event-stream")
+                # Arrives while the upstream is still holding back the second event
+                self.assertEqual(await asyncio.wait_for(resp.content.readuntil(b"\n\n"), 2), b"data: first\n\n")
+                self.release.set()
+                self.assertEqual(await resp.content.read(), b"data: second\n\n")
+
+        self._run(scenario)
+
+    def test_slow_client_pauses_upstream(self):
+        async def scenario(session, proxy_url, upstream_url):
+            self.registry.add("ui_a", upstream_url)
+            async with session.get(f"{proxy_url}/ui_a/large", read_bufsize=64 * 1024) as resp:
+                received = len(await resp.content.readexactly(64 * 1024))
+                await asyncio.sleep(0.5)
+                # Only socket buffers' worth is in flight, not the whole body
+                self.assertLess(self.written, LARGE_MB * 1024 * 1024 / 4)
+                async for chunk in resp.content.iter_any():
+                    received += len(chunk)
+            self.assertEqual(received, LARGE_MB * 1024 * 1024)
+
+        self._run(scenario)
+
+    def test_websocket_relayed(self):
+        async def scenario(session, proxy_url, upstream_url):
+            self.registry.add("ui_a", upstream_url)
+            async with session.ws_connect(f"{proxy_url}/ui_a/ws", protocols=["lumos"]) as ws:
+                self.assertEqual(ws.protocol, "lumos")
+                await ws.send_str("hi")
+                self.assertEqual(await ws.receive_str(), "echo hi")
+                await ws.send_bytes(b"abc")
+                self.assertEqual(await ws.receive_bytes(), b"cba")
+                await ws.send_str("bye")
+                message = await ws.receive()
+                self.assertEqual(message.type, aiohttp.WSMsgType.CLOSE)
+                self.assertEqual(message.data, 4000)
+
+        self._run(scenario)
+
+    def test_upstream_down(self):
+        async def scenario(session, proxy_url, upstream_url):
+            self.registry.add("ui_dead", f"http://127.0.0.1:{random_free_port()}")
+            async with session.get(f"{proxy_url}/ui_dead/") as resp:
+                self.assertEqual(resp.status, 502)
+
+        self._run(scenario)
+
+    def test_upstream_timeout(self):
+        async def scenario(session, proxy_url, upstream_url):
+            self.registry.add("ui_a", upstream_url)
+            async with session.get(f"{proxy_url}/ui_a/slow") as resp:
+                self.assertEqual(resp.status, 504)
+
+        self._run(scenario, read_timeout=0.1)
+
+    def test_access_log(self):
+        async def scenario(session, proxy_url, upstream_url):
+            self.registry.add("ui_a", upstream_url)
+            async with session.get(f"{proxy_url}/ui_a/page?x=1") as resp:
+                await resp.read()
+
+        with self.assertLogs("lumos.proxy.access", level="INFO") as logs:
+            self._run(scenario)
+        entry = json.loads(logs.records[-1].getMessage())
+        self.assertEqual((entry["client"], entry["path"], entry["status"]), ("ui_a", "/ui_a/page?x=1", 200))
+        self.assertGreater(entry["bytes"], 0)
+
+class TestToucher(unittest.TestCase):
+    def test_rate_limited_per_client(self):
+        async def scenario():
+            touched = []
+
+            async def touch(request):
+                touched.append(request.match_info["name"])
+                return web.json_response({"status": "success"})
+
+            backend = web.Application()
+            backend.router.add_post("/api/containers/{name}/touch", touch)
+            runner, url = await start_server(backend)
+            toucher = proxy.Toucher(url, interval=60)
+            try:
+                async with aiohttp.ClientSession() as session:
+                    for client in ("ui_a", "ui_a", "ui_b"):
+                        toucher(session, client)
+                    await asyncio.sleep(0.2)
+            finally:
+                await runner.cleanup()
+            self.assertEqual(sorted(touched), ["ui_a", "ui_b"])
+
+        asyncio.run(scenario())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Query-plan regression tests for the hot queries in project_model.py.
+
+These need a real MySQL server, so they only run when LUMOS_TEST_MYSQL=1 and
+the DB_* environment variables point at a disposable database. Migrations are
+applied first; seed rows are inserted in a transaction that is rolled back.
+"""
+import unittest
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.models.project_hydrator import ProjectHydrator
+from app.models.project_listing import build_list_query
+
+@unittest.skipUnless(os.getenv("LUMOS_TEST_MYSQL") == "1", "set LUMOS_TEST_MYSQL=1 to run against MySQL")
+class TestQueryPlans(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from app.init_db import get_db_connection, run_migrations
+        assert run_migrations(), "migrations failed"
+        assert run_migrations(), "migrations are not idempotent"
+        cls.conn = get_db_connection()
+        cls.cursor = cls.conn.cursor(dictionary=True)
+        cls.conn.start_transaction()
+        cls.cursor.executemany(
+            "INSERT INTO projects (name, version, description) VALUES (%s, %s, %s)",
+            [(f"plan-{i}", f"{i % 7}.0", "") for i in range(500)]
+        )
+        cls.cursor.execute("SELECT MAX(id) AS id FROM projects")
+        cls.project_id = cls.cursor.fetchone()["id"]
+        cls.cursor.executemany(
+            "INSERT INTO agents (project_id, agent_id, name, type) VALUES (%s, %s, %s, %s)",
+            [(cls.project_id - (i % 50), f"agent-{i}", "a", "AI") for i in range(500)]
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.rollback()
+        cls.cursor.close()
+        cls.conn.close()
+
+    def _plan(self, query, params):
+        self.cursor.execute(f"EXPLAIN {query}", params)
+        return self.cursor.fetchall()
+
+    def assertUsesIndexes(self, query, params, expected=None):
+        for row in self._plan(query, params):
+            if row["table"] is None:
+                continue  # e.g. "no matching row in const table"
+            self.assertNotEqual(row["type"], "ALL", f"full scan of {row['table']} in: {query}")
+            if expected and row["table"] in expected:
+                self.assertEqual(row["key"], expected[row["table"]], query)
+
+    def test_project_list_uses_created_at_index(self):
+        query, params = build_list_query(50)
+        self.assertUsesIndexes(query, params, {"projects": "idx_projects_created_at_id"})
+
+    def test_project_list_by_version_uses_composite_index(self):
+        query, params = build_list_query(50, version="3.0")
+        self.assertUsesIndexes(query, params, {"projects": "idx_projects_version_created_at_id"})
+
+    def test_project_list_after_cursor_uses_index(self):
+        query, params = build_list_query(50, after=("2100-01-01 00:00:00", 1))
+        self.assertUsesIndexes(query, params)
+
+    def test_hydration_queries_use_indexes(self):
+        for query in (
+            ProjectHydrator.PROJECT_QUERY,
+            ProjectHydrator.AGENTS_QUERY,
+            ProjectHydrator.AGENT_MODELS_QUERY,
+            ProjectHydrator.AGENT_CAPABILITIES_QUERY,
+            ProjectHydrator.AGENT_TOOLS_QUERY,
+            ProjectHydrator.TOOLS_QUERY,
+            ProjectHydrator.CONNECTIONS_QUERY,
+            ProjectHydrator.INTERACTIONS_QUERY,
+            ProjectHydrator.PARTICIPANTS_QUERY,
+        ):
+            with self.subTest(query=query.split("FROM")[1].split()[0]):
+                self.assertUsesIndexes(query, (self.project_id,))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import json
+import tempfile
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.services.route_map import RouteRegistry, RouteTable
+
+class TestRouteRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "route_map.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _file(self):
+        with open(self.path) as f:
+            return json.load(f)
+
+    def test_changes_persisted_atomically(self):
+        registry = RouteRegistry(self.path)
+        registry.add("ui_a", "http://localhost:5001")
+        registry.add("ui_b", "http://localhost:5002")
+        registry.remove(["ui_a", "ui_missing"])
+        self.assertEqual(self._file(), {"ui_b": "http://localhost:5002"})
+        self.assertEqual(registry.get("ui_b"), "http://localhost:5002")
+        self.assertFalse(os.path.exists(f"{self.path}.tmp"))
+        # A new registry starts from what was written
+        self.assertEqual(RouteRegistry(self.path).routes, {"ui_b": "http://localhost:5002"})
+
+    def test_unchanged_routes_not_rewritten(self):
+        registry = RouteRegistry(self.path)
+        registry.add("ui_a", "http://localhost:5001")
+        registry.add("ui_a", "http://localhost:5001")
+        registry.remove(["ui_missing"])
+        self.assertEqual(registry.writes, 1)
+
+    def test_listeners_notified(self):
+        registry = RouteRegistry(self.path)
+        changes = []
+        registry.add_listener(lambda name, url: changes.append((name, url)))
+        registry.add("ui_a", "http://localhost:5001")
+        registry.remove(["ui_a"])
+        self.assertEqual(changes, [("ui_a", "http://localhost:5001"), ("ui_a", None)])
+
+class TestRouteTable(unittest.TestCase):
+    def test_reloads_only_when_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "route_map.json")
+            registry = RouteRegistry(path)
+            table = RouteTable(path)
+            self.assertIsNone(table.get("ui_a"))
+            registry.add("ui_a", "http://localhost:5001")
+            self.assertEqual(table.get("ui_a"), "http://localhost:5001")
+            reloads = table.reloads
+            for _ in range(10):
+                table.get("ui_a")
+            self.assertEqual(table.reloads, reloads)
+            registry.add("ui_b", "http://localhost:50002")
+            self.assertEqual(table.get("ui_b"), "http://localhost:50002")
+
+    def test_reloads_same_size_rewrite_within_one_tick(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "route_map.json")
+            registry = RouteRegistry(path)
+            table = RouteTable(path)
+            registry.add("ui_aaaaaa", "http://localhost:5001")
+            self.assertEqual(table.get("ui_aaaaaa"), "http://localhost:5001")
+            before = os.stat(path)
+            registry._apply([("ui_aaaaaa", None), ("ui_bbbbbb", "http://localhost:5001")])
+            # Simulate a coarse-timestamp filesystem: same mtime, same size
+            os.utime(path, ns=(before.st_atime_ns, before.st_mtime_ns))
+            self.assertEqual(os.stat(path).st_size, before.st_size)
+            self.assertIsNone(table.get("ui_aaaaaa"))
+            self.assertEqual(table.get("ui_bbbbbb"), "http://localhost:5001")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import asyncio
+import tempfile
+from httpx import AsyncClient, ASGITransport
+from unittest.mock import patch
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.main import app
+from app.services.runtime_registry import RuntimeRegistry
+from ui_app.simulation import parse_react
+
+CONFIG = {"project": {"name": "demo"}, "agents": [], "tools": [], "interactions": []}
+
+class TestRuntimeRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "runtime.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_register_and_get(self):
+        registry = RuntimeRegistry(self.path)
+        route = registry.register(CONFIG)
+        self.assertTrue(route.startswith("rt_"))
+        self.assertEqual(registry.get(route), CONFIG)
+        self.assertEqual(registry.get(route), CONFIG)
+        self.assertEqual((registry.loads, registry.hits), (1, 1))
+        self.assertIsNone(registry.get("rt_missing"))
+
+    def test_configs_survive_restart(self):
+        route = RuntimeRegistry(self.path).register(CONFIG)
+        self.assertEqual(RuntimeRegistry(self.path).get(route), CONFIG)
+
+    def test_least_recently_used_evicted(self):
+        registry = RuntimeRegistry(self.path, max_loaded=2)
+        routes = [registry.register(CONFIG) for _ in range(3)]
+        for route in routes:
+            registry.get(route)
+        self.assertEqual(list(registry._loaded), routes[1:])
+        self.assertEqual(registry.evictions, 1)
+        # Evicted configs are reloaded, not lost
+        self.assertEqual(registry.get(routes[0]), CONFIG)
+
+    def test_idle_configs_evicted(self):
+        registry = RuntimeRegistry(self.path, idle_ttl=0)
+        route = registry.register(CONFIG)
+        registry.get(route)
+        registry.evict()
+        self.assertEqual(registry.stats()["loaded"], 0)
+
+    def test_idle_configs_evicted_without_a_new_load(self):
+        registry = RuntimeRegistry(self.path, idle_ttl=60)
+        idle, busy = registry.register(CONFIG), registry.register(CONFIG)
+        now = [1000.0]
+        with patch("app.services.runtime_registry.time.monotonic", lambda: now[0]):
+            registry.get(idle)
+            registry.get(busy)
+            for _ in range(3):
+                now[0] += 30
+                registry.get(busy)
+        self.assertEqual(list(registry._loaded), [busy])
+        self.assertEqual((registry.loads, registry.evictions), (2, 1))
+
+    def test_unregister(self):
+        registry = RuntimeRegistry(self.path)
+        route = registry.register(CONFIG)
+        registry.get(route)
+        self.assertTrue(registry.unregister(route))
+        self.assertIsNone(registry.get(route))
+        self.assertFalse(registry.unregister(route))
+
+class TestParseReact(unittest.TestCase):
+    def test_fenced_json(self):
+        self.assertEqual(parse_react('```json\n{"steps": []}\n```'), ({"steps": []}, ""))
+
+    def test_prose_and_trailing_commas_tolerated(self):
+        self.assertEqual(parse_react('Here is the simulation:\n{"steps": [1, 2,],}\nDone.'), ({"steps": [1, 2]}, ""))
+
+    def test_invalid_json_returned_raw(self):
+        self.assertEqual(parse_react("not json"), ("not json", "not json"))
+
+class TestRuntimeRoutes(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = RuntimeRegistry(os.path.join(self.tmp.name, "runtime.db"))
+        self.route = self.registry.register(CONFIG)
+        self.patcher = patch('app.controllers.runtime_controller.get_runtime_registry', return_value=self.registry)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp.cleanup()
+
+    def _request(self, method, url, **kwargs):
+        async def send():
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+                return await ac.request(method, url, **kwargs)
+        return asyncio.run(send())
+
+    def test_healthz(self):
+        self.assertEqual(self._request("GET", f"/run/{self.route}/healthz").status_code, 200)
+        self.assertEqual(self._request("GET", "/run/rt_missing/healthz").status_code, 404)
+
+    def test_get_renders_page(self):
+        response = self._request("GET", f"/run/{self.route}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("text/html", response.headers["content-type"])
+
+    def test_post_simulates_with_project_config(self):
+        prompts = []
+
+        class FakeLLM:
+            async def chat(self, messages, model, temperature):
+                prompts.append(messages[0]["content"])
+                return '```json\n{"steps": ["simulated"]}\n```'
+
+        # Goes through the shared LLM client, not a client of its own
+        with patch('app.controllers.runtime_controller.get_llm_client', return_value=FakeLLM()):
+            response = self._request("POST", f"/run/{self.route}", content="user_input=plan+a+trip",
+                                     headers={"Content-Type": "application/x-www-form-urlencoded"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("simulated", response.text)
+        self.assertIn("plan a trip", response.text)
+        self.assertIn("plan a trip", prompts[0])
+        self.assertIn("'demo'", prompts[0])
+
+    def test_unknown_route(self):
+        self.assertEqual(self._request("GET", "/run/rt_missing").status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
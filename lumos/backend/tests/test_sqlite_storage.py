@@ -0,0 +1,219 @@
+import unittest
+import asyncio
+import tempfile
+import sqlite3
+from httpx import AsyncClient, ASGITransport
+from unittest.mock import patch
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.main import app
+from app.models.project_model import ProjectModel, create_storage_strategy
+from app.models.project_listing import decode_cursor
+from app.models import sqlite_storage_strategy
+from app.models.sqlite_storage_strategy import SQLiteProjectStorage
+from app.models.async_storage_strategy import make_async_storage
+from app.models.project_cache import LocalCache, ProjectCache
+
+def make_ldl(n_agents=3):
+    return {
+        "project": {"name": "demo", "version": "1.0", "description": "desc", "authors": ["ada", "alan"]},
+        "agents": [{
+            "id": f"agent-{i}", "name": f"Agent {i}", "description": "", "type": "AI", "subtype": "LLM",
+            "model": {"name": "gpt-4o", "provider": "openai", "parameters": {"temperature": 0}},
+            "capabilities": ["planning", "search"],
+            "tools": [{"name": "Search", "description": "web", "type": "Information"}],
+        } for i in range(n_agents)],
+        "interactions": [{
+            "id": "i-1", "type": "AgentAgent", "participants": ["agent-0", "agent-1"],
+            "protocol": {"type": "DirectedMessaging", "messageTypes": ["task"]},
+        }],
+    }
+
+def make_canvas():
+    return {
+        "project": {"name": "canvas", "version": "2.0", "description": ""},
+        "agents": [{"id": "agent-a", "name": "A", "description": "", "type": "AI", "position": {"x": 1, "y": 2}},
+                   {"id": "agent-b", "name": "B", "description": "", "type": "AI", "position": {"x": 3, "y": 4}}],
+        "tools": [{"id": "tool-7", "name": "Search", "description": "", "type": "Information",
+                   "position": {"x": 0, "y": 0}}],
+        "tasks": [],
+        "connections": [{"id": "c-1", "source": "agent-a", "target": "agent-b", "label": "asks"}],
+    }
+
+class TestSQLiteProjectStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = SQLiteProjectStorage(os.path.join(self.tmp.name, "lumos.db"))
+        self.model = ProjectModel(self.storage)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_uses_wal_mode(self):
+        cursor = self.storage.db.get_connection().cursor()
+        cursor.execute("PRAGMA journal_mode")
+        self.assertEqual(cursor.fetchone()[0], "wal")
+
+    def test_create_project_round_trip(self):
+        result = self.model.create_project(make_ldl())
+        self.assertEqual(result["status"], "success")
+        project = self.model.get_project_by_id(result["project_id"])
+        self.assertEqual(project["project"]["name"], "demo")
+        self.assertEqual([a["agent_id"] for a in project["agents"]], ["agent-0", "agent-1", "agent-2"])
+        agent = project["agents"][1]
+        self.assertEqual(agent["model"]["parameters"], {"temperature": 0})
+        self.assertEqual(agent["capabilities"], ["planning", "search"])
+        self.assertEqual(agent["tools"][0]["name"], "Search")
+        self.assertEqual(project["interactions"][0]["participants"], ["agent-0", "agent-1"])
+
+    def test_save_project_round_trip(self):
+        result = self.model.save_project(make_canvas())
+        self.assertEqual(result["status"], "success")
+        project = self.model.get_project_by_id(result["project_id"])
+        self.assertEqual(len(project["agents"]), 2)
+        self.assertEqual(project["tools"][0]["id"], 7)
+        self.assertEqual(project["connections"][0]["label"], "asks")
+        self.assertEqual(project["interactions"][0]["participants"], ["agent-a", "agent-b"])
+
+    def test_failed_save_rolls_back(self):
+        canvas = make_canvas()
+        canvas["agents"].append(dict(canvas["agents"][0]))  # duplicate agent id
+        result = self.model.save_project(canvas)
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(self.model.get_all_projects(count="exact")["total"], 0)
+
+    def test_listing_pages_and_counts(self):
+        for i in range(5):
+            self.model.save_project({**make_canvas(), "project": {"name": f"p{i}", "version": "1.0", "description": ""}})
+        page = self.model.get_all_projects(limit=2, count="exact")
+        self.assertEqual([p["name"] for p in page["projects"]], ["p4", "p3"])
+        self.assertEqual(page["total"], 5)
+        page = self.model.get_all_projects(limit=2, after=decode_cursor(page["next_cursor"]))
+        self.assertEqual([p["name"] for p in page["projects"]], ["p2", "p1"])
+        self.assertEqual(self.model.get_all_projects(count="estimate")["total"], 5)
+        self.assertEqual(self.model.get_all_projects(name="p3", count="exact")["total"], 1)
+
+    def _resave(self, project_id, revision, canvas):
+        canvas["project"].update(id=project_id, revision=revision)
+        return self.model.save_project(canvas)
+
+    def _count(self, table):
+        cursor = self.storage.db.get_connection().cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        return cursor.fetchone()[0]
+
+    def test_incremental_save_writes_only_the_diff(self):
+        first = self.model.save_project(make_canvas())
+        self.assertEqual(first["revision"], 1)
+        canvas = make_canvas()
+        canvas["agents"][1]["name"] = "B2"
+        canvas["agents"].append({"id": "agent-c", "name": "C", "description": "", "type": "AI"})
+        canvas["connections"] = []
+        result = self._resave(first["project_id"], 1, canvas)
+        self.assertEqual(result["status"], "success", result)
+        self.assertEqual(result["project_id"], first["project_id"])
+        self.assertEqual(result["revision"], 2)
+        self.assertEqual(result["changes"], {
+            "agents": {"added": 1, "changed": 1, "removed": 0},
+            "tools": {"added": 0, "changed": 0, "removed": 0},
+            "connections": {"added": 0, "changed": 0, "removed": 1},
+        })
+        project = self.model.get_project_by_id(first["project_id"])
+        self.assertEqual(project["project"]["revision"], 2)
+        self.assertEqual(sorted(a["name"] for a in project["agents"]), ["A", "B2", "C"])
+        self.assertEqual(project["connections"], [])
+        self.assertEqual(self._count("projects"), 1)
+
+    def test_unchanged_resave_only_bumps_revision(self):
+        first = self.model.save_project(make_canvas())
+        result = self._resave(first["project_id"], 1, make_canvas())
+        self.assertTrue(all(not any(c.values()) for c in result["changes"].values()), result)
+
+    def test_stale_revision_conflicts(self):
+        first = self.model.save_project(make_canvas())
+        self._resave(first["project_id"], 1, make_canvas())
+        canvas = make_canvas()
+        canvas["agents"] = []
+        stale = self._resave(first["project_id"], 1, canvas)
+        self.assertTrue(stale["conflict"])
+        self.assertEqual(stale["revision"], 2)
+        self.assertEqual(len(self.model.get_project_by_id(first["project_id"])["agents"]), 2)
+        self.assertEqual(self._resave(999, 1, make_canvas())["status"], "error")
+
+    def test_revision_column_added_to_existing_files(self):
+        path = os.path.join(self.tmp.name, "old.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, "
+                     "version TEXT NOT NULL, description TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.commit()
+        conn.close()
+        model = ProjectModel(SQLiteProjectStorage(path))
+        self.assertEqual(model.save_project(make_canvas())["revision"], 1)
+
+    def test_missing_project(self):
+        self.assertEqual(self.model.get_project_by_id(99)["status"], "error")
+
+    def test_concurrent_saves_through_executor(self):
+        storage = make_async_storage(self.model, mode="async")
+
+        async def run():
+            return await asyncio.gather(*(storage.save_project(make_canvas()) for _ in range(10)))
+
+        results = asyncio.run(run())
+        self.assertTrue(all(r["status"] == "success" for r in results), results)
+        self.assertEqual(self.model.get_all_projects(count="exact")["total"], 10)
+
+    def test_backend_selection(self):
+        path = os.path.join(self.tmp.name, "other.db")
+        # SQLITE_PATH is read from the environment once, at import
+        with patch.object(sqlite_storage_strategy, "SQLITE_PATH", path):
+            strategy = create_storage_strategy("sqlite")
+        self.assertIsInstance(strategy, SQLiteProjectStorage)
+        self.assertTrue(os.path.exists(path))
+        with self.assertRaises(ValueError):
+            create_storage_strategy("oracle")
+
+class TestProjectRoutesOnSQLite(unittest.TestCase):
+    """The HTTP routes against the real storage layer, in-process."""
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        model = ProjectModel(SQLiteProjectStorage(os.path.join(self.tmp.name, "lumos.db")))
+        cache = ProjectCache(LocalCache())
+        model.add_write_listener(cache.invalidate)
+        self.patcher = patch.multiple('app.controllers.export_controller.service', model=model,
+                                      storage=make_async_storage(model, mode="async"), cache=cache)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp.cleanup()
+
+    @staticmethod
+    def _request(method, path, payload=None):
+        async def _do():
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                return await client.request(method, path, json=payload)
+        return asyncio.run(_do())
+
+    def test_save_list_and_load(self):
+        payload = {
+            "project": {"name": "routes", "version": "1.0", "description": ""},
+            "agents": [{"id": "agent-a", "name": "A", "description": "", "type": "AI"},
+                       {"id": "agent-b", "name": "B", "description": "", "type": "AI"}],
+            "interactions": [{"id": "i-1", "name": "asks", "participants": ["agent-a", "agent-b"]}],
+        }
+        saved = self._request("POST", "/api/save", payload)
+        self.assertEqual(saved.status_code, 200)
+        project_id = saved.json()["project_id"]
+
+        listed = self._request("GET", "/api/projects?fields=id,name")
+        self.assertEqual(listed.json()["projects"], [{"id": project_id, "name": "routes"}])
+
+        loaded = self._request("GET", f"/api/projects/{project_id}")
+        self.assertEqual(loaded.status_code, 200)
+        self.assertEqual(len(loaded.json()["project"]["agents"]), 2)
+
+        self.assertEqual(self._request("GET", "/api/projects/999").status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,95 +1,43 @@
 from flask import Flask, request, render_template
+import hmac
 import os
 import json
 import openai
-import re
+from simulation import simulate
 
 app = Flask(__name__)
 
+# Set directly by a one-off export, or loaded later through /config by a warm-pool container
 config = json.loads(os.environ.get("CONFIG", "{}"))
+CONFIG_TOKEN = os.environ.get("CONFIG_TOKEN", "")
 OPENAI_API_KEY = ""
 
+@app.route('/healthz')
+def healthz():
+    return {"status": "ok", "configured": bool(config)}
+
+@app.route('/config', methods=['POST'])
+def load_config():
+    """Load the LDL config once; only the backend that started the container knows the token"""
+    global config
+    if not CONFIG_TOKEN or not hmac.compare_digest(request.headers.get("X-Config-Token", ""), CONFIG_TOKEN):
+        return {"error": "forbidden"}, 403
+    if config:
+        return {"error": "already configured"}, 409
+    new_config = request.get_json(silent=True)
+    if not isinstance(new_config, dict):
+        return {"error": "config must be a JSON object"}, 400
+    config = new_config
+    return {"status": "ok"}
+
 @app.route('/', methods=['GET', 'POST'])
 def home():
     output = ""
     
     if request.method == 'POST':
         user_input = request.form.get("user_input")
-        # Do any processing
-        
-        prompt = f'''
-        Given a user instruction and a multi-agent system, Simulate the user instruction using the multi-agent system and provide the complete react format in a json where the planning and actions of each agent, interaction between agents and interactions with tools are completely described by the React format. You can only use the agents, tools and the interactions between tools described in the multi-agent system description. Follow the ids present in interactions to simulate the interactions.
-        
-        {{  
-  "name": "Component Description - Fact Checker",  
-  "type": "workflow",  
-  "version": "1.0",  
-  "description": "Generate and verify a short description of the Fact Checker agent.",  
-  "steps": [  
-    {{  
-      "id": "thought-init",  
-      "type": "thought",  
-      "agent": "doc-writer",  
-      "content": "I'll write a short component description for the Fact Checker."  
-    }},  
-    {{  
-      "id": "write-description",  
-      "type": "action",  
-      "agent": "doc-writer",  
-      "tool": "DocDraftCreator",  
-      "input": "input_type: summary\naudience: developer\noutput_format: markdown",  
-      "output": "### Fact Checker\nThe Fact Checker agent is responsible for validating technical claims within the documentation. It combines rule-based logic with LLM reasoning to ensure factual accuracy and consistency."  
-    }},  
-    {{  
-      "id": "send-for-verification",  
-      "type": "message",  
-      "from": "doc-writer",  
-      "to": "fact-checker",  
-      "messageType": "Command",  
-      "content": "task: Verify component description\ntext: The Fact Checker agent is responsible for validating technical claims..."  
-    }},  
-    {{  
-      "id": "verify-short-description",  
-      "type": "action",  
-      "agent": "fact-checker",  
-      "tool": "ClaimVerifier",  
-      "input": "input_type: sentence\nconfidence_threshold: 0.8\noutput_format: inline_annotated",  
-      "output": "The Fact Checker agent is responsible for validating technical claims [✔️ verified]..."  
-    }},  
-    {{  
-      "id": "respond-to-writer",  
-      "type": "message",  
-      "from": "fact-checker",  
-      "to": "doc-writer",  
-      "messageType": "Response",  
-      "content": "status: Verified\nannotated_text: The Fact Checker agent is responsible for validating technical claims [✔️ verified]..."  
-    }}  
-  ]  
-}}
-
-        Ensure that the exact react format is used and output a json parsable format.
-        
-        User Instruction: {user_input}
-        
-        Multi-Agent System: {config}
-        
-        React:'''
         client = openai.OpenAI(api_key=OPENAI_API_KEY)
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.0
-        )
-        message = response.choices[0].message.content.strip()
-        print("Generated Tool:", message)
-        message = re.sub(r"^```json\n|```$", "", message.strip())
-        output = message
-        raw_output = ""
-        try:
-            output = json.loads(message)
-        except json.JSONDecodeError:
-            print("Failed to parse JSON. Showing raw response.")
-            raw_output = message
+        output, raw_output = simulate(client, user_input, config)
         # final = user_input.split(",")[0]
         # output = f"Processed: {final}"
     return render_template('index.html', output=output)
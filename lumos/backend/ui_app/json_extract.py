@@ -0,0 +1,156 @@
+"""
+Pulls the JSON value out of an LLM answer: skips prose and code fences
+around it, takes the first balanced object or array, and repairs the usual
+defects (trailing commas, unquoted keys, single quotes, comments, Python
+literals) before parsing.
+
+Lives in ui_app so the exported UI image can use it without the backend;
+the backend imports it from here (see generator_service.py).
+"""
+import json
+import re
+
+
+class JSONExtractError(ValueError):
+    pass
+
+
+class JSONExtractor:
+    """
+    Incremental scanner: feed() the text as it arrives and it returns the
+    first balanced JSON object or array as soon as it closes (None until
+    then). Strings are tracked so braces inside them don't count.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.start = None
+        self.depth = 0
+        self.quote = None
+        self.escaped = False
+        self.complete = None
+
+    def feed(self, chunk):
+        if self.complete is not None:
+            return self.complete
+        base = len(self.text)
+        self.text += chunk
+        for offset, ch in enumerate(chunk):
+            if self.start is None:
+                if ch in "{[":
+                    self.start, self.depth = base + offset, 1
+            elif self.quote is not None:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == self.quote:
+                    self.quote = None
+            elif ch in "\"'":
+                self.quote = ch
+            elif ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.complete = self.text[self.start:base + offset + 1]
+                    return self.complete
+        return None
+
+
+def candidates(text):
+    """Every balanced object/array in `text`, trying each opening bracket in turn"""
+    position = 0
+    while True:
+        starts = [index for index in (text.find("{", position), text.find("[", position)) if index >= 0]
+        if not starts:
+            return
+        start = min(starts)
+        found = JSONExtractor().feed(text[start:])
+        if found is not None:
+            yield found
+        position = start + 1
+
+
+# Outside strings only
+_COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.S)
+_UNQUOTED_KEY = re.compile(r"([{,]\s*)([A-Za-z_$][\w$-]*)(\s*:)")
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_LITERAL = re.compile(r"\b(True|False|None)\b")
+
+
+def _segments(text):
+    """Split into (is_string, text) runs; single-quoted strings come back double-quoted"""
+    segments, current, quote, escaped = [], [], None, False
+    for ch in text:
+        if quote is None:
+            if ch in "\"'":
+                segments.append((False, "".join(current)))
+                current, quote = [ch], ch
+            else:
+                current.append(ch)
+            continue
+        current.append(ch)
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == quote:
+            string = "".join(current)
+            if quote == "'":
+                string = json.dumps(string[1:-1].replace("\\'", "'").replace('\\"', '"'))
+            segments.append((True, string))
+            current, quote = [], None
+    segments.append((quote is not None, "".join(current)))
+    return segments
+
+
+def repair(text):
+    """Fix the defects LLMs commonly leave in otherwise good JSON"""
+    repaired = []
+    for is_string, segment in _segments(text):
+        if not is_string:
+            segment = _COMMENT.sub("", segment)
+            segment = _LITERAL.sub(lambda match: _LITERALS[match.group(1)], segment)
+            segment = _UNQUOTED_KEY.sub(r'\1"\2"\3', segment)
+            segment = _TRAILING_COMMA.sub(r"\1", segment)
+        repaired.append(segment)
+    return "".join(repaired)
+
+
+def _parse(candidate):
+    """(value, repaired), or raises json.JSONDecodeError"""
+    try:
+        # strict=False lets raw newlines and tabs through inside strings
+        return json.loads(candidate, strict=False), False
+    except json.JSONDecodeError:
+        return json.loads(repair(candidate), strict=False), True
+
+
+def extract(text, expect=None):
+    """
+    (value, repaired) for the first JSON object or array in `text` that
+    parses, as is or after repair(). With `expect` (e.g. dict), values of
+    other types are skipped too, so 'Step [1]: {...}' gives the object.
+    Raises JSONExtractError if nothing suitable is found.
+    """
+    error = None
+    for candidate in candidates(text):
+        if expect is dict and not candidate.startswith("{"):
+            continue
+        try:
+            value, repaired = _parse(candidate)
+        except json.JSONDecodeError as e:
+            error = error or e
+            continue
+        if expect is None or isinstance(value, expect):
+            return value, repaired
+    if error is not None:
+        raise JSONExtractError(f"Invalid JSON in response: {str(error)}")
+    raise JSONExtractError("No JSON object found in response")
+
+
+def extract_json(text, expect=None):
+    """The first JSON object or array in `text`; see extract()"""
+    return extract(text, expect)[0]
@@ -0,0 +1,114 @@
+"""
+Simulation logic shared by the single-project ui_app container (app.py) and
+the backend's multi-project runtime. No web framework imports here.
+"""
+try:
+    from .json_extract import JSONExtractError, extract_json
+except ImportError:
+    # Inside the ui_app container this directory is the top level
+    from json_extract import JSONExtractError, extract_json
+
+MODEL = "gpt-4o"
+
+
+def build_prompt(user_input, config):
+    """The ReAct simulation prompt for `user_input` against the LDL `config`"""
+    return f'''
+        Given a user instruction and a multi-agent system, Simulate the user instruction using the multi-agent system and provide the complete react format in a json where the planning and actions of each agent, interaction between agents and interactions with tools are completely described by the React format. You can only use the agents, tools and the interactions between tools described in the multi-agent system description. Follow the ids present in interactions to simulate the interactions.
+        
+        {{  
+  "name": "Component Description - Fact Checker",  
+  "type": "workflow",  
+  "version": "1.0",  
+  "description": "Generate and verify a short description of the Fact Checker agent.",  
+  "steps": [  
+    {{  
+      "id": "thought-init",  
+      "type": "thought",  
+      "agent": "doc-writer",  
+      "content": "I'll write a short component description for the Fact Checker."  
+    }},  
+    {{  
+      "id": "write-description",  
+      "type": "action",  
+      "agent": "doc-writer",  
+      "tool": "DocDraftCreator",  
+      "input": "input_type: summary\naudience: developer\noutput_format: markdown",  
+      "output": "### Fact Checker\nThe Fact Checker agent is responsible for validating technical claims within the documentation. It combines rule-based logic with LLM reasoning to ensure factual accuracy and consistency."  
+    }},  
+    {{  
+      "id": "send-for-verification",  
+      "type": "message",  
+      "from": "doc-writer",  
+      "to": "fact-checker",  
+      "messageType": "Command",  
+      "content": "task: Verify component description\ntext: The Fact Checker agent is responsible for validating technical claims..."  
+    }},  
+    {{  
+      "id": "verify-short-description",  
+      "type": "action",  
+      "agent": "fact-checker",  
+      "tool": "ClaimVerifier",  
+      "input": "input_type: sentence\nconfidence_threshold: 0.8\noutput_format: inline_annotated",  
+      "output": "The Fact Checker agent is responsible for validating technical claims [✔️ verified]..."  
+    }},  
+    {{  
+      "id": "respond-to-writer",  
+      "type": "message",  
+      "from": "fact-checker",  
+      "to": "doc-writer",  
+      "messageType": "Response",  
+      "content": "status: Verified\nannotated_text: The Fact Checker agent is responsible for validating technical claims [✔️ verified]..."  
+    }}  
+  ]  
+}}
+
+        Ensure that the exact react format is used and output a json parsable format.
+        
+        User Instruction: {user_input}
+        
+        Multi-Agent System: {config}
+        
+        React:'''
+
+
+def parse_react(message):
+    """
+    Parse the JSON in the model's answer, ignoring prose and fences around
+    it and repairing small defects (see json_extract.py). Returns
+    (output, raw_output): the parsed JSON and "", or the text and the text.
+    """
+    message = message.strip()
+    try:
+        return extract_json(message), ""
+    except JSONExtractError:
+        print("Failed to parse JSON. Showing raw response.")
+        return message, message
+
+
+def simulate(client, user_input, config):
+    """Run one simulation with a (sync) OpenAI client"""
+    response = client.chat.completions.create(
+        model=MODEL,
+        messages=[{"role": "user", "content": build_prompt(user_input, config)}],
+        temperature=0.0
+    )
+    message = response.choices[0].message.content.strip()
+    print("Generated Tool:", message)
+    return parse_react(message)
+
+
+async def simulate_async(client, user_input, config):
+    """
+    Same as simulate, with an async chat client: anything with
+    `await client.chat(messages, model=..., temperature=...)` returning the
+    reply text, such as the backend's llm_client.ProviderClient
+    """
+    message = await client.chat(
+        [{"role": "user", "content": build_prompt(user_input, config)}],
+        model=MODEL,
+        temperature=0.0
+    )
+    message = message.strip()
+    print("Generated Tool:", message)
+    return parse_react(message)
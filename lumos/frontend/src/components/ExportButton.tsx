@@ -30,6 +30,7 @@ import LinkIcon from '@mui/icons-material/Link';
 import ContentCopyIcon from '@mui/icons-material/ContentCopy';
 import GetAppIcon from '@mui/icons-material/GetApp';
 import ArrowDropDownIcon from '@mui/icons-material/ArrowDropDown';
+import { SaveConflictError } from '../services/apiService';
 
 interface ExportButtonProps {
   onExport: () => Promise<
@@ -140,7 +141,11 @@ const ExportButton: React.FC<ExportButtonProps> = ({ onExport, onSave, onDownloa
       }
     } catch (error) {
       console.error('Error during save:', error);
-      setStatusMessage('Save failed. Please check console for details.');
+      setStatusMessage(
+        error instanceof SaveConflictError
+          ? 'This project was saved elsewhere since you loaded it. Reload it before saving.'
+          : 'Save failed. Please check console for details.'
+      );
       setShowError(true);
     } finally {
       setIsSaving(false);
@@ -11,6 +11,7 @@ vi.mock('../services/apiService', () => ({
     saveProject: vi.fn(),
     processImportedData: vi.fn(data => data),
   },
+  SaveConflictError: class SaveConflictError extends Error {},
   serializeLdl: vi.fn(data => JSON.stringify(data)),
   deserializeLdl: vi.fn(text => JSON.parse(text)),
 }));
@@ -167,10 +168,31 @@ describe('ProjectController', () => {
   });
 
   it('saveProject calls ApiService.saveProject', async () => {
-    (ApiService.saveProject as any).mockResolvedValue(true);
+    (ApiService.saveProject as any).mockResolvedValue({ success: true, projectId: 7, revision: 1 });
     const ok = await controller.saveProject();
     expect(ApiService.saveProject).toHaveBeenCalled();
     expect(ok).toBe(true);
+    // The next save updates project 7 instead of inserting a copy
+    expect(controller.getProjectData().project.id).toBe('7');
+    expect(controller.getProjectData().project.revision).toBe(1);
+  });
+
+  it('saveProject keeps the saved id when metadata is edited', async () => {
+    (ApiService.saveProject as any).mockResolvedValue({ success: true, projectId: 7, revision: 2 });
+    await controller.saveProject();
+    controller.updateProject({ id: '', name: 'Renamed', version: '1.0.1', description: '', authors: [] });
+    const project = controller.getProjectData().project;
+    expect([project.id, project.revision, project.name]).toEqual(['7', 2, 'Renamed']);
+  });
+
+  it('saveProject throws on a revision conflict', async () => {
+    (ApiService.saveProject as any).mockResolvedValue({
+      success: false,
+      conflict: true,
+      revision: 5,
+      message: 'stale',
+    });
+    await expect(controller.saveProject()).rejects.toThrow('stale');
   });
 
   it('importFromLDL handles invalid structure', async () => {
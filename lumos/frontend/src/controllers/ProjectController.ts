@@ -1,5 +1,5 @@
 import { Project, ProjectData, Agent, Tool, Interaction, Position } from '../models/types';
-import { ApiService } from '../services/apiService';
+import { ApiService, SaveConflictError } from '../services/apiService';
 import { serializeLdl, deserializeLdl } from '../services/apiService';
 import { CanvasObjectFactory } from '../models/CanvasObjectFactory';
 
@@ -13,7 +13,7 @@ export class ProjectController {
   constructor(onProjectChanged: (project: ProjectData) => void) {
     // Initialize with default project
     this.projectData = new ProjectData(
-      new Project('New Project', '1.0.0', 'A new agent orchestration project')
+      new Project('', 'New Project', '1.0.0', 'A new agent orchestration project')
     );
 
     // Add default input/output nodes
@@ -28,7 +28,7 @@ export class ProjectController {
   public newProject(): void {
     // 1) Re‑initialize projectData
     this.projectData = new ProjectData(
-      new Project('New Project', '1.0.0', 'A new agent orchestration project')
+      new Project('', 'New Project', '1.0.0', 'A new agent orchestration project')
     );
 
     // 2) Clear collections
@@ -67,7 +67,9 @@ export class ProjectController {
    * Update project metadata
    */
   updateProject(project: Project): void {
-    this.projectData.project = project;
+    // Editing metadata never changes which backend project the canvas saves to
+    const { id, revision } = this.projectData.project;
+    this.projectData.project = { ...project, id, revision };
     this.notifyChange();
   }
 
@@ -497,7 +499,16 @@ export class ProjectController {
   async saveProject(): Promise<boolean> {
     // Convert to LDL and save
     const ldlData = this.convertToLDL();
-    return await ApiService.saveProject(ldlData);
+    const result = await ApiService.saveProject(ldlData);
+    if (result.conflict) {
+      throw new SaveConflictError(result.message || 'Project was saved elsewhere', result.revision);
+    }
+    if (result.success && result.projectId !== undefined) {
+      // Later saves update this project in place instead of inserting a copy
+      this.projectData.project.id = String(result.projectId);
+      this.projectData.project.revision = result.revision;
+    }
+    return result.success;
   }
 
   /**
@@ -550,8 +561,10 @@ export class ProjectController {
         throw new Error('Failed to process import data');
       }
 
-      // Replace existing project data with imported data
+      // Replace existing project data with imported data; an imported file is
+      // saved as a new project, not over the one it was downloaded from
       this.projectData = processedData;
+      this.projectData.project = { ...processedData.project, id: '', revision: undefined };
       this.notifyChange();
       return true;
     } catch (error) {
@@ -614,11 +627,13 @@ export class ProjectController {
       // Reset current project data
       this.projectData = new ProjectData(
         new Project(
+          String(projectData.project.id ?? ''),
           projectData.project.name,
           projectData.project.version,
           projectData.project.description
         )
       );
+      this.projectData.project.revision = projectData.project.revision;
 
       // Reset all collections
       this.projectData.agents = [];
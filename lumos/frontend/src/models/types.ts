@@ -9,6 +9,9 @@ export interface Position {
 }
 
 export class Project {
+  // Backend revision this canvas was loaded or last saved at; sent back on save
+  // so the backend can reject it if someone else saved the project in between
+  revision?: number;
   constructor(
     public id: string,
     public name: string,
@@ -47,8 +47,12 @@ describe('ApiService', () => {
   });
 
   describe('saveProject', () => {
-    it('pauses/resumes heartbeat and returns true on ok response', async () => {
-      fetchMock.mockResolvedValueOnce({ ok: true } as any);
+    it('pauses/resumes heartbeat and returns the saved id on ok response', async () => {
+      fetchMock.mockResolvedValueOnce({
+        ok: true,
+        status: 200,
+        json: vi.fn().mockResolvedValue({ status: 'success', project_id: 7, revision: 1 }),
+      } as any);
       const response = await ApiService.saveProject({
         project: {},
         agents: [],
@@ -57,13 +61,38 @@ describe('ApiService', () => {
       });
       expect(heartbeat.pauseHeartbeat).toHaveBeenCalled();
       expect(heartbeat.resumeHeartbeat).toHaveBeenCalled();
-      expect(response).toBe(true);
+      expect(response).toEqual({ success: true, projectId: 7, revision: 1 });
       expect(fetchMock).toHaveBeenCalledWith(
         `${API_BASE_URL}/save`,
         expect.objectContaining({ method: 'POST' })
       );
     });
 
+    it('sends the backend id and revision, and only those', async () => {
+      const ok = {
+        ok: true,
+        status: 200,
+        json: vi.fn().mockResolvedValue({ status: 'success', project_id: 7, revision: 4 }),
+      };
+      fetchMock.mockResolvedValueOnce(ok as any).mockResolvedValueOnce(ok as any);
+      await ApiService.saveProject({ project: { id: '7', revision: 3, name: 'p' }, agents: [] });
+      await ApiService.saveProject({ project: { id: 'New Project', name: 'p' }, agents: [] });
+      const sent = fetchMock.mock.calls.map((call: any) => JSON.parse(call[1].body).project);
+      expect(sent[0]).toEqual({ id: 7, revision: 3, name: 'p' });
+      expect(sent[1]).toEqual({ name: 'p' });
+    });
+
+    it('reports a revision conflict on 409', async () => {
+      fetchMock.mockResolvedValueOnce({
+        ok: false,
+        status: 409,
+        json: vi.fn().mockResolvedValue({ status: 'error', message: 'stale', revision: 5 }),
+      } as any);
+      const response = await ApiService.saveProject({ project: { id: '7', revision: 3 }, agents: [] });
+      expect(response).toEqual({ success: false, conflict: true, revision: 5, message: 'stale' });
+      expect(heartbeat.resumeHeartbeat).toHaveBeenCalled();
+    });
+
     it('resumes heartbeat and returns false on error', async () => {
       fetchMock.mockRejectedValueOnce(new Error('network error'));
       const response = await ApiService.saveProject({
@@ -72,7 +101,7 @@ describe('ApiService', () => {
         tools: [],
         interactions: [],
       });
-      expect(response).toBe(false);
+      expect(response).toEqual({ success: false });
       expect(heartbeat.resumeHeartbeat).toHaveBeenCalled();
     });
   });
@@ -44,6 +44,28 @@ export function deserializeLdl(text: string, format: 'json' | 'yaml'): any {
   return adapter.deserialize(text);
 }
 
+/**
+ * Thrown when a save is rejected because the project was saved elsewhere
+ * after this canvas loaded it
+ */
+export class SaveConflictError extends Error {
+  constructor(
+    message: string,
+    public revision?: number
+  ) {
+    super(message);
+    this.name = 'SaveConflictError';
+  }
+}
+
+export interface SaveResult {
+  success: boolean;
+  projectId?: number;
+  revision?: number;
+  conflict?: boolean;
+  message?: string;
+}
+
 /**
  * Service for handling API communication with the backend
  */
@@ -89,9 +111,11 @@ export class ApiService {
 
   /**
    * Save project data to the backend without validation
-   * This is for saving checkpoints during development
+   * This is for saving checkpoints during development.
+   * A project with a backend id is updated in place; the backend answers 409
+   * if its revision no longer matches.
    */
-  static async saveProject(lumosData: any): Promise<boolean> {
+  static async saveProject(lumosData: any): Promise<SaveResult> {
     // Pause the heartbeat
     heartbeat.pauseHeartbeat();
     try {
@@ -114,9 +138,15 @@ export class ApiService {
         });
       }
 
+      // Only ids assigned by the backend are sent; anything else is a new project
+      const { id, revision, ...projectInfo } = dataForSaving.project || {};
+      const project = /^\d+$/.test(String(id ?? ''))
+        ? { ...projectInfo, id: Number(id), revision: revision ?? null }
+        : projectInfo;
+
       // Transform the data to match the backend's ProjectSave schema
       const transformedData = {
-        project: dataForSaving.project,
+        project,
         agents: dataForSaving.agents,
         tools: dataForSaving.tools || [],
         interactions: dataForSaving.interactions || [],
@@ -143,15 +173,21 @@ export class ApiService {
         body: JSON.stringify(transformedData),
       });
 
+      if (response.status === 409) {
+        const conflict = await response.json();
+        return { success: false, conflict: true, revision: conflict.revision, message: conflict.message };
+      }
+
       if (!response.ok) {
         const errorText = await response.text();
         throw new Error(`HTTP error! status: ${response.status}, message: ${errorText}`);
       }
 
-      return true;
+      const result = await response.json();
+      return { success: true, projectId: result.project_id, revision: result.revision };
     } catch (error) {
       console.error('Error saving project:', error);
-      return false;
+      return { success: false };
     } finally {
       // Resume the heartbeat
       heartbeat.resumeHeartbeat();
@@ -215,18 +251,25 @@ export class ApiService {
   }
 
   /**
-   * Get all saved projects from the backend
+   * Get all saved projects from the backend, following next_cursor through every page
    */
   static async getAllProjects(): Promise<any[]> {
     try {
-      const response = await fetch(`${API_BASE_URL}/projects`);
-
-      if (!response.ok) {
-        throw new Error(`Failed to fetch projects: ${response.statusText}`);
-      }
+      const projects: any[] = [];
+      let cursor: string | null = null;
+      do {
+        const query: string = cursor ? `?limit=500&cursor=${encodeURIComponent(cursor)}` : '?limit=500';
+        const response = await fetch(`${API_BASE_URL}/projects${query}`);
+
+        if (!response.ok) {
+          throw new Error(`Failed to fetch projects: ${response.statusText}`);
+        }
 
-      const data = await response.json();
-      return data.projects || [];
+        const data = await response.json();
+        projects.push(...(data.projects || []));
+        cursor = data.next_cursor || null;
+      } while (cursor);
+      return projects;
     } catch (error) {
       console.error('Error fetching projects:', error);
       return [];